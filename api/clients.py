@@ -0,0 +1,121 @@
+import os
+import threading
+
+import requests
+from requests.adapters import HTTPAdapter
+
+try:
+    import config
+except ImportError:
+    import sys
+    sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+    import config
+
+HTTP_CONNECT_TIMEOUT = float(os.getenv("HTTP_CONNECT_TIMEOUT", "5"))
+HTTP_READ_TIMEOUT = float(os.getenv("HTTP_READ_TIMEOUT", "60"))
+HTTP_POOL_SIZE = int(os.getenv("HTTP_POOL_SIZE", "20"))
+GITHUB_POOL_SIZE = int(os.getenv("GITHUB_POOL_SIZE", str(HTTP_POOL_SIZE)))
+GROQ_POOL_SIZE = int(os.getenv("GROQ_POOL_SIZE", str(HTTP_POOL_SIZE)))
+GROQ_MAX_RETRIES = int(os.getenv("GROQ_MAX_RETRIES", "1"))
+# Overrides the Groq API host (e.g. a proxy or a local stand-in); None keeps the SDK default
+GROQ_BASE_URL = os.getenv("GROQ_BASE_URL") or None
+
+HTTP_TIMEOUT = (HTTP_CONNECT_TIMEOUT, HTTP_READ_TIMEOUT)
+
+
+_lock = threading.Lock()
+_session = None
+_github_session = None
+_groq_clients = {}
+
+
+def get_http_session():
+    """
+    Shared requests.Session with a keep-alive connection pool (used for Gemini REST).
+    """
+    global _session
+    if _session is None:
+        with _lock:
+            if _session is None:
+                session = requests.Session()
+                adapter = HTTPAdapter(pool_connections=4, pool_maxsize=HTTP_POOL_SIZE)
+                session.mount("https://", adapter)
+                session.mount("http://", adapter)
+                _session = session
+    return _session
+
+
+def get_github_session():
+    """
+    Shared requests.Session for the GitHub REST/GraphQL API. It carries no token:
+    github_scheduler adds one from its pool to each request.
+    """
+    global _github_session
+    if _github_session is None:
+        with _lock:
+            if _github_session is None:
+                session = requests.Session()
+                adapter = HTTPAdapter(pool_connections=2, pool_maxsize=GITHUB_POOL_SIZE)
+                session.mount("https://", adapter)
+                session.mount("http://", adapter)
+                session.headers.update({
+                    "Accept": "application/vnd.github+json",
+                    "X-GitHub-Api-Version": "2022-11-28",
+                })
+                _github_session = session
+    return _github_session
+
+
+def get_groq(api_key):
+    """
+    Shared Groq client (one per API key) backed by a pooled httpx client.
+    groq is only imported here, since most requests never need the fallback provider.
+    """
+    client = _groq_clients.get(api_key)
+    if client is None:
+        with _lock:
+            client = _groq_clients.get(api_key)
+            if client is None:
+                import httpx
+                from groq import Groq
+
+                timeout = httpx.Timeout(HTTP_READ_TIMEOUT, connect=HTTP_CONNECT_TIMEOUT)
+                http_client = httpx.Client(
+                    timeout=timeout,
+                    limits=httpx.Limits(
+                        max_connections=GROQ_POOL_SIZE,
+                        max_keepalive_connections=GROQ_POOL_SIZE,
+                    ),
+                )
+                client = Groq(
+                    api_key=api_key,
+                    base_url=GROQ_BASE_URL,
+                    timeout=timeout,
+                    max_retries=GROQ_MAX_RETRIES,
+                    http_client=http_client,
+                )
+                _groq_clients[api_key] = client
+    return client
+
+
+def init_clients():
+    """
+    Creates the requests sessions up front so the first request doesn't pay for it.
+    The Groq client stays lazy (see get_groq) to keep its imports off the cold start.
+    """
+    get_http_session()
+    get_github_session()
+
+
+def close_clients():
+    global _session, _github_session
+    with _lock:
+        if _session is not None:
+            _session.close()
+            _session = None
+        if _github_session is not None:
+            _github_session.close()
+            _github_session = None
+        for client in _groq_clients.values():
+            client.close()
+        _groq_clients.clear()
@@ -0,0 +1,327 @@
+import os
+import re
+import threading
+
+try:
+    import config
+except ImportError:
+    import sys
+    sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+    import config
+
+
+COMPACTION_ENABLED = os.getenv("COMPACTION_ENABLED", "1") != "0"
+# Token budgets replace the old [:15000] / [:10000] / [:5000] character slices
+RESUME_TOKEN_BUDGET = int(os.getenv("RESUME_TOKEN_BUDGET", "4000"))
+MATCH_RESUME_TOKEN_BUDGET = int(os.getenv("MATCH_RESUME_TOKEN_BUDGET", "2500"))
+JD_TOKEN_BUDGET = int(os.getenv("JD_TOKEN_BUDGET", "1250"))
+# The short mismatch prompt (see keyword_match) only needs enough context to explain the gap
+MISMATCH_RESUME_TOKEN_BUDGET = int(os.getenv("MISMATCH_RESUME_TOKEN_BUDGET", "600"))
+MISMATCH_JD_TOKEN_BUDGET = int(os.getenv("MISMATCH_JD_TOKEN_BUDGET", "400"))
+# Section-level re-analysis (section_analysis): one changed section; the score recompute
+# sees the resume at RESUME_TOKEN_BUDGET like the full prompt
+SECTION_TOKEN_BUDGET = int(os.getenv("SECTION_TOKEN_BUDGET", "1200"))
+
+TRUNCATION_MARK = "[...]"
+DEDUPE_MIN_WORDS = 6
+# A new page starting with the document's first lines again (name, contact) repeats them as a running header
+PAGE_HEADER_LINES = 2
+# Over budget, a line is clipped rather than dropped when this many of its tokens still fit
+MIN_CLIP_TOKENS = 12
+
+# Section title keywords -> importance (higher is kept longer when over budget)
+RESUME_PRIORITIES = [
+    (("experience", "employment", "work history", "internship"), 1.0),
+    (("skill", "technolog", "tools", "stack"), 0.9),
+    (("project",), 0.9),
+    (("summary", "objective", "profile", "about"), 0.8),
+    (("education", "academic", "coursework"), 0.7),
+    (("certific", "award", "achievement", "honor", "publication"), 0.5),
+    (("leadership", "activit", "volunteer", "extracurricular"), 0.4),
+    (("interest", "hobbies", "reference", "language"), 0.2),
+]
+JD_PRIORITIES = [
+    (("requirement", "qualification", "must have", "what you", "you have", "skills"), 1.0),
+    (("responsibilit", "what you'll do", "role", "duties", "day to day"), 0.9),
+    (("nice to have", "preferred", "bonus", "plus"), 0.7),
+    (("about the team", "about the role", "overview"), 0.5),
+    (("benefit", "perk", "compensation", "salary", "about us", "about the company", "who we are"), 0.2),
+    (("equal opportunity", "eeo", "diversity", "accommodation", "privacy"), 0.05),
+]
+# Text before the first heading: name/contact for resumes, usually the role summary for JDs
+LEAD_PRIORITY = 0.95
+DEFAULT_PRIORITY = 0.6
+
+_TOKEN_RE = re.compile(r"[A-Za-z]+|\d+|[^\sA-Za-z\d]")
+_TABLE_RULE_RE = re.compile(r"^\s*\|?\s*:?-{2,}:?\s*(\|\s*:?-{2,}:?\s*)*\|?\s*$")
+_NOISE_LINE_RE = re.compile(
+    r"^\s*(page\s+\d+(\s+of\s+\d+)?|\d+\s*/\s*\d+|\d{1,3}|[-_=*~.•·]{3,}|<!--.*-->)\s*$",
+    re.IGNORECASE,
+)
+# Page numbers and the parsers' "<!-- page break -->" markers; \f is a PDF text form feed
+_PAGE_BOUNDARY_RE = re.compile(r"^\s*(page\s+\d+(\s+of\s+\d+)?|\d+\s*/\s*\d+|\d{1,3}|<!--.*-->)\s*$", re.IGNORECASE)
+_IMAGE_RE = re.compile(r"!\[[^\]]*\]\([^)]*\)")
+_HEADING_RE = re.compile(r"^(#{1,6})\s+(.*)$")
+
+
+def estimate_tokens(text):
+    """
+    Rough BPE token count without a tokenizer dependency: words cost one token per
+    ~4 letters, digit runs one per 3 digits, punctuation one each.
+    """
+    count = 0
+    for piece in _TOKEN_RE.findall(text):
+        if piece.isalpha():
+            count += (len(piece) + 3) // 4
+        elif piece.isdigit():
+            count += (len(piece) + 2) // 3
+        else:
+            count += 1
+    return count
+
+
+def _table_row(line):
+    cells = [cell.strip() for cell in line.strip().strip("|").split("|")]
+    return " | ".join(cell for cell in cells if cell)
+
+
+def _line_key(line):
+    return re.sub(r"\W+", " ", line.lstrip("#-*• ").lower()).strip()
+
+
+def normalize_markdown(text):
+    """
+    Strips layout noise from parser markdown: table pipes and rule rows, images,
+    page numbers / separators, emphasis markers, blank lines and repeated whitespace.
+    Repeated sentence-length lines (duplicated bullets, long footers) are kept once.
+    Headings are only dropped as page residue: the document's first lines again right after
+    a page boundary (running header), an earlier heading right before one (footer), or the
+    heading right above repeated. Two roles titled "Software Engineer" both keep theirs.
+    """
+    lines = []
+    seen = set()
+    headings = {}
+    opening = []
+    header = None
+    for raw in text.replace("\r", "\n").replace("\f", "\n<!-- page break -->\n").split("\n"):
+        line = _IMAGE_RE.sub("", raw)
+        if _PAGE_BOUNDARY_RE.match(line):
+            header = 0
+            # A heading that already appeared, last on the page: footer residue
+            if lines and lines[-1].startswith("#") and headings[_line_key(lines[-1])] > 1:
+                headings[_line_key(lines[-1])] -= 1
+                lines.pop()
+                if lines and not lines[-1]:
+                    lines.pop()
+            continue
+        if _TABLE_RULE_RE.match(line) or _NOISE_LINE_RE.match(line):
+            continue
+        if line.lstrip().startswith("|"):
+            line = _table_row(line)
+        line = line.replace("**", "").replace("__", "")
+        line = re.sub(r"[ \t ]+", " ", line).strip()
+
+        if not line:
+            continue
+
+        key = _line_key(line)
+        if header is not None and header < len(opening) and key == opening[header]:
+            header += 1
+            continue
+        header = None
+        if len(opening) < PAGE_HEADER_LINES:
+            opening.append(key)
+
+        if line.startswith("#"):
+            if lines and lines[-1] == line:
+                continue
+            headings[key] = headings.get(key, 0) + 1
+        # Short lines ("Python", "Acme Corp | Austin, TX") legitimately repeat across entries;
+        # sentence-length lines (bullets, page headers/footers) don't
+        elif len(key.split()) >= DEDUPE_MIN_WORDS:
+            if key in seen:
+                continue
+            seen.add(key)
+        elif lines and lines[-1] == line:
+            continue
+        if line.startswith("#") and lines:
+            lines.append("")
+        lines.append(line)
+
+    return "\n".join(lines).strip()
+
+
+def _section_title(line):
+    match = _HEADING_RE.match(line)
+    if match:
+        return match.group(2).strip()
+    # Plain-text parsers leave headings as short ALL-CAPS lines ("WORK EXPERIENCE")
+    letters = "".join(c for c in line if c.isalpha())
+    if len(letters) >= 4 and letters.isupper() and len(line.split()) <= 4 and not re.search(r"[,\d|]", line):
+        return line
+    # Pasted job descriptions use "Requirements:" / "What you'll do:" lines instead
+    stripped = line.strip()
+    if stripped.endswith(":") and len(letters) >= 4 and len(stripped.split()) <= 5 and not re.search(r"[,\d|]", line):
+        return stripped[:-1]
+    return None
+
+
+def split_sections(text):
+    """
+    Returns [(title or None, [lines])]; a new section starts at each markdown heading
+    or short ALL-CAPS line.
+    """
+    sections = [(None, [])]
+    for line in text.split("\n"):
+        title = _section_title(line) if line else None
+        # A leading "# Name" belongs to the header block rather than starting a section
+        if title is not None and len(sections) == 1 and line.startswith("# ") and not any(sections[0][1]):
+            title = None
+        if title is not None:
+            sections.append((title, [line]))
+        else:
+            sections[-1][1].append(line)
+    if not sections[0][1]:
+        sections.pop(0)
+    return sections
+
+
+def section_priority(title, priorities):
+    if title is None:
+        return LEAD_PRIORITY
+    lower = title.lower()
+    for keywords, priority in priorities:
+        if any(keyword in lower for keyword in keywords):
+            return priority
+    return DEFAULT_PRIORITY
+
+
+def _clip_line(line, tokens):
+    """Longest word prefix of `line` that fits in `tokens` estimated tokens."""
+    words = line.split(" ")
+    lo, hi = 0, len(words)
+    while lo < hi:
+        mid = (lo + hi + 1) // 2
+        if estimate_tokens(" ".join(words[:mid])) <= tokens:
+            lo = mid
+        else:
+            hi = mid - 1
+    return " ".join(words[:lo])
+
+
+def fit_to_budget(sections, budget, priorities):
+    """
+    Keeps whole sections in document order while they fit. Over budget, lines are
+    trimmed from the end of the least important sections first (down to their heading,
+    then the section is dropped), so the tail of the document is no longer what gets lost.
+    Returns (text, dropped section titles, trimmed section titles).
+    """
+    entries = [
+        {"title": title, "lines": list(lines), "priority": section_priority(title, priorities),
+         "tokens": [estimate_tokens(line) + 1 for line in lines]}
+        for title, lines in sections
+    ]
+    total = sum(sum(entry["tokens"]) for entry in entries)
+    dropped, trimmed = [], []
+
+    for entry in sorted(entries, key=lambda e: e["priority"]):
+        if total <= budget:
+            break
+        keep = 1 if entry["title"] is not None else 0
+        cut = False
+        while len(entry["lines"]) > keep and total > budget:
+            cut = True
+            excess = total - budget
+            # A long line (JD paragraphs, merged table rows) is clipped instead of dropped
+            # when only part of it is over budget; the +2 leaves room for the marker
+            if entry["tokens"][-1] > excess + MIN_CLIP_TOKENS:
+                clipped = _clip_line(entry["lines"][-1], entry["tokens"][-1] - excess - 2)
+                total -= entry["tokens"][-1] - (estimate_tokens(clipped) + 1)
+                entry["lines"][-1], entry["tokens"][-1] = clipped, estimate_tokens(clipped) + 1
+                break
+            entry["lines"].pop()
+            total -= entry["tokens"].pop()
+        if total > budget or not entry["lines"]:
+            total -= sum(entry["tokens"])
+            entry["lines"], entry["tokens"] = [], []
+            dropped.append(entry["title"] or "(header)")
+        elif cut:
+            entry["lines"].append(TRUNCATION_MARK)
+            total += 1
+            trimmed.append(entry["title"] or "(header)")
+
+    text = "\n".join(line for entry in entries for line in entry["lines"])
+    return re.sub(r"\n{3,}", "\n\n", text).strip(), dropped, trimmed
+
+
+class CompactionStats:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.documents = 0
+        self.input_tokens = 0
+        self.output_tokens = 0
+        self.trimmed = 0
+
+    def record(self, report):
+        with self._lock:
+            self.documents += 1
+            self.input_tokens += report["input_tokens"]
+            self.output_tokens += report["output_tokens"]
+            if report["dropped"] or report["trimmed"]:
+                self.trimmed += 1
+
+    def stats(self):
+        saved = self.input_tokens - self.output_tokens
+        return {
+            "enabled": COMPACTION_ENABLED,
+            "documents": self.documents,
+            "input_tokens": self.input_tokens,
+            "output_tokens": self.output_tokens,
+            "tokens_saved": saved,
+            "saved_ratio": round(saved / self.input_tokens, 4) if self.input_tokens else 0.0,
+            "documents_over_budget": self.trimmed,
+        }
+
+
+compaction_stats = CompactionStats()
+
+
+def compact(text, budget, kind="resume"):
+    """
+    Normalizes parser markdown and fits it to `budget` (estimated) tokens,
+    prioritising sections by importance for a resume or a job description (kind="jd").
+    Returns (compacted_text, report).
+    """
+    text = text or ""
+    priorities = JD_PRIORITIES if kind == "jd" else RESUME_PRIORITIES
+    input_tokens = estimate_tokens(text)
+
+    normalized = normalize_markdown(text)
+    if estimate_tokens(normalized) <= budget:
+        result, dropped, trimmed = normalized, [], []
+    else:
+        result, dropped, trimmed = fit_to_budget(split_sections(normalized), budget, priorities)
+
+    report = {
+        "input_tokens": input_tokens,
+        "output_tokens": estimate_tokens(result),
+        "dropped": dropped,
+        "trimmed": trimmed,
+    }
+    compaction_stats.record(report)
+    return result, report
+
+
+def compact_for_prompt(text, budget, kind="resume", fallback_chars=None):
+    """
+    compact() with logging; with COMPACTION_ENABLED=0 falls back to the old character slice.
+    """
+    if not COMPACTION_ENABLED:
+        return (text or "")[:fallback_chars] if fallback_chars else (text or "")
+
+    result, report = compact(text, budget, kind)
+    saved = report["input_tokens"] - report["output_tokens"]
+    print(f"   ✂️ Compacted {kind}: {report['input_tokens']} -> {report['output_tokens']} tokens (-{saved})"
+          + (f", trimmed {report['trimmed']}" if report["trimmed"] else "")
+          + (f", dropped {report['dropped']}" if report["dropped"] else ""))
+    return result
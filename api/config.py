@@ -0,0 +1,14 @@
+import os
+import sys
+
+from dotenv import load_dotenv
+
+
+API_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# Sibling modules are imported by plain name; put the api folder on sys.path once per process
+if API_DIR not in sys.path:
+    sys.path.append(API_DIR)
+
+# Every module imports config before reading settings, so .env is parsed exactly once
+load_dotenv(os.path.join(os.path.dirname(API_DIR), '.env'))
@@ -0,0 +1,114 @@
+import asyncio
+import contextvars
+import functools
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+
+PIPELINE_MAX_WORKERS = int(os.getenv("PIPELINE_MAX_WORKERS", "16"))
+# Process pool for CPU-bound PDF work; 0 keeps it on the calling thread
+PDF_POOL_WORKERS = int(os.getenv("PDF_POOL_WORKERS", "0"))
+# Recycle each worker process after this many jobs to cap memory growth
+PDF_POOL_MAX_TASKS = int(os.getenv("PDF_POOL_MAX_TASKS", "50"))
+# "path": workers open the uploaded file themselves; "shm": bytes are handed over in shared memory
+PDF_POOL_TRANSFER = os.getenv("PDF_POOL_TRANSFER", "path").lower()
+
+
+_executor = None
+_process_pool = None
+_lock = threading.Lock()
+
+
+def get_executor():
+    """
+    Process-wide thread pool for the blocking parts of the pipeline
+    (LlamaParse, pdfplumber, GitHub, LLM HTTP calls).
+    """
+    global _executor
+    if _executor is None:
+        with _lock:
+            if _executor is None:
+                _executor = ThreadPoolExecutor(
+                    max_workers=PIPELINE_MAX_WORKERS,
+                    thread_name_prefix="pipeline",
+                )
+    return _executor
+
+
+async def run_blocking(func, *args, **kwargs):
+    """
+    Runs a synchronous function on the pipeline pool without blocking the event loop.
+    Context variables are carried over to the worker thread.
+    """
+    loop = asyncio.get_running_loop()
+    ctx = contextvars.copy_context()
+    call = functools.partial(ctx.run, func, *args, **kwargs)
+    return await loop.run_in_executor(get_executor(), call)
+
+
+def shutdown_executor(wait=True):
+    global _executor
+    with _lock:
+        if _executor is not None:
+            _executor.shutdown(wait=wait)
+            _executor = None
+
+
+def get_process_pool():
+    """
+    Process pool for CPU-bound work that would otherwise hold the GIL (pdfplumber).
+    Returns None when PDF_POOL_WORKERS is 0. Workers are started with forkserver/spawn
+    (forking a threaded server is unsafe, and max_tasks_per_child requires it).
+    """
+    global _process_pool
+    if PDF_POOL_WORKERS <= 0:
+        return None
+    if _process_pool is None:
+        import multiprocessing
+        from concurrent.futures import ProcessPoolExecutor
+
+        with _lock:
+            if _process_pool is None:
+                methods = multiprocessing.get_all_start_methods()
+                context = multiprocessing.get_context("forkserver" if "forkserver" in methods else "spawn")
+                _process_pool = ProcessPoolExecutor(
+                    max_workers=PDF_POOL_WORKERS,
+                    mp_context=context,
+                    max_tasks_per_child=PDF_POOL_MAX_TASKS or None,
+                )
+    return _process_pool
+
+
+def share_bytes(data):
+    """
+    Copies data into a new shared memory block. The caller must close() and unlink() it.
+    """
+    from multiprocessing import shared_memory
+
+    block = shared_memory.SharedMemory(create=True, size=max(len(data), 1))
+    block.buf[:len(data)] = data
+    return block
+
+
+def read_shared(name, size):
+    """
+    Reads `size` bytes from a shared memory block created by share_bytes in another process.
+    """
+    from multiprocessing import shared_memory
+
+    # Pool workers share the parent's resource tracker, so attaching here doesn't
+    # hand ownership over: the creator still unlinks the block
+    block = shared_memory.SharedMemory(name=name)
+    try:
+        return bytes(block.buf[:size])
+    finally:
+        block.close()
+
+
+def shutdown_process_pool(wait=True):
+    global _process_pool
+    with _lock:
+        if _process_pool is not None:
+            _process_pool.shutdown(wait=wait, cancel_futures=True)
+            _process_pool = None
@@ -0,0 +1,128 @@
+import os
+import threading
+import time
+
+
+try:
+    import config
+    from cache import LRUCache
+    from github_scheduler import github_scheduler, GitHubRateLimited
+except ImportError:
+    import sys
+    sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+    import config
+    from cache import LRUCache
+    from github_scheduler import github_scheduler, GitHubRateLimited
+
+
+GITHUB_API_URL = os.getenv("GITHUB_API_URL", "https://api.github.com").rstrip("/")
+GITHUB_CACHE_TTL = float(os.getenv("GITHUB_CACHE_TTL", "300"))
+GITHUB_CACHE_MAX_AGE = float(os.getenv("GITHUB_CACHE_MAX_AGE", str(7 * 24 * 60 * 60)))
+GITHUB_CACHE_MAX_BYTES = int(os.getenv("GITHUB_CACHE_MAX_BYTES", str(16 * 1024 * 1024)))
+
+
+class GitHubResponseCache:
+    """
+    Conditional-request cache for GitHub REST GETs.
+
+    - Within `ttl` seconds a stored response is served without touching the network (hit).
+    - After that it is revalidated with If-None-Match / If-Modified-Since; a 304 costs no
+      rate limit and the stored body is reused (revalidation).
+    - Anything else is a normal fetch (miss).
+    - When the scheduler refuses the call (rate limit), a stored response of any age is
+      served rather than failing (stale).
+    Entries are kept in a byte-bounded LRU and dropped entirely after `max_age`.
+    """
+
+    def __init__(self, ttl=GITHUB_CACHE_TTL, max_bytes=GITHUB_CACHE_MAX_BYTES, max_age=GITHUB_CACHE_MAX_AGE):
+        self.ttl = ttl
+        self.entries = LRUCache(max_bytes=max_bytes, ttl=max_age)
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.revalidations = 0
+        self.misses = 0
+        self.stale = 0
+
+    def get(self, path, params=None, priority="profile", timeout=None):
+        """
+        Returns (json_body, next_url) for a GitHub API path or absolute URL.
+        Raises requests.HTTPError on 4xx/5xx and GitHubRateLimited when there is no quota
+        (see github_scheduler) and nothing stored. `timeout` (seconds) caps the HTTP call.
+        """
+        url = path if path.startswith("http") else f"{GITHUB_API_URL}{path}"
+        key = url + ("?" + "&".join(f"{k}={v}" for k, v in sorted(params.items())) if params else "")
+
+        entry = self.entries.get(key)
+        if entry is not None and time.time() - entry["fetched_at"] < self.ttl:
+            self._count("hits")
+            return entry["body"], entry["next"]
+
+        headers = {}
+        if entry is not None:
+            if entry.get("etag"):
+                headers["If-None-Match"] = entry["etag"]
+            if entry.get("last_modified"):
+                headers["If-Modified-Since"] = entry["last_modified"]
+
+        try:
+            response = github_scheduler.request(
+                "GET", url, priority=priority, params=params, headers=headers, timeout=timeout,
+            )
+        except GitHubRateLimited:
+            if entry is None:
+                raise
+            self._count("stale")
+            return entry["body"], entry["next"]
+
+        if response.status_code == 304 and entry is not None:
+            entry["fetched_at"] = time.time()
+            self.entries.set(key, entry)
+            self._count("revalidations")
+            return entry["body"], entry["next"]
+
+        response.raise_for_status()
+        body = response.json()
+        next_url = response.links.get("next", {}).get("url")
+
+        self.entries.set(key, {
+            "body": body,
+            "next": next_url,
+            "etag": response.headers.get("ETag"),
+            "last_modified": response.headers.get("Last-Modified"),
+            "fetched_at": time.time(),
+        })
+        self._count("misses")
+        return body, next_url
+
+    def get_paginated(self, path, params=None, priority="profile"):
+        """
+        Follows Link: rel="next" and concatenates every page; each page is cached on its own.
+        """
+        items = []
+        body, next_url = self.get(path, params, priority)
+        items.extend(body)
+        while next_url:
+            body, next_url = self.get(next_url, priority=priority)
+            items.extend(body)
+        return items
+
+    def _count(self, name):
+        with self._lock:
+            setattr(self, name, getattr(self, name) + 1)
+
+    def clear(self):
+        self.entries.clear()
+
+    def stats(self):
+        lookups = self.hits + self.revalidations + self.misses
+        return {
+            "hits": self.hits,
+            "revalidations": self.revalidations,
+            "misses": self.misses,
+            "stale": self.stale,
+            "hit_rate": round((self.hits + self.revalidations) / lookups, 4) if lookups else 0.0,
+            "memory": self.entries.stats(),
+        }
+
+
+github_cache = GitHubResponseCache()
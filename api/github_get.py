@@ -1,32 +1,63 @@
-from github import Github
-from dotenv import load_dotenv
 import os
-import re
-from thefuzz import fuzz
 import asyncio
-
-
-
-
-load_dotenv(os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), '.env'))
-GITHUB_TOKEN = os.getenv("GITHUB_TOKEN") or os.getenv("VITE_GITHUB_TOKEN")
-
-
+import time
+import contextvars
+import threading
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FuturesTimeout
+
+try:
+    import config
+    from github_cache import github_cache
+    from github_graphql import fetch_repos_graphql
+    from github_scheduler import github_scheduler, GitHubRateLimited
+    from metrics import span
+    from singleflight import SingleFlight
+except ImportError:
+    import sys
+    sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+    import config
+    from github_cache import github_cache
+    from github_graphql import fetch_repos_graphql
+    from github_scheduler import github_scheduler, GitHubRateLimited
+    from metrics import span
+    from singleflight import SingleFlight
+
+
+GITHUB_AUDIT_CONCURRENCY = int(os.getenv("GITHUB_AUDIT_CONCURRENCY", "8"))
+GITHUB_AUDIT_TIMEOUT = float(os.getenv("GITHUB_AUDIT_TIMEOUT", "10"))
+# "rest" (default) or "graphql"; GraphQL falls back to REST on any error
+GITHUB_BACKEND = os.getenv("GITHUB_BACKEND", "rest").lower()
+
+# Concurrent resumes from the same user share one profile sweep / repo audit
+profile_flights = SingleFlight("github_profile")
+audit_flights = SingleFlight("github_audit")
 
 
 def analyze_github_profile(username):
     """
     Fetches all repositories for the user to compare against the resume.
     """
-    if not GITHUB_TOKEN:
-        return {"status": "error", "message": "Missing GITHUB_TOKEN"}
+    with span("github_profile"):
+        return profile_flights.do(username.lower(), lambda: _fetch_github_profile(username))
 
-    try:
-        g = Github(GITHUB_TOKEN)
-        user = g.get_user(username)
 
+def _fetch_github_profile(username):
+    if not github_scheduler.has_tokens:
+        return {"status": "error", "message": "Missing GITHUB_TOKEN"}
 
-        repos = list(user.get_repos())
+    if GITHUB_BACKEND == "graphql":
+        try:
+            repos = fetch_repos_graphql(username)
+            print(f"   (Found {len(repos)} public repositories on GitHub via GraphQL)")
+            for repo in repos:
+                repo["match_reason"] = None
+                repo["audit"] = {}
+            return {"status": "success", "repos": repos}
+        except Exception as e:
+            print(f"   ⚠️ GitHub GraphQL failed, falling back to REST: {e}")
+
+    try:
+        repos = github_cache.get_paginated(f"/users/{username}/repos", {"per_page": 100})
         repo_data = []
 
         print(f"   (Found {len(repos)} public repositories on GitHub)")
@@ -34,11 +65,11 @@ def analyze_github_profile(username):
         for repo in repos:
 
             repo_info = {
-                "name": repo.name,
-                "url": repo.html_url,
-                "description": repo.description,
-                "stars": repo.stargazers_count,
-                "pushed_at": repo.pushed_at,
+                "name": repo["name"],
+                "url": repo["html_url"],
+                "description": repo.get("description"),
+                "stars": repo.get("stargazers_count", 0),
+                "pushed_at": repo.get("pushed_at"),
                 "match_reason": None,
                 "audit": {}
             }
@@ -50,125 +81,171 @@ def analyze_github_profile(username):
         return {"status": "error", "message": str(e)}
 
 
-
-
-def audit_repo(repo_obj_name, username):
+def audit_repo(repo_obj_name, username, timeout=None):
     """
     Performs the file quality checks (Code, Readme, Requirements).
     Returns a summary string and specific boolean flags.
+    Audits run at low priority: when GitHub quota runs low they are skipped (see github_scheduler).
+    `timeout` (seconds) caps the GitHub call, so an audit given up on doesn't keep its thread.
     """
     try:
-        g = Github(GITHUB_TOKEN)
-        repo = g.get_repo(f"{username}/{repo_obj_name}")
-
-        contents = repo.get_contents("")
-        file_names = [c.name.lower() for c in contents]
-
-
-        has_readme = any(bs in file_names for bs in ["readme.md", "readme.rst", "readme", "readme.txt"])
-
+        with span("github_audit_repo"):
+            return audit_flights.do(
+                (username.lower(), repo_obj_name.lower()),
+                lambda: audit_entries(
+                    github_cache.get(
+                        f"/repos/{username}/{repo_obj_name}/contents/", priority="audit", timeout=timeout,
+                    )[0]
+                ),
+            )
+    except GitHubRateLimited as e:
+        audit = _audit_error("Not audited (GitHub rate limit reached)", e)
+        audit["skipped"] = True
+        audit["retry_at"] = int(e.reset_at) if e.reset_at else None
+        return audit
+    except Exception as e:
+        return _audit_error("Error accessing repo (possibly private or deleted)", e)
 
-        req_files = ["requirements.txt", "package.json", "pyproject.toml", "gemfile", "pom.xml", "go.mod", "cargo.toml", "build.gradle", "environment.yml"]
-        has_requirements = any(f in file_names for f in req_files)
 
+def audit_entries(contents):
+    """
+    Runs the quality checks on a repo's root listing (dicts with "name" and "type": file/dir).
+    """
+    file_names = [c["name"].lower() for c in contents]
 
 
-        code_extensions = ['.py', '.js', '.jsx', '.ts', '.tsx', '.java', '.cpp', '.c', '.cs', '.go', '.rb', '.php', '.html', '.css', '.swift', '.kt', '.rs', '.dart', '.scala', '.sh', '.bat']
-        has_code = False
+    has_readme = any(bs in file_names for bs in ["readme.md", "readme.rst", "readme", "readme.txt"])
 
-        for c in contents:
-            if c.type == "file":
-                 if any(c.name.lower().endswith(ext) for ext in code_extensions):
-                     has_code = True
-                     break
-            elif c.type == "dir" and not c.name.startswith("."):
 
-                has_code = True
-                break
+    req_files = ["requirements.txt", "package.json", "pyproject.toml", "gemfile", "pom.xml", "go.mod", "cargo.toml", "build.gradle", "environment.yml"]
+    has_requirements = any(f in file_names for f in req_files)
 
 
-        missing = []
-        if not has_code: missing.append("Code Files")
-        if not has_readme: missing.append("README")
-        if not has_requirements: missing.append("Requirements File")
+    code_extensions = ['.py', '.js', '.jsx', '.ts', '.tsx', '.java', '.cpp', '.c', '.cs', '.go', '.rb', '.php', '.html', '.css', '.swift', '.kt', '.rs', '.dart', '.scala', '.sh', '.bat']
+    has_code = False
 
-        if not missing:
-            summary = "GitHub is perfect"
-        else:
-            summary = "Missing: " + ", ".join(missing)
-
-        return {
-            "summary": summary,
-            "has_readme": has_readme,
-            "has_requirements": has_requirements,
-            "has_code": has_code
-        }
-    except Exception as e:
-        return {
-            "summary": "Error accessing repo (possibly private or deleted)",
-            "has_readme": False,
-            "has_requirements": False,
-            "has_code": False,
-            "error": str(e)
-        }
+    for c in contents:
+        if c["type"] == "file":
+             if any(c["name"].lower().endswith(ext) for ext in code_extensions):
+                 has_code = True
+                 break
+        elif c["type"] == "dir" and not c["name"].startswith("."):
 
+            has_code = True
+            break
 
 
+    missing = []
+    if not has_code: missing.append("Code Files")
+    if not has_readme: missing.append("README")
+    if not has_requirements: missing.append("Requirements File")
 
+    if not missing:
+        summary = "GitHub is perfect"
+    else:
+        summary = "Missing: " + ", ".join(missing)
 
+    return {
+        "summary": summary,
+        "has_readme": has_readme,
+        "has_requirements": has_requirements,
+        "has_code": has_code
+    }
 
 
+def _audit_error(summary, error):
+    return {
+        "summary": summary,
+        "has_readme": False,
+        "has_requirements": False,
+        "has_code": False,
+        "error": str(error)
+    }
 
 
-def match_projects(resume_text, resume_urls, github_repos):
+def audit_repos(projects, username, concurrency=None, timeout=None, on_result=None):
     """
-    Matches Resume Items -> GitHub Repos
+    Audits several repos in parallel with bounded fan-out.
+    Each repo gets its own timeout (counted from when its audit starts) and
+    results are returned in the same order as `projects`.
+    Projects that already carry `root_entries` (GraphQL backend) are audited locally.
+    on_result(index, audit) is called as each audit finishes (from worker threads), once per
+    index: an audit that finishes after its timeout was reported doesn't report again.
     """
-    matches = []
-    resume_lower = resume_text.lower()
-
-
-
-    resume_slugs = []
-    for url in resume_urls:
-        match = re.search(r"github\.com/[\w-]+/([\w-]+)", url)
-        if match:
-            resume_slugs.append(match.group(1).lower())
-
-    slug_set = set(resume_slugs)
-
-    for repo in github_repos:
-        name_raw = repo['name'].lower()
-        name_clean = name_raw.replace("-", " ").replace("_", " ")
-        desc = (repo['description'] or "").lower()
-
-        match_reason = None
-
-
-        if name_raw in slug_set:
-            match_reason = "URL Link in Resume"
-
-
-        if not match_reason:
-            if name_clean in resume_lower or name_raw in resume_lower:
-                match_reason = "Name Mentioned in Resume"
-            elif fuzz.partial_ratio(name_clean, resume_lower) > 90:
-                match_reason = f"Fuzzy Name Match"
-
-
+    if not projects:
+        return []
+
+    reported = set()
+    report_lock = threading.Lock()
+
+    def report(index, audit):
+        with report_lock:
+            if index in reported:
+                return audit
+            reported.add(index)
+        if on_result:
+            on_result(index, audit)
+        return audit
+
+    results = [None] * len(projects)
+    remote = []
+    for i, project in enumerate(projects):
+        if project.get("root_entries") is not None:
+            results[i] = report(i, audit_entries(project["root_entries"]))
+        else:
+            remote.append(i)
 
-        if not match_reason and len(desc) > 20:
+    if not remote:
+        return results
 
+    repo_names = [projects[i]["name"] for i in remote]
 
-            score = fuzz.token_set_ratio(desc, resume_lower)
-            if score > 75:
-                 match_reason = f"Description Match ({score}%)"
+    concurrency = concurrency or GITHUB_AUDIT_CONCURRENCY
+    timeout = timeout or GITHUB_AUDIT_TIMEOUT
+    started = {}
 
-        if match_reason:
-            repo['match_reason'] = match_reason
-            matches.append(repo)
+    def run(index, name):
+        started[index] = time.monotonic()
+        return report(remote[index], audit_repo(name, username, timeout))
 
-    return matches
+    pool = ThreadPoolExecutor(max_workers=min(concurrency, len(repo_names)), thread_name_prefix="audit")
+    futures = [
+        pool.submit(contextvars.copy_context().run, run, i, name)
+        for i, name in enumerate(repo_names)
+    ]
 
+    audits = []
+    try:
+        for i, future in enumerate(futures):
+            while True:
+                begin = started.get(i)
+                remaining = timeout if begin is None else timeout - (time.monotonic() - begin)
+                try:
+                    audits.append(future.result(timeout=max(remaining, 0)))
+                    break
+                except FuturesTimeout:
+                    # Still queued behind other audits: keep waiting, its clock hasn't started
+                    if i in started and time.monotonic() - started[i] >= timeout:
+                        future.cancel()
+                        audits.append(report(remote[i], _audit_error("Audit timed out", f"No response within {timeout}s")))
+                        break
+                except Exception as e:
+                    audits.append(report(remote[i], _audit_error("Error accessing repo (possibly private or deleted)", e)))
+                    break
+    finally:
+        # Don't wait for hung audits; their results are already discarded
+        pool.shutdown(wait=False, cancel_futures=True)
+
+    for i, audit in zip(remote, audits):
+        results[i] = audit
+    return results
 
 
+def match_projects(resume_text, resume_urls, github_repos):
+    """
+    Matches Resume Items -> GitHub Repos
+    (URL slug, name mention, fuzzy name, description similarity; see matcher.match_repos)
+    """
+    from matcher import match_repos
+    with span("match_projects"):
+        return match_repos(resume_text, resume_urls, github_repos)
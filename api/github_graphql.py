@@ -0,0 +1,92 @@
+import os
+
+
+try:
+    import config
+    from github_cache import GITHUB_API_URL
+    from github_scheduler import github_scheduler
+except ImportError:
+    import sys
+    sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+    import config
+    from github_cache import GITHUB_API_URL
+    from github_scheduler import github_scheduler
+
+
+GITHUB_GRAPHQL_URL = os.getenv("GITHUB_GRAPHQL_URL", f"{GITHUB_API_URL}/graphql")
+
+
+REPOS_QUERY = """
+query($login: String!, $cursor: String) {
+  user(login: $login) {
+    repositories(first: 100, after: $cursor, privacy: PUBLIC, ownerAffiliations: OWNER,
+                 orderBy: {field: PUSHED_AT, direction: DESC}) {
+      pageInfo { hasNextPage endCursor }
+      nodes {
+        name
+        url
+        description
+        stargazerCount
+        pushedAt
+        languages(first: 5, orderBy: {field: SIZE, direction: DESC}) { nodes { name } }
+        object(expression: "HEAD:") {
+          ... on Tree { entries { name type } }
+        }
+      }
+    }
+  }
+}
+"""
+
+# GraphQL tree entry types -> REST contents types used by audit_entries
+ENTRY_TYPES = {"blob": "file", "tree": "dir", "commit": "submodule"}
+
+
+def fetch_repos_graphql(username):
+    """
+    Fetches every public repo of `username` with its metadata, languages and root
+    tree entries in one GraphQL query per 100 repos.
+    Raises on HTTP or GraphQL errors so the caller can fall back to REST.
+    """
+    if not github_scheduler.has_tokens:
+        raise RuntimeError("GitHub GraphQL API requires GITHUB_TOKEN")
+
+    repos = []
+    cursor = None
+    while True:
+        # GraphQL has its own point budget, separate from the REST limit
+        response = github_scheduler.request(
+            "POST", GITHUB_GRAPHQL_URL, api="graphql",
+            json={"query": REPOS_QUERY, "variables": {"login": username, "cursor": cursor}},
+        )
+        response.raise_for_status()
+        payload = response.json()
+
+        if payload.get("errors"):
+            raise RuntimeError("; ".join(err.get("message", str(err)) for err in payload["errors"]))
+
+        user = (payload.get("data") or {}).get("user")
+        if user is None:
+            raise RuntimeError(f"GitHub user '{username}' not found")
+
+        page = user["repositories"]
+        for node in page["nodes"]:
+            tree = node.get("object") or {}
+            repos.append({
+                "name": node["name"],
+                "url": node["url"],
+                "description": node.get("description"),
+                "stars": node.get("stargazerCount", 0),
+                "pushed_at": node.get("pushedAt"),
+                "languages": [lang["name"] for lang in (node.get("languages") or {}).get("nodes", [])],
+                "root_entries": [
+                    {"name": entry["name"], "type": ENTRY_TYPES.get(entry["type"], entry["type"])}
+                    for entry in tree.get("entries", [])
+                ],
+            })
+
+        if not page["pageInfo"]["hasNextPage"]:
+            break
+        cursor = page["pageInfo"]["endCursor"]
+
+    return repos
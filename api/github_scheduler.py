@@ -0,0 +1,261 @@
+import os
+import threading
+import time
+
+
+try:
+    import config
+    from clients import get_github_session, HTTP_TIMEOUT
+    from metrics import github_rate_limit_remaining, github_requests
+except ImportError:
+    import sys
+    sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+    import config
+    from clients import get_github_session, HTTP_TIMEOUT
+    from metrics import github_rate_limit_remaining, github_requests
+
+
+GITHUB_TOKEN = os.getenv("GITHUB_TOKEN") or os.getenv("VITE_GITHUB_TOKEN")
+# Comma-separated pool of tokens (each has its own rate limit); GITHUB_TOKEN is used when unset
+GITHUB_TOKENS = [t.strip() for t in os.getenv("GITHUB_TOKENS", "").split(",") if t.strip()] or (
+    [GITHUB_TOKEN] if GITHUB_TOKEN else []
+)
+GITHUB_MAX_IN_FLIGHT = int(os.getenv("GITHUB_MAX_IN_FLIGHT", os.getenv("GITHUB_POOL_SIZE", "20")))
+# Below this much REST quota left (summed over the pool) audits are skipped, so profile lookups still fit
+GITHUB_AUDIT_RESERVE = int(os.getenv("GITHUB_AUDIT_RESERVE", "100"))
+# How long a profile lookup may wait for a token's limit to reset before it gives up
+GITHUB_RATE_LIMIT_MAX_WAIT = float(os.getenv("GITHUB_RATE_LIMIT_MAX_WAIT", "5"))
+
+# Lower number = served first
+PRIORITIES = {"profile": 0, "audit": 1}
+
+
+class GitHubRateLimited(Exception):
+    def __init__(self, message, reset_at=None):
+        self.reset_at = reset_at
+        super().__init__(message)
+
+
+class TokenBucket:
+    """
+    Quota of one token on one API ("rest" or "graphql"), synced from the X-RateLimit-*
+    headers of every response. Requests still in flight are counted against it (`reserved`)
+    so concurrent callers don't all pick the token with one request left.
+    """
+
+    def __init__(self, token, api):
+        self.token = token
+        self.api = api
+        self.limit = None
+        self.remaining = None
+        self.reset_at = None
+        self.blocked_until = 0.0
+        self.reserved = 0
+
+    def available(self, now):
+        """Requests this token can still start; None while its limit is unknown (no response yet)."""
+        if now < self.blocked_until:
+            return 0
+        if self.reset_at is not None and now >= self.reset_at:
+            # Window rolled over: assume a full budget until the next response says otherwise
+            self.remaining = self.limit
+            self.reset_at = None
+        if self.remaining is None:
+            return None
+        return max(self.remaining - self.reserved, 0)
+
+    def wakes_at(self):
+        return max(self.blocked_until, self.reset_at or 0.0)
+
+    def update(self, response):
+        """Reads the rate-limit headers; returns True if the response was a rate-limit rejection."""
+        headers = response.headers
+        if headers.get("X-RateLimit-Limit"):
+            self.limit = int(headers["X-RateLimit-Limit"])
+        if headers.get("X-RateLimit-Remaining") is not None:
+            self.remaining = int(headers["X-RateLimit-Remaining"])
+        if headers.get("X-RateLimit-Reset"):
+            self.reset_at = float(headers["X-RateLimit-Reset"])
+
+        if response.status_code not in (403, 429):
+            return False
+        retry_after = headers.get("Retry-After")
+        if retry_after is not None:
+            # Secondary (abuse) limit: back off this token for the given time
+            self.blocked_until = time.time() + float(retry_after)
+            return True
+        if self.remaining == 0:
+            self.blocked_until = self.reset_at or time.time() + 60
+            return True
+        return False
+
+    def snapshot(self):
+        return {
+            "limit": self.limit,
+            "remaining": self.remaining,
+            "in_flight": self.reserved,
+            "reset_at": int(self.reset_at) if self.reset_at else None,
+            "blocked_until": int(self.blocked_until) if self.blocked_until > time.time() else None,
+        }
+
+
+class GitHubScheduler:
+    """
+    Runs every GitHub API call:
+    - rotates over a pool of tokens, always picking the one with the most quota left and
+      moving on to the next one when a token gets rate-limited;
+    - caps concurrent calls, and hands free slots to waiting profile lookups before audits;
+    - keeps the last GITHUB_AUDIT_RESERVE requests for profile lookups: audits asking for a
+      token below that raise GitHubRateLimited instead of spending it (the caller skips them).
+    """
+
+    def __init__(self, tokens=None, max_in_flight=GITHUB_MAX_IN_FLIGHT, audit_reserve=GITHUB_AUDIT_RESERVE,
+                 max_wait=GITHUB_RATE_LIMIT_MAX_WAIT):
+        tokens = GITHUB_TOKENS if tokens is None else tokens
+        self.has_tokens = bool(tokens)
+        # Without a token calls go out unauthenticated, on the (shared, per-IP) anonymous limit
+        self.buckets = {api: [TokenBucket(token, api) for token in tokens or [None]] for api in ("rest", "graphql")}
+        self.max_in_flight = max_in_flight
+        self.audit_reserve = audit_reserve
+        self.max_wait = max_wait
+        self._cond = threading.Condition()
+        self.in_flight = 0
+        self.waiting = {priority: 0 for priority in PRIORITIES}
+        self.requests = 0
+        self.rotations = 0
+        self.rejected = 0
+
+    def quota(self, api="rest"):
+        """REST/GraphQL requests the pool can still start; None while any token's limit is unknown."""
+        with self._cond:
+            return self._quota(api, time.time())
+
+    def _quota(self, api, now):
+        total = 0
+        for bucket in self.buckets[api]:
+            available = bucket.available(now)
+            if available is None:
+                return None
+            total += available
+        return total
+
+    def acquire(self, api="rest", priority="profile"):
+        """Waits for a free slot and returns the TokenBucket to use; release() it afterwards."""
+        rank = PRIORITIES[priority]
+        deadline = time.monotonic() + self.max_wait
+        with self._cond:
+            self.waiting[priority] += 1
+            try:
+                while True:
+                    # Higher-priority callers waiting for a slot go first
+                    if self.in_flight >= self.max_in_flight or any(
+                        count for name, count in self.waiting.items() if PRIORITIES[name] < rank
+                    ):
+                        self._cond.wait()
+                        continue
+
+                    now = time.time()
+                    if rank > 0:
+                        quota = self._quota(api, now)
+                        if quota is not None and quota < self.audit_reserve:
+                            self._reject(priority)
+                            raise GitHubRateLimited(
+                                f"GitHub quota low ({quota} left), kept for profile lookups", self._reset_at(api),
+                            )
+
+                    bucket = self._pick(api, now)
+                    if bucket is not None:
+                        bucket.reserved += 1
+                        self.in_flight += 1
+                        self.requests += 1
+                        return bucket
+
+                    # Every token is spent: only profile lookups wait, and only briefly
+                    reset_at = self._reset_at(api)
+                    wait = reset_at - now
+                    if rank > 0 or time.monotonic() + wait > deadline:
+                        self._reject(priority)
+                        raise GitHubRateLimited("GitHub rate limit exhausted for every token", reset_at)
+                    self._cond.wait(max(wait, 0.01))
+            finally:
+                self.waiting[priority] -= 1
+                self._cond.notify_all()
+
+    def release(self, bucket, response=None):
+        """Returns the slot and syncs the bucket from `response`; True if it was a rate-limit rejection."""
+        with self._cond:
+            bucket.reserved -= 1
+            self.in_flight -= 1
+            limited = bucket.update(response) if response is not None else False
+            if limited:
+                self.rotations += 1
+            quota = self._quota(bucket.api, time.time())
+            if quota is not None:
+                github_rate_limit_remaining.labels(bucket.api).set(quota)
+            self._cond.notify_all()
+        return limited
+
+    def request(self, method, url, api="rest", priority="profile", headers=None, timeout=None, **kwargs):
+        """
+        Sends one GitHub API request with a token from the pool. A rate-limited response is
+        retried once per remaining token; when every token is spent GitHubRateLimited is raised.
+        `timeout` (seconds) overrides HTTP_TIMEOUT, for callers with their own deadline.
+        """
+        headers = dict(headers or {})
+        if timeout is not None:
+            connect, read = HTTP_TIMEOUT
+            timeout = (min(connect, timeout), min(read, timeout))
+        response = None
+        for _ in range(len(self.buckets[api])):
+            bucket = self.acquire(api, priority)
+            if bucket.token:
+                headers["Authorization"] = f"Bearer {bucket.token}"
+            try:
+                response = get_github_session().request(
+                    method, url, headers=headers, timeout=timeout or HTTP_TIMEOUT, **kwargs,
+                )
+            except Exception:
+                self.release(bucket)
+                github_requests.labels(priority, "error").inc()
+                raise
+            if not self.release(bucket, response):
+                github_requests.labels(priority, "ok").inc()
+                return response
+            github_requests.labels(priority, "rate_limited").inc()
+        return response
+
+    def _pick(self, api, now):
+        best, best_available = None, -1
+        for bucket in self.buckets[api]:
+            available = bucket.available(now)
+            if available is None:
+                # Unknown limit: try it, the response tells us where it stands
+                available = float("inf")
+            if available > 0 and available > best_available:
+                best, best_available = bucket, available
+        return best
+
+    def _reset_at(self, api):
+        return min(bucket.wakes_at() for bucket in self.buckets[api])
+
+    def _reject(self, priority):
+        self.rejected += 1
+        github_requests.labels(priority, "skipped").inc()
+
+    def stats(self):
+        now = time.time()
+        with self._cond:
+            return {
+                "tokens": len(self.buckets["rest"]) if self.has_tokens else 0,
+                "in_flight": self.in_flight,
+                "waiting": dict(self.waiting),
+                "requests": self.requests,
+                "rotations": self.rotations,
+                "rejected": self.rejected,
+                "quota": {api: self._quota(api, now) for api in self.buckets},
+                # Tokens are listed by position only, never by value
+                "buckets": {api: [bucket.snapshot() for bucket in buckets] for api, buckets in self.buckets.items()},
+            }
+
+
+github_scheduler = GitHubScheduler()
@@ -1,32 +1,44 @@
 from fastapi import FastAPI, File, UploadFile, HTTPException, Form
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, StreamingResponse, Response
 from fastapi.middleware.cors import CORSMiddleware
+import asyncio
 import shutil
 import os
 import json
+import hashlib
 import tempfile
-from dotenv import load_dotenv
-
-
-load_dotenv(os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), '.env'))
-
-
-
-# Imports moved inside handlers to prevent startup crashes
-# try:
-#     from parsing_service import extract_resume_data
-#     from github_get import analyze_github_profile, match_projects, audit_repo
-#     from llm import analyze_career_profile, extract_username_from_links
-# except ImportError:
-#     import sys
-#     sys.path.append(os.path.dirname(os.path.abspath(__file__)))
-#     from parsing_service import extract_resume_data
-#     from github_get import analyze_github_profile, match_projects, audit_repo
-#     from llm import analyze_career_profile, extract_username_from_links
+import time
+from typing import List
+
+
+# Only light modules are imported here so a cold start for any route stays cheap;
+# the pipeline modules (pdfplumber, LLM clients, rapidfuzz) load on first use via
+# match_pipeline() / analysis_pipeline(), and LlamaParse/groq only when actually called.
+try:
+    import config
+except ImportError:
+    import sys
+    sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+    import config
+from executor import run_blocking
+from json_decoder import decode_llm_json, ANALYSIS_SCHEMA, MATCH_SCHEMA, MISMATCH_SCHEMA, SECTION_SCHEMA, SCORES_SCHEMA
+from metrics import MetricsMiddleware, span, json_decodes, match_shortcuts, analysis_sections, render_metrics
+from singleflight import AsyncSingleFlight
+
+# Uploads up to UPLOAD_SPOOL_BYTES stay in memory end to end; larger ones spill to a temp file
+UPLOAD_MAX_BYTES = int(os.getenv("UPLOAD_MAX_BYTES", str(10 * 1024 * 1024)))
+UPLOAD_SPOOL_BYTES = int(os.getenv("UPLOAD_SPOOL_BYTES", str(2 * 1024 * 1024)))
+MATCH_BATCH_CONCURRENCY = int(os.getenv("MATCH_BATCH_CONCURRENCY", "4"))
+MATCH_BATCH_MAX_JDS = int(os.getenv("MATCH_BATCH_MAX_JDS", "20"))
 
 app = FastAPI(title="Resume Analyzer API")
+job_runner = None
+# Identical requests in flight at the same time (double clicks, retries) share one pipeline run
+analysis_flights = AsyncSingleFlight("analyze")
+match_flights = AsyncSingleFlight("match")
 
 from fastapi.requests import Request
+from starlette.formparsers import MultiPartParser
 from fastapi.responses import JSONResponse
 import traceback
 
@@ -38,6 +50,76 @@ async def internal_exception_handler(request: Request, exc: Exception):
     )
 
 
+# Starlette keeps multipart file parts in memory up to this size before rolling them to disk
+MultiPartParser.spool_max_size = UPLOAD_SPOOL_BYTES
+
+
+class UploadTooLarge(Exception):
+    pass
+
+
+class UploadSizeLimitMiddleware:
+    """
+    Rejects request bodies over max_bytes with 413 while they stream in: up front when
+    Content-Length says so, otherwise as soon as the running total crosses the limit
+    (before multipart parsing has buffered the rest of the body).
+    """
+
+    def __init__(self, app, max_bytes):
+        self.app = app
+        self.max_bytes = max_bytes
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or self.max_bytes <= 0:
+            await self.app(scope, receive, send)
+            return
+
+        length = dict(scope["headers"]).get(b"content-length")
+        if length and length.isdigit() and int(length) > self.max_bytes:
+            await self.reject(scope, receive, send)
+            return
+
+        received = 0
+        exceeded = False
+        started = False
+
+        async def limited_receive():
+            nonlocal received, exceeded
+            message = await receive()
+            if message["type"] == "http.request":
+                received += len(message.get("body", b""))
+                if received > self.max_bytes:
+                    exceeded = True
+                    raise UploadTooLarge()
+            return message
+
+        async def guarded_send(message):
+            nonlocal started
+            # Whatever the app answers after the body was cut off is replaced by the 413
+            if exceeded:
+                return
+            started = True
+            await send(message)
+
+        try:
+            await self.app(scope, limited_receive, guarded_send)
+        except Exception:
+            if not exceeded:
+                raise
+
+        if exceeded and not started:
+            await self.reject(scope, receive, send)
+
+    async def reject(self, scope, receive, send):
+        response = JSONResponse(
+            status_code=413,
+            content={"detail": f"Upload exceeds the {self.max_bytes / (1024 * 1024):g} MB limit."},
+        )
+        await response(scope, receive, send)
+
+
+app.add_middleware(UploadSizeLimitMiddleware, max_bytes=UPLOAD_MAX_BYTES)
+
 app.add_middleware(
     CORSMiddleware,
     allow_origins=["*"],
@@ -46,6 +128,284 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Outermost, so rejected uploads (413) are counted too
+app.add_middleware(MetricsMiddleware)
+
+def load_upload(upload):
+    """
+    Returns the uploaded PDF as bytes when it fits in UPLOAD_SPOOL_BYTES (no disk I/O);
+    larger files are copied to a temp PDF on disk and its path is returned instead.
+    """
+    with span("upload_copy"):
+        source = upload.file
+        size = upload.size
+        if size is None:
+            size = source.seek(0, os.SEEK_END)
+        source.seek(0)
+
+        if size <= UPLOAD_SPOOL_BYTES:
+            return source.read()
+
+        with tempfile.NamedTemporaryFile(delete=False, suffix=".pdf") as tmp_file:
+            shutil.copyfileobj(source, tmp_file)
+            return tmp_file.name
+
+
+def release_upload(document):
+    # Only spilled uploads have anything on disk
+    if isinstance(document, str) and os.path.exists(document):
+        os.remove(document)
+
+
+@app.on_event("startup")
+def startup_clients():
+    try:
+        from clients import init_clients
+        init_clients()
+    except Exception as e:
+        # Clients are created lazily on first use if startup fails
+        print(f"⚠️ Client warm-up failed: {e}")
+
+
+@app.on_event("startup")
+def startup_skill_index():
+    try:
+        from skills import get_skill_index
+        get_skill_index()
+    except Exception as e:
+        # Retried on the first request that extracts skills
+        print(f"⚠️ Skills index failed to load: {e}")
+
+
+@app.on_event("startup")
+async def start_job_runner():
+    global job_runner
+    from jobs import JobRunner, job_queue, JOB_WORKERS
+    # JOB_WORKERS=0 only accepts jobs (with JOB_QUEUE_BACKEND=sqlite another process runs them)
+    if JOB_WORKERS > 0:
+        job_runner = JobRunner(job_queue, run_analysis_job)
+        job_runner.start()
+
+
+@app.on_event("shutdown")
+async def stop_job_runner():
+    # Interrupted jobs are lost with the memory queue; the SQLite queue re-runs them
+    if job_runner is not None:
+        await job_runner.stop()
+
+
+@app.on_event("shutdown")
+def shutdown_pipeline():
+    from executor import shutdown_executor, shutdown_process_pool
+    from clients import close_clients
+    shutdown_executor(wait=False)
+    shutdown_process_pool(wait=False)
+    close_clients()
+
+
+def decode_outcome(data, report):
+    if data is None:
+        return "failed"
+    return "repaired" if report["repairs"] else "clean"
+
+
+def parse_analysis_json(analysis_json_str):
+    """
+    Decodes the LLM output (repairing fences, surrounding prose, truncation, smart quotes);
+    falls back to the raw text when nothing usable can be recovered.
+    """
+    with span("json_decode"):
+        data, report = decode_llm_json(analysis_json_str, ANALYSIS_SCHEMA)
+    json_decodes.labels("analysis", decode_outcome(data, report)).inc()
+    if data is None:
+        print(f"Failed to parse JSON from LLM response ({report['reason']}). Returning raw output.")
+        return {
+            "raw_output": analysis_json_str,
+            "error": "Failed to parse JSON response from LLM"
+        }
+    if report["repairs"]:
+        print(f"   🩹 Repaired LLM JSON: {', '.join(report['repairs'])}")
+    return data
+
+
+def match_pipeline():
+    """
+    Imports what /api/match needs (cached in sys.modules after the first call).
+    """
+    try:
+        from parsing_service import extract_resume_data
+        from llm import compare_resume_to_job, explain_mismatch
+    except ImportError as e:
+        raise HTTPException(status_code=500, detail=f"Import Error in Match: {str(e)}")
+    return extract_resume_data, compare_resume_to_job, explain_mismatch
+
+
+def analysis_pipeline():
+    """
+    Imports what /api/analyze needs (cached in sys.modules after the first call).
+    """
+    try:
+        from parsing_service import extract_resume_data
+        from llm import analyze_career_profile, extract_username_from_links
+        from github_get import analyze_github_profile, match_projects, audit_repos
+    except ImportError as e:
+        raise HTTPException(status_code=500, detail=f"Import Error: {str(e)} | CWD: {os.getcwd()}")
+    return (
+        extract_resume_data, analyze_career_profile, extract_username_from_links,
+        analyze_github_profile, match_projects, audit_repos,
+    )
+
+
+async def run_analysis(document, user_context, events=None, timings=None):
+    """
+    Full /api/analyze pipeline: parse -> GitHub lookup -> audits -> LLM.
+    When an asyncio.Queue is passed as `events`, (event, data) tuples are pushed to it
+    as each stage completes and the LLM output is streamed as "token" events.
+    When a dict is passed as `timings`, each stage's wall time (seconds) is recorded in it.
+    """
+    (
+        extract_resume_data, analyze_career_profile, extract_username_from_links,
+        analyze_github_profile, match_projects, audit_repos,
+    ) = analysis_pipeline()
+    from skills import extract_skills
+
+    loop = asyncio.get_running_loop()
+
+    def publish(event, data):
+        # Safe to call from worker threads
+        if events is not None:
+            loop.call_soon_threadsafe(events.put_nowait, (event, data))
+
+    clock = time.perf_counter()
+
+    def lap(stage):
+        nonlocal clock
+        now = time.perf_counter()
+        if timings is not None:
+            timings[stage] = round(now - clock, 3)
+        clock = now
+
+    resume_text, resume_urls = await run_blocking(extract_resume_data, document)
+    lap("parse")
+    publish("parsed", {
+        "characters": len(resume_text),
+        "words": len(resume_text.split()),
+        "lines": resume_text.count("\n") + 1 if resume_text else 0,
+        "urls": resume_urls,
+    })
+
+    with span("skills"):
+        skills = extract_skills(resume_text)
+    publish("skills", skills)
+
+
+    username = extract_username_from_links(resume_urls)
+    verified_projects = []
+    publish("username", {"username": username})
+
+    if username:
+        print(f"Detected Username: {username}")
+        gh_data = await run_blocking(analyze_github_profile, username)
+        if gh_data.get('status') == 'success':
+            verified_projects = await run_blocking(match_projects, resume_text, resume_urls, gh_data['repos'])
+            lap("github")
+            publish("projects", [
+                {"name": p['name'], "url": p.get('url'), "stars": p.get('stars'), "match_reason": p['match_reason']}
+                for p in verified_projects
+            ])
+
+            def on_audit(index, audit):
+                publish("audit", {"index": index, "name": verified_projects[index]['name'], "audit": audit})
+
+            # Run Audit
+            audits = await run_blocking(audit_repos, verified_projects, username, on_result=on_audit)
+            for project, audit in zip(verified_projects, audits):
+                project['audit'] = audit
+            lap("audit")
+        else:
+            lap("github")
+            print(f"GitHub Error: {gh_data.get('message')}")
+            publish("projects", [])
+
+
+    on_token = None
+    if events is not None:
+        def on_token(text):
+            if text is None:
+                publish("token_reset", {})
+            else:
+                publish("token", {"text": text})
+
+    analysis = await analyze_text(
+        resume_text, verified_projects, user_context, analyze_career_profile, on_token, publish,
+    )
+    analysis["skills"] = skills
+    lap("llm")
+    return analysis
+
+
+async def analyze_text(resume_text, verified_projects, user_context, analyze_career_profile, on_token=None,
+                       publish=None):
+    """
+    Section-level re-analysis (section_analysis): when an earlier upload left feedback for some
+    of this resume's sections, only the changed sections go to the LLM (one small prompt each,
+    concurrently) while a short prompt recomputes only the scores, and the cached feedback and
+    profile (summary, strengths, ...) fill in the rest. First uploads, heavily edited resumes and
+    SECTION_ANALYSIS=off run the full prompt, whose answer then seeds the cache.
+    """
+    from section_analysis import (
+        segment_resume, analysis_context, plan_sections, seed_sections, merge_analysis, section_report,
+        store_section,
+    )
+    from llm import analyze_section, score_profile
+
+    sections = segment_resume(resume_text)
+    context = analysis_context(user_context)
+    cached, profile, changed_share, incremental = plan_sections(sections, context, verified_projects)
+
+    if incremental:
+        reanalyzed = [index for index, feedback in enumerate(cached) if feedback is None]
+        print(f"   ♻️ Re-analyzing {len(reanalyzed)} of {len(sections)} resume sections "
+              f"({changed_share:.0%} of the text changed)")
+        if publish is not None:
+            publish("sections", {"reused": len(sections) - len(reanalyzed), "reanalyzed": len(reanalyzed)})
+        open_improvements = {
+            section["title"]: feedback for section, feedback in zip(sections, cached) if feedback is not None
+        }
+        answers = await asyncio.gather(
+            run_blocking(score_profile, resume_text, verified_projects, user_context, open_improvements),
+            *(run_blocking(analyze_section, sections[index], user_context) for index in reanalyzed),
+        )
+        scores = parse_section_json(answers[0], SCORES_SCHEMA, "scores")
+        feedback = list(cached)
+        for index, answer in zip(reanalyzed, answers[1:]):
+            data = parse_section_json(answer, SECTION_SCHEMA, "section")
+            if data is not None:
+                feedback[index] = [item for item in data["detailed_improvements"] if isinstance(item, dict)]
+                store_section(sections, index, context, feedback[index])
+
+        if scores is not None and all(items is not None for items in feedback):
+            analysis_sections.labels("reused").inc(len(sections) - len(reanalyzed))
+            analysis_sections.labels("reanalyzed").inc(len(reanalyzed))
+            return merge_analysis(scores, profile, sections, feedback, set(reanalyzed))
+        print("   ⚠️ Section re-analysis incomplete, running the full analysis")
+
+    analysis_json_str = await run_blocking(analyze_career_profile, resume_text, verified_projects, user_context, on_token)
+    analysis = parse_analysis_json(analysis_json_str)
+    if "error" not in analysis:
+        seed_sections(sections, context, verified_projects, analysis)
+        analysis["section_analysis"] = section_report(sections, "full")
+    analysis_sections.labels("full").inc(len(sections))
+    return analysis
+
+
+def parse_section_json(text, schema, kind):
+    with span("json_decode"):
+        data, report = decode_llm_json(text, schema)
+    json_decodes.labels(kind, decode_outcome(data, report)).inc()
+    return data if data is not None and "error" not in data else None
+
+
 @app.post("/api/analyze")
 async def analyze_resume(
     file: UploadFile = File(...),
@@ -62,89 +422,217 @@ async def analyze_resume(
 
 
 
-    with tempfile.NamedTemporaryFile(delete=False, suffix=".pdf") as tmp_file:
-        shutil.copyfileobj(file.file, tmp_file)
-        tmp_path = tmp_file.name
+    document = await run_blocking(load_upload, file)
+    leader = False
 
     try:
         print(f"Processing file: {file.filename}")
 
-
-
-        try:
-            import sys
-            import os
-            # Ensure 'api' folder is in the path so we can import sibling modules
-            sys.path.append(os.path.dirname(os.path.abspath(__file__)))
-
-            from parsing_service import extract_resume_data
-            from llm import analyze_career_profile, extract_username_from_links
-            from github_get import analyze_github_profile, match_projects, audit_repo
-        except ImportError as e:
-            raise HTTPException(status_code=500, detail=f"Import Error: {str(e)} | CWD: {os.getcwd()} | Path: {sys.path}")
-
-        resume_text, resume_urls = extract_resume_data(tmp_path)
-
-
-        username = extract_username_from_links(resume_urls)
-        verified_projects = []
-
-        if username:
-            print(f"Detected Username: {username}")
-            gh_data = analyze_github_profile(username)
-            if gh_data.get('status') == 'success':
-                verified_projects = match_projects(resume_text, resume_urls, gh_data['repos'])
-                # Run Audit
-                for project in verified_projects:
-                    audit = audit_repo(project['name'], username)
-                    project['audit'] = audit
-            else:
-                print(f"GitHub Error: {gh_data.get('message')}")
-
-
-
         user_context = {
             "category": job_category,
             "role": job_role,
             "level": experience_level
         }
-        analysis_json_str = analyze_career_profile(resume_text, verified_projects, user_context)
+        key = (await run_blocking(document_hash, document), job_category, job_role, experience_level)
+        flight, leader = analysis_flights.join(key, lambda: release_after(run_analysis(document, user_context), document))
+        if not leader:
+            print("   🔗 Same resume already being analyzed, waiting for that run")
+        analysis_data = await asyncio.shield(flight)
 
+        return JSONResponse(content=analysis_data)
 
-        try:
+    except Exception as e:
+        print(f"Error processing resume: {str(e)}")
+        raise HTTPException(status_code=500, detail=str(e))
+    finally:
+        # The leader's upload belongs to the shared run, which releases it when done
+        if not leader:
+            await run_blocking(release_upload, document)
 
-            clean_str = analysis_json_str.strip()
-            if clean_str.startswith("```json"):
-                clean_str = clean_str[7:]
-            elif clean_str.startswith("```"):
-                clean_str = clean_str[3:]
 
-            if clean_str.endswith("```"):
-                clean_str = clean_str[:-3]
+def document_hash(document):
+    from parsing_service import hash_pdf
+    return hash_pdf(document)
 
-            analysis_data = json.loads(clean_str.strip())
-        except json.JSONDecodeError:
 
-            print("Failed to parse JSON from LLM response. Returning raw output.")
-            analysis_data = {
-                "raw_output": analysis_json_str,
-                "error": "Failed to parse JSON response from LLM"
-            }
+async def release_after(coro, document):
+    try:
+        return await coro
+    finally:
+        await run_blocking(release_upload, document)
 
-        return JSONResponse(content=analysis_data)
 
-    except Exception as e:
-        print(f"Error processing resume: {str(e)}")
-        raise HTTPException(status_code=500, detail=str(e))
-    finally:
+async def run_analysis_job(document, user_context, timings):
+    return await run_analysis(document, user_context, timings=timings)
+
+
+@app.post("/api/analyze/jobs")
+async def submit_analysis_job(
+    file: UploadFile = File(...),
+    job_category: str = Form(None),
+    job_role: str = Form(None),
+    experience_level: str = Form(None)
+):
+    """
+    Queues a resume analysis and returns 202 with a job id right away; poll
+    GET /api/analyze/jobs/{job_id} for the status and, once done, the same JSON
+    /api/analyze returns plus per-stage timings.
+    """
+    if not file.filename.lower().endswith(".pdf"):
+        raise HTTPException(status_code=400, detail="Only PDF files are supported.")
+
+    from jobs import job_queue
+
+    # Queued jobs outlive this request, so the PDF is held as bytes rather than a temp file
+    document = await file.read()
+    user_context = {
+        "category": job_category,
+        "role": job_role,
+        "level": experience_level
+    }
+    job_id = await run_blocking(job_queue.submit, document, user_context)
+    if job_id is None:
+        raise HTTPException(status_code=503, detail="Job queue is full, try again later.", headers={"Retry-After": "30"})
+
+    if job_runner is not None:
+        job_runner.notify()
+    print(f"Queued job {job_id} for {file.filename}")
+    return JSONResponse(
+        status_code=202,
+        content={"job_id": job_id, "status": "queued", "status_url": f"/api/analyze/jobs/{job_id}"},
+    )
+
+
+@app.get("/api/analyze/jobs/{job_id}")
+async def get_analysis_job(job_id: str):
+    """
+    Job status: queued (with its queue position), running, done (with `result`)
+    or failed (with `error`). `timings` holds seconds spent queued, per stage
+    (parse, github, audit, llm) and in total.
+    """
+    from jobs import job_queue
+
+    job = await run_blocking(job_queue.get, job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Unknown or expired job id.")
+    return JSONResponse(content=job)
+
+
+def format_sse(event, data):
+    return f"event: {event}\ndata: {json.dumps(data, default=str)}\n\n"
+
+
+@app.post("/api/analyze/stream")
+async def analyze_resume_stream(
+    file: UploadFile = File(...),
+    job_category: str = Form(None),
+    job_role: str = Form(None),
+    experience_level: str = Form(None)
+):
+    """
+    Streaming variant of /api/analyze (Server-Sent Events).
+    Emits parsed, username, projects, audit (one per repo), token (LLM output chunks)
+    and finally result, whose data is the same JSON /api/analyze returns.
+    """
+    if not file.filename.lower().endswith(".pdf"):
+        raise HTTPException(status_code=400, detail="Only PDF files are supported.")
+
+    document = await run_blocking(load_upload, file)
+    user_context = {
+        "category": job_category,
+        "role": job_role,
+        "level": experience_level
+    }
+    events = asyncio.Queue()
 
-        if os.path.exists(tmp_path):
-            os.remove(tmp_path)
+    async def produce():
+        try:
+            result = await run_analysis(document, user_context, events)
+            events.put_nowait(("result", result))
+        except Exception as e:
+            print(f"Error processing resume: {str(e)}")
+            events.put_nowait(("error", {"detail": str(e)}))
+        finally:
+            await run_blocking(release_upload, document)
+            events.put_nowait(None)
+
+    async def stream():
+        task = asyncio.create_task(produce())
+        try:
+            while True:
+                item = await events.get()
+                if item is None:
+                    break
+                yield format_sse(*item)
+        finally:
+            if not task.done():
+                task.cancel()
+
+    return StreamingResponse(
+        stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
 
 @app.get("/")
 def read_root():
     return {"message": "Resume Analyzer API is running. POST to /analyze to parse a resume."}
 
+@app.get("/metrics")
+@app.get("/api/metrics")
+def read_metrics():
+    """
+    Prometheus metrics: per-stage latency histograms, LLM provider/fallback counters,
+    JSON decode outcomes, GitHub calls by priority and the GitHub quota left in the token pool.
+    """
+    body, content_type = render_metrics()
+    return Response(content=body, media_type=content_type)
+
+@app.get("/api/stats")
+def read_stats():
+    """
+    Cache hit/miss counters, PDF job CPU time, LLM provider, job queue, request coalescing and
+    GitHub token pool and skills index stats for the running worker.
+    """
+    from parsing_service import parse_cache, pdf_job_stats
+    from github_cache import github_cache
+    from github_scheduler import github_scheduler
+    from llm_cache import llm_cache
+    from llm import llm_router
+    from compaction import compaction_stats
+    from jobs import job_queue
+    from github_get import profile_flights, audit_flights
+    from skills import get_skill_index
+    from section_analysis import section_cache
+
+    return {
+        "parse_cache": parse_cache.stats(),
+        "pdf_jobs": pdf_job_stats.stats(),
+        "github_cache": github_cache.stats(),
+        "github_scheduler": github_scheduler.stats(),
+        "llm_cache": llm_cache.stats(),
+        "section_cache": section_cache.stats(),
+        "llm_router": llm_router.stats(),
+        "compaction": compaction_stats.stats(),
+        "jobs": job_queue.stats(),
+        "skills": get_skill_index().stats(),
+        "coalescing": {
+            "analyze": analysis_flights.stats(),
+            "match": match_flights.stats(),
+            "github_profile": profile_flights.stats(),
+            "github_audit": audit_flights.stats(),
+        },
+    }
+
+def parse_match_json(match_json_str):
+    with span("json_decode"):
+        data, report = decode_llm_json(match_json_str, MATCH_SCHEMA)
+    json_decodes.labels("match", decode_outcome(data, report)).inc()
+    if data is None:
+        return {"raw": match_json_str, "error": "JSON Parse Error"}
+    return data
+
+
 @app.post("/api/match")
 async def match_resume(file: UploadFile = File(...), jd: str = Form(...)):
     """
@@ -154,54 +642,171 @@ async def match_resume(file: UploadFile = File(...), jd: str = Form(...)):
     if not file.filename.lower().endswith(".pdf"):
         raise HTTPException(status_code=400, detail="Only PDF files are supported.")
 
-    with tempfile.NamedTemporaryFile(delete=False, suffix=".pdf") as tmp_file:
-        shutil.copyfileobj(file.file, tmp_file)
-        tmp_path = tmp_file.name
+    document = await run_blocking(load_upload, file)
+    leader = False
 
     try:
+        key = (await run_blocking(document_hash, document), hashlib.sha256(jd.encode("utf-8")).hexdigest())
+        flight, leader = match_flights.join(key, lambda: release_after(run_match(document, jd), document))
+        if not leader:
+            print("   🔗 Same resume and JD already being matched, waiting for that run")
+        match_data = await asyncio.shield(flight)
 
+        return JSONResponse(content=match_data)
 
-        try:
-            import sys
-            import os
-            # Ensure 'api' folder is in the path so we can import sibling modules
-            sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+    finally:
+        if not leader:
+            await run_blocking(release_upload, document)
 
-            from parsing_service import extract_resume_data
-            from llm import compare_resume_to_job
-        except ImportError as e:
-            raise HTTPException(status_code=500, detail=f"Import Error in Match: {str(e)}")
 
-        resume_text, _ = extract_resume_data(tmp_path)
+async def run_match(document, jd):
+    extract_resume_data, compare_resume_to_job, explain_mismatch = match_pipeline()
 
+    resume_text, _ = await run_blocking(extract_resume_data, document)
+    return await match_text(resume_text, jd, compare_resume_to_job, explain_mismatch)
 
 
+async def match_text(resume_text, jd, compare_resume_to_job, explain_mismatch, resume_terms=None,
+                     resume_skills=None):
+    """
+    Keyword screen first (keyword_match, a few ms): with KEYWORD_MISMATCH_MODE=short or skip,
+    clear mismatches get their answer from the local score plus (short) a short prompt for the
+    recommendation; with the default log mode they are only counted. Everything else runs the
+    full match prompt, and its answer also carries the screen's result as `keyword_match`. Both carry the canonical skills of
+    either side as `skills`.
+    """
+    from keyword_match import score_keywords, is_clear_mismatch, skips_full_prompt, mismatch_result, KEYWORD_MISMATCH_MODE
+    from skills import compare_skills
+
+    with span("keyword_match"):
+        report = score_keywords(resume_terms or resume_text, jd)
+    with span("skills"):
+        skills = compare_skills(resume_text if resume_skills is None else resume_skills, jd)
+
+    report["clear_mismatch"] = is_clear_mismatch(report)
+    if report["clear_mismatch"] and not skips_full_prompt(report):
+        print(f"   🔎 Keyword screen: clear mismatch ({report['match_score']}%), running the full prompt anyway (log mode)")
+        match_shortcuts.labels(KEYWORD_MISMATCH_MODE).inc()
+    elif report["clear_mismatch"]:
+        print(f"   ⚡ Keyword screen: clear mismatch ({report['match_score']}%), skipping the full match prompt")
+        match_shortcuts.labels(KEYWORD_MISMATCH_MODE).inc()
+        explanation = None
+        if KEYWORD_MISMATCH_MODE == "short":
+            explanation = parse_mismatch_json(await run_blocking(explain_mismatch, resume_text, jd, report))
+        result = mismatch_result(report, explanation)
+        result["skills"] = skills
+        return result
+
+    match_json_str = await run_blocking(compare_resume_to_job, resume_text, jd)
+    match_data = parse_match_json(match_json_str)
+    match_data["keyword_match"] = report
+    match_data["skills"] = skills
+    return match_data
+
+
+def parse_mismatch_json(text):
+    with span("json_decode"):
+        data, report = decode_llm_json(text, MISMATCH_SCHEMA)
+    json_decodes.labels("mismatch", decode_outcome(data, report)).inc()
+    # Without an explanation the locally written recommendation is used
+    return data if data is not None and "error" not in data else None
+
+
+@app.post("/api/match/quick")
+async def match_resume_quick(file: UploadFile = File(...), jd: str = Form(...)):
+    """
+    Keyword-only match in milliseconds after parsing, no LLM call: provisional match_score,
+    matching_keywords and missing_keywords (most important first), and whether /api/match
+    would treat the pair as a clear mismatch, plus the canonical skills of either side.
+    """
+    if not file.filename.lower().endswith(".pdf"):
+        raise HTTPException(status_code=400, detail="Only PDF files are supported.")
 
-        # Lazy load already handled above
-        # if 'compare_resume_to_job' not in globals():
-        #      import sys
-        #      import os
-        #      sys.path.append(os.path.dirname(os.path.abspath(__file__)))
-        #      from llm import compare_resume_to_job
+    from parsing_service import extract_resume_data
+    from keyword_match import score_keywords, is_clear_mismatch
+    from skills import compare_skills
 
-        match_json_str = compare_resume_to_job(resume_text, jd)
+    document = await run_blocking(load_upload, file)
+    try:
+        resume_text, _ = await run_blocking(extract_resume_data, document)
+        with span("keyword_match"):
+            report = score_keywords(resume_text, jd)
+        report["clear_mismatch"] = is_clear_mismatch(report)
+        with span("skills"):
+            report["skills"] = compare_skills(resume_text, jd)
+        return JSONResponse(content=report)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+    finally:
+        await run_blocking(release_upload, document)
 
+@app.post("/api/match/batch")
+async def match_resume_batch(
+    file: UploadFile = File(...),
+    jds: List[str] = Form(...),
+    stream: bool = Form(False)
+):
+    """
+    Matches one PDF resume against several Job Descriptions (repeat the `jds` form field).
+    The resume is parsed once and the per-JD LLM calls run concurrently (MATCH_BATCH_CONCURRENCY).
+    Returns {"results": [...]} in input order, each entry carrying its own status/error.
+    With stream=true, results are sent as NDJSON lines in completion order instead.
+    """
+    if not file.filename.lower().endswith(".pdf"):
+        raise HTTPException(status_code=400, detail="Only PDF files are supported.")
+    if not jds:
+        raise HTTPException(status_code=400, detail="At least one job description is required.")
+    if len(jds) > MATCH_BATCH_MAX_JDS:
+        raise HTTPException(status_code=400, detail=f"At most {MATCH_BATCH_MAX_JDS} job descriptions per batch.")
 
-        try:
-             clean_str = match_json_str.strip()
-             if clean_str.startswith("```json"): clean_str = clean_str[7:]
-             if clean_str.endswith("```"): clean_str = clean_str[:-3]
-             match_data = json.loads(clean_str.strip())
-        except:
-             match_data = {"raw": match_json_str, "error": "JSON Parse Error"}
+    document = await run_blocking(load_upload, file)
 
-        return JSONResponse(content=match_data)
+    try:
+        extract_resume_data, compare_resume_to_job, explain_mismatch = match_pipeline()
+        from keyword_match import ResumeTerms
+        from skills import extract_skills
 
+        resume_text, _ = await run_blocking(extract_resume_data, document)
+        resume_terms = ResumeTerms(resume_text)
+        resume_skills = extract_skills(resume_text)
     except Exception as e:
+        await run_blocking(release_upload, document)
         raise HTTPException(status_code=500, detail=str(e))
-    finally:
-        if os.path.exists(tmp_path):
-            os.remove(tmp_path)
+
+    await run_blocking(release_upload, document)
+
+    semaphore = asyncio.Semaphore(MATCH_BATCH_CONCURRENCY)
+
+    async def match_one(index, jd):
+        async with semaphore:
+            try:
+                match_data = await match_text(
+                    resume_text, jd, compare_resume_to_job, explain_mismatch, resume_terms, resume_skills,
+                )
+                if "error" in match_data:
+                    return {"index": index, "status": "error", "error": match_data.get("error"), "result": match_data}
+                return {"index": index, "status": "success", "result": match_data}
+            except Exception as e:
+                return {"index": index, "status": "error", "error": str(e)}
+
+    tasks = [asyncio.create_task(match_one(i, jd)) for i, jd in enumerate(jds)]
+
+    if not stream:
+        results = await asyncio.gather(*tasks)
+        return JSONResponse(content={"count": len(results), "results": results})
+
+    async def stream_results():
+        try:
+            for next_done in asyncio.as_completed(tasks):
+                result = await next_done
+                yield json.dumps(result, default=str) + "\n"
+        finally:
+            for task in tasks:
+                task.cancel()
+
+    return StreamingResponse(stream_results(), media_type="application/x-ndjson")
 
 if __name__ == "__main__":
     import uvicorn
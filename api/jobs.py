@@ -0,0 +1,391 @@
+import asyncio
+import json
+import os
+import sqlite3
+import threading
+import time
+import uuid
+from collections import OrderedDict, deque
+
+
+try:
+    import config
+    from executor import run_blocking
+except ImportError:
+    import sys
+    sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+    import config
+    from executor import run_blocking
+
+
+# "memory" (default) or "sqlite" (queued jobs and results survive restarts)
+JOB_QUEUE_BACKEND = os.getenv("JOB_QUEUE_BACKEND", "memory").lower()
+JOB_QUEUE_DB = os.getenv("JOB_QUEUE_DB", "/tmp/fitforworks/jobs.sqlite3")
+JOB_WORKERS = int(os.getenv("JOB_WORKERS", "4"))
+# Submissions beyond this many queued jobs are rejected (HTTP 503)
+JOB_QUEUE_MAX = int(os.getenv("JOB_QUEUE_MAX", "50"))
+# Finished jobs (result or error) are kept this long for the status endpoint
+JOB_RESULT_TTL = int(os.getenv("JOB_RESULT_TTL", "3600"))
+# A running job not finished within this many seconds is assumed lost (crashed worker)
+# and is picked up again, up to JOB_MAX_ATTEMPTS runs in total
+JOB_LEASE_SECONDS = int(os.getenv("JOB_LEASE_SECONDS", "600"))
+JOB_MAX_ATTEMPTS = int(os.getenv("JOB_MAX_ATTEMPTS", "2"))
+JOB_POLL_INTERVAL = float(os.getenv("JOB_POLL_INTERVAL", "1.0"))
+
+QUEUED, RUNNING, DONE, FAILED = "queued", "running", "done", "failed"
+
+
+def new_job_id():
+    return uuid.uuid4().hex
+
+
+class MemoryJobQueue:
+    """
+    In-process job queue holding each job's PDF bytes until a worker claims it.
+    Jobs are lost when the process exits.
+
+    Any queue backend provides submit / claim / complete / fail / get / stats:
+    claim() hands the oldest queued job (with its document) to one worker and
+    marks it running; get() returns the public view without the document.
+    """
+
+    # Only this process submits, so the runner never needs to poll it
+    shared = False
+
+    def __init__(self, max_queued=JOB_QUEUE_MAX, result_ttl=JOB_RESULT_TTL):
+        self.max_queued = max_queued
+        self.result_ttl = result_ttl
+        self._jobs = OrderedDict()
+        self._pending = deque()
+        self._lock = threading.Lock()
+        self.submitted = 0
+        self.rejected = 0
+        self.completed = 0
+        self.failed = 0
+
+    def submit(self, document, params):
+        """Returns the new job id, or None when the queue is full."""
+        with self._lock:
+            self._purge()
+            if len(self._pending) >= self.max_queued:
+                self.rejected += 1
+                return None
+            job_id = new_job_id()
+            self._jobs[job_id] = {
+                "job_id": job_id, "status": QUEUED, "params": params, "document": document,
+                "result": None, "error": None, "timings": {}, "attempts": 0,
+                "created_at": time.time(), "started_at": None, "finished_at": None,
+            }
+            self._pending.append(job_id)
+            self.submitted += 1
+            return job_id
+
+    def claim(self):
+        with self._lock:
+            while self._pending:
+                job = self._jobs.get(self._pending.popleft())
+                if job is None:
+                    continue
+                job["status"] = RUNNING
+                job["started_at"] = time.time()
+                job["attempts"] += 1
+                claimed = dict(job)
+                # The worker owns the document from here on
+                job["document"] = None
+                return claimed
+            return None
+
+    def complete(self, job_id, result, timings):
+        self._finish(job_id, DONE, result, None, timings)
+
+    def fail(self, job_id, error, timings):
+        self._finish(job_id, FAILED, None, error, timings)
+
+    def _finish(self, job_id, status, result, error, timings):
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if job is None:
+                return
+            job.update(status=status, result=result, error=error, timings=timings, finished_at=time.time())
+            self._jobs.move_to_end(job_id)
+            if status == DONE:
+                self.completed += 1
+            else:
+                self.failed += 1
+
+    def get(self, job_id):
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if job is None:
+                return None
+            view = {k: v for k, v in job.items() if k not in ("document", "params")}
+            if job["status"] == QUEUED:
+                view["position"] = self._pending.index(job_id) + 1
+            return view
+
+    def _purge(self):
+        # Finished jobs are moved to the end in completion order, so expired ones are scanned
+        # from the front until the first unfinished or still-fresh job
+        cutoff = time.time() - self.result_ttl
+        for job_id in list(self._jobs):
+            job = self._jobs[job_id]
+            if job["finished_at"] is None:
+                continue
+            if job["finished_at"] > cutoff:
+                break
+            del self._jobs[job_id]
+
+    def stats(self):
+        with self._lock:
+            running = sum(1 for job in self._jobs.values() if job["status"] == RUNNING)
+            return {
+                "backend": "memory",
+                "queued": len(self._pending),
+                "running": running,
+                "submitted": self.submitted,
+                "rejected": self.rejected,
+                "completed": self.completed,
+                "failed": self.failed,
+            }
+
+
+class SQLiteJobQueue:
+    """
+    Job queue in a single SQLite file, shared by every worker process on the host.
+    Queued jobs (including the uploaded PDF) and results survive restarts; a job whose
+    worker died mid-run is claimed again once its lease expires.
+    """
+
+    # Other processes can queue jobs, so idle runners poll it every JOB_POLL_INTERVAL
+    shared = True
+
+    def __init__(self, path, max_queued=JOB_QUEUE_MAX, result_ttl=JOB_RESULT_TTL,
+                 lease_seconds=JOB_LEASE_SECONDS, max_attempts=JOB_MAX_ATTEMPTS):
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self.path = path
+        self.max_queued = max_queued
+        self.result_ttl = result_ttl
+        self.lease_seconds = lease_seconds
+        self.max_attempts = max_attempts
+        self._lock = threading.Lock()
+        # Autocommit mode so claim() can take the write lock up front with BEGIN IMMEDIATE
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None, timeout=30)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS jobs ("
+            "job_id TEXT PRIMARY KEY, status TEXT NOT NULL, params TEXT NOT NULL, document BLOB, "
+            "result TEXT, error TEXT, timings TEXT, attempts INTEGER NOT NULL DEFAULT 0, "
+            "created_at REAL NOT NULL, started_at REAL, finished_at REAL)"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS jobs_status ON jobs (status, created_at)")
+        self.submitted = 0
+        self.rejected = 0
+
+    def submit(self, document, params):
+        job_id = new_job_id()
+        with self._lock:
+            self._purge()
+            queued = self._conn.execute("SELECT COUNT(*) FROM jobs WHERE status = ?", (QUEUED,)).fetchone()[0]
+            if queued >= self.max_queued:
+                self.rejected += 1
+                return None
+            self._conn.execute(
+                "INSERT INTO jobs (job_id, status, params, document, created_at) VALUES (?, ?, ?, ?, ?)",
+                (job_id, QUEUED, json.dumps(params), sqlite3.Binary(document), time.time()),
+            )
+            self.submitted += 1
+        return job_id
+
+    def claim(self):
+        now = time.time()
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                # Lost jobs out of attempts are failed rather than retried forever
+                self._conn.execute(
+                    "UPDATE jobs SET status = ?, error = ?, document = NULL, finished_at = ? "
+                    "WHERE status = ? AND started_at < ? AND attempts >= ?",
+                    (FAILED, "Job was interrupted too many times", now, RUNNING,
+                     now - self.lease_seconds, self.max_attempts),
+                )
+                row = self._conn.execute(
+                    "SELECT job_id, params, document, attempts, created_at FROM jobs "
+                    "WHERE status = ? OR (status = ? AND started_at < ?) "
+                    "ORDER BY created_at LIMIT 1",
+                    (QUEUED, RUNNING, now - self.lease_seconds),
+                ).fetchone()
+                if row is None:
+                    self._conn.execute("COMMIT")
+                    return None
+                job_id, params, document, attempts, created_at = row
+                self._conn.execute(
+                    "UPDATE jobs SET status = ?, started_at = ?, attempts = ? WHERE job_id = ?",
+                    (RUNNING, now, attempts + 1, job_id),
+                )
+                self._conn.execute("COMMIT")
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+        return {
+            "job_id": job_id, "status": RUNNING, "params": json.loads(params), "document": bytes(document),
+            "attempts": attempts + 1, "created_at": created_at, "started_at": now,
+        }
+
+    def complete(self, job_id, result, timings):
+        self._finish(job_id, DONE, json.dumps(result, default=str), None, timings)
+
+    def fail(self, job_id, error, timings):
+        self._finish(job_id, FAILED, None, error, timings)
+
+    def _finish(self, job_id, status, result, error, timings):
+        with self._lock:
+            self._conn.execute(
+                "UPDATE jobs SET status = ?, result = ?, error = ?, timings = ?, document = NULL, "
+                "finished_at = ? WHERE job_id = ?",
+                (status, result, error, json.dumps(timings), time.time(), job_id),
+            )
+
+    def get(self, job_id):
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT status, result, error, timings, attempts, created_at, started_at, finished_at "
+                "FROM jobs WHERE job_id = ?", (job_id,)
+            ).fetchone()
+            if row is None:
+                return None
+            status, result, error, timings, attempts, created_at, started_at, finished_at = row
+            view = {
+                "job_id": job_id, "status": status,
+                "result": json.loads(result) if result else None, "error": error,
+                "timings": json.loads(timings) if timings else {}, "attempts": attempts,
+                "created_at": created_at, "started_at": started_at, "finished_at": finished_at,
+            }
+            if status == QUEUED:
+                view["position"] = self._conn.execute(
+                    "SELECT COUNT(*) FROM jobs WHERE status = ? AND created_at <= ?", (QUEUED, created_at)
+                ).fetchone()[0]
+            return view
+
+    def _purge(self):
+        self._conn.execute(
+            "DELETE FROM jobs WHERE finished_at IS NOT NULL AND finished_at < ?",
+            (time.time() - self.result_ttl,),
+        )
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+    def stats(self):
+        with self._lock:
+            counts = dict(self._conn.execute("SELECT status, COUNT(*) FROM jobs GROUP BY status").fetchall())
+        return {
+            "backend": "sqlite",
+            "path": self.path,
+            "queued": counts.get(QUEUED, 0),
+            "running": counts.get(RUNNING, 0),
+            "submitted": self.submitted,
+            "rejected": self.rejected,
+            # Finished jobs still within JOB_RESULT_TTL (shared with other processes)
+            "completed": counts.get(DONE, 0),
+            "failed": counts.get(FAILED, 0),
+        }
+
+
+class JobRunner:
+    """
+    Bounded pool of at most `workers` concurrent jobs pulled from `queue`, each running
+    `handler(document, params, timings)` (async, returns the result dict).
+    A single dispatcher claims jobs while a worker slot is free; when the queue is empty
+    it sleeps until notify() (called after submit) or, for a queue shared with other
+    processes, until the next poll.
+    The handler fills `timings` with per-stage seconds; the runner adds the time the
+    job spent queued and its total run time.
+    """
+
+    def __init__(self, queue, handler, workers=JOB_WORKERS, poll_interval=JOB_POLL_INTERVAL):
+        self.queue = queue
+        self.handler = handler
+        self.workers = workers
+        # Only a shared queue (sqlite) can receive jobs this process wasn't notified of
+        self.poll_interval = poll_interval if getattr(queue, "shared", False) else None
+        self._dispatcher = None
+        self._running = set()
+        self._slots = None
+        self._wake = None
+
+    def start(self):
+        if self._dispatcher is not None:
+            return
+        self._wake = asyncio.Event()
+        self._slots = asyncio.Semaphore(self.workers)
+        self._dispatcher = asyncio.create_task(self._dispatch())
+        print(f"🧵 Job runner started ({self.workers} workers, {JOB_QUEUE_BACKEND} queue)")
+
+    async def stop(self):
+        if self._dispatcher is None:
+            return
+        tasks = [self._dispatcher, *self._running]
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        self._dispatcher = None
+        self._running.clear()
+
+    def notify(self):
+        if self._wake is not None:
+            self._wake.set()
+
+    async def _dispatch(self):
+        while True:
+            await self._slots.acquire()
+            job = await self._next_job()
+            task = asyncio.create_task(self._run(job))
+            self._running.add(task)
+            task.add_done_callback(self._finished)
+
+    def _finished(self, task):
+        self._running.discard(task)
+        self._slots.release()
+
+    async def _next_job(self):
+        while True:
+            # Cleared before claiming so a submit landing during the claim still wakes us
+            self._wake.clear()
+            try:
+                job = await run_blocking(self.queue.claim)
+            except Exception as e:
+                print(f"⚠️ Job claim failed: {e}")
+                await asyncio.sleep(JOB_POLL_INTERVAL)
+                continue
+            if job is not None:
+                return job
+            try:
+                await asyncio.wait_for(self._wake.wait(), self.poll_interval)
+            except asyncio.TimeoutError:
+                pass
+
+    async def _run(self, job):
+        job_id = job["job_id"]
+        timings = {"queued": round(job["started_at"] - job["created_at"], 3)}
+        start = time.perf_counter()
+        print(f"▶️ Job {job_id} started (attempt {job['attempts']})")
+        try:
+            result = await self.handler(job["document"], job["params"], timings)
+        except Exception as e:
+            timings["total"] = round(time.perf_counter() - start, 3)
+            print(f"❌ Job {job_id} failed: {e}")
+            await run_blocking(self.queue.fail, job_id, str(e), timings)
+            return
+        timings["total"] = round(time.perf_counter() - start, 3)
+        await run_blocking(self.queue.complete, job_id, result, timings)
+        print(f"✅ Job {job_id} done in {timings['total']}s")
+
+
+def _make_queue():
+    if JOB_QUEUE_BACKEND == "sqlite":
+        return SQLiteJobQueue(JOB_QUEUE_DB)
+    return MemoryJobQueue()
+
+
+job_queue = _make_queue()
@@ -0,0 +1,373 @@
+import json
+import re
+
+
+NUMBER = (int, float)
+NULLABLE_STR = (str, type(None))
+
+# key -> (allowed types, required)
+ANALYSIS_SCHEMA = {
+    "ats_score": (NUMBER, True),
+    "domain_mismatch": ((bool,), False),
+    "domain_mismatch_advice": (NULLABLE_STR, False),
+    "summary": ((str,), False),
+    "strengths": ((list,), False),
+    "improvements": ((list,), False),
+    "detailed_improvements": ((list,), False),
+    "github_feedback": (NULLABLE_STR, False),
+    "content_quality": (NUMBER, False),
+    "ats_structure": (NUMBER, False),
+    "job_optimization": (NUMBER, False),
+    "writing_quality": (NUMBER, False),
+    "application_ready": (NUMBER, False),
+}
+
+MATCH_SCHEMA = {
+    "match_score": (NUMBER, True),
+    "potential_score": (NUMBER, False),
+    "recommendation": ((str,), False),
+    "missing_keywords": ((list,), False),
+    "matching_keywords": ((list,), False),
+    "improvements": ((list,), False),
+    "detailed_improvements": ((list,), False),
+    "gap_analysis": ((dict,), False),
+    "tailoring_advice": ((list,), False),
+}
+
+# Short prompt for clear keyword mismatches (keyword_match / llm.explain_mismatch)
+MISMATCH_SCHEMA = {
+    "recommendation": ((str,), True),
+    "potential_score": (NUMBER, False),
+    "technical_gaps": ((list,), False),
+}
+
+# Section-level re-analysis (section_analysis / llm.analyze_section, llm.score_profile)
+SECTION_SCHEMA = {
+    "detailed_improvements": ((list,), True),
+}
+SCORES_SCHEMA = {
+    key: ANALYSIS_SCHEMA[key]
+    for key in ("ats_score", "content_quality", "ats_structure", "job_optimization", "writing_quality", "application_ready")
+}
+
+MAX_PREAMBLE_CHARS = 600
+MAX_UNKNOWN_KEYS = 4
+
+SMART_QUOTES = {"“", "”", "„", "‟", "″"}
+CLOSERS = {"{": "}", "[": "]"}
+
+
+class HopelessResponse(Exception):
+    """Raised while streaming when the output can't turn into a usable answer."""
+
+
+class _Frame:
+    __slots__ = ("kind", "state", "member_start", "comma", "key", "key_start", "value_start", "value_kind")
+
+    def __init__(self, kind, member_start):
+        self.kind = kind
+        self.state = "key" if kind == "{" else "value_wait"
+        self.member_start = member_start
+        self.comma = None
+        self.key = None
+        self.key_start = None
+        self.value_start = None
+        self.value_kind = None
+
+
+def _coerce(value, types):
+    if isinstance(value, bool) and bool not in types:
+        return value, False
+    if isinstance(value, types):
+        return value, True
+    if types is NUMBER and isinstance(value, str):
+        match = re.match(r"\s*(-?\d+(?:\.\d+)?)", value)
+        if match:
+            number = float(match.group(1))
+            return (int(number) if number.is_integer() else number), True
+    if bool in types and isinstance(value, str) and value.strip().lower() in ("true", "false"):
+        return value.strip().lower() == "true", True
+    if str in types and isinstance(value, NUMBER):
+        return str(value), True
+    return value, False
+
+
+class IncrementalJSONDecoder:
+    """
+    Consumes LLM output chunk by chunk, tracking JSON structure as it arrives.
+
+    - feed() returns False once the response is structurally hopeless (no object after a
+      long preamble, a required field with an unusable type, a different schema, or an
+      object that closed without the required fields) so the caller can re-ask right away.
+    - finish() repairs common defects without another LLM call: code fences and prose
+      around the object, smart quotes used as delimiters, trailing commas, mismatched
+      closers, and truncated output (unterminated strings/arrays/objects are closed and
+      dangling keys or partial literals are dropped). It then validates against the schema.
+    """
+
+    def __init__(self, schema=None, max_preamble=MAX_PREAMBLE_CHARS):
+        self.schema = schema or {}
+        self.required = {key for key, (_, required) in self.schema.items() if required}
+        self.max_preamble = max_preamble
+        self.chars = []
+        self.stack = []
+        self.phase = "preamble"
+        self.in_string = False
+        self.escape = False
+        self.string_smart = False
+        self.preamble = []
+        self.trailing = []
+        self.members = {}
+        self.unknown_keys = 0
+        self.repairs = set()
+        self.hopeless = False
+        self.reason = None
+        self.consumed = 0
+
+    def feed(self, chunk):
+        for ch in chunk:
+            self.consumed += 1
+            self._step(ch)
+            if self.hopeless:
+                return False
+        return True
+
+    def _give_up(self, reason):
+        self.hopeless = True
+        self.reason = reason
+
+    def _step(self, ch):
+        if self.phase == "done":
+            self.trailing.append(ch)
+            return
+
+        if self.phase == "preamble":
+            if ch == "{":
+                self.phase = "object"
+                self.chars.append("{")
+                self.stack.append(_Frame("{", 1))
+            else:
+                self.preamble.append(ch)
+                if len(self.preamble) > self.max_preamble:
+                    self._give_up(f"no JSON object in the first {self.max_preamble} characters")
+            return
+
+        i = len(self.chars)
+
+        if self.in_string:
+            if self.escape:
+                self.escape = False
+                self.chars.append(ch)
+            elif ch == "\\":
+                self.escape = True
+                self.chars.append(ch)
+            elif ch == '"' or (self.string_smart and ch in SMART_QUOTES):
+                self.chars.append('"')
+                self.in_string = False
+                self._string_closed(i)
+            else:
+                self.chars.append(ch)
+            return
+
+        frame = self.stack[-1]
+
+        if ch == '"' or ch in SMART_QUOTES:
+            smart = ch != '"'
+            if smart:
+                self.repairs.add("smart_quotes")
+            if frame.kind == "{" and frame.state == "key":
+                frame.state = "in_key"
+                frame.key_start = i + 1
+            else:
+                self._begin_value(frame, i, "string")
+            self.in_string = True
+            self.string_smart = smart
+            self.chars.append('"')
+            return
+
+        if ch.isspace():
+            self.chars.append(ch)
+            return
+
+        if ch in "{[":
+            self._begin_value(frame, i, "container")
+            self.chars.append(ch)
+            self.stack.append(_Frame(ch, i + 1))
+            return
+
+        if ch in "}]":
+            expected = CLOSERS[frame.kind]
+            if ch != expected:
+                self.repairs.add("mismatched_bracket")
+                ch = expected
+            if frame.state in ("value_wait", "key") and frame.comma is not None:
+                self.chars[frame.comma] = ""
+                self.repairs.add("trailing_comma")
+            self._end_member(frame, i)
+            self.chars.append(ch)
+            self.stack.pop()
+            if not self.stack:
+                self.phase = "done"
+                self._check_complete()
+            return
+
+        if ch == ",":
+            self._end_member(frame, i)
+            frame.state = "key" if frame.kind == "{" else "value_wait"
+            frame.comma = i
+            frame.member_start = i
+            self.chars.append(ch)
+            return
+
+        if ch == ":":
+            if frame.kind == "{" and frame.state == "colon":
+                frame.state = "value_wait"
+            self.chars.append(ch)
+            return
+
+        if frame.state == "value_wait":
+            self._begin_value(frame, i, "literal")
+        self.chars.append(ch)
+
+    def _begin_value(self, frame, i, kind):
+        frame.state = "value"
+        frame.value_start = i
+        frame.value_kind = kind
+
+    def _string_closed(self, i):
+        frame = self.stack[-1]
+        if frame.state == "in_key":
+            frame.key = "".join(self.chars[frame.key_start:i])
+            frame.state = "colon"
+
+    def _end_member(self, frame, i):
+        # Only top-level members are checked against the schema while streaming
+        if len(self.stack) == 1 and frame.state == "value" and frame.key is not None:
+            raw = "".join(self.chars[frame.value_start:i]).strip()
+            self._check_member(frame.key, raw)
+        if frame.kind == "{":
+            frame.key = None
+
+    def _check_member(self, key, raw):
+        try:
+            value = json.loads(raw, strict=False)
+        except ValueError:
+            # Might still be fixable in finish()
+            self.members[key] = None
+            return
+
+        self.members[key] = value
+        spec = self.schema.get(key)
+        if spec is None:
+            if self.schema:
+                self.unknown_keys += 1
+                if self.unknown_keys >= MAX_UNKNOWN_KEYS and not any(k in self.schema for k in self.members):
+                    self._give_up("response does not follow the expected schema")
+            return
+
+        types, required = spec
+        _, ok = _coerce(value, types)
+        if not ok and required:
+            self._give_up(f"'{key}' has unusable type {type(value).__name__}")
+
+    def _check_complete(self):
+        missing = self.required - set(self.members)
+        if missing:
+            self._give_up("object closed without required keys: " + ", ".join(sorted(missing)))
+
+    def _close_truncated(self):
+        chars = list(self.chars)
+        stack = self.stack
+
+        if self.in_string:
+            if self.escape:
+                chars.pop()
+            frame = stack[-1]
+            if frame.state == "in_key":
+                del chars[frame.member_start:]
+                frame.state = "key"
+            else:
+                chars.append('"')
+
+        for depth in range(len(stack) - 1, -1, -1):
+            frame = stack[depth]
+            # Nothing usable after the last complete member: drop it (and its comma)
+            dangling = frame.state in ("key", "in_key", "colon", "value_wait")
+            if frame.state == "value" and frame.value_kind == "literal":
+                try:
+                    json.loads("".join(chars[frame.value_start:]).strip())
+                except ValueError:
+                    dangling = True
+            if dangling:
+                del chars[frame.member_start:]
+            while chars and chars[-1].isspace():
+                chars.pop()
+            chars.append(CLOSERS[frame.kind])
+
+        return "".join(chars)
+
+    def finish(self):
+        """
+        Returns (data, report). data is the repaired, schema-checked dict or None.
+        """
+        report = {"repairs": [], "missing": [], "type_errors": [], "hopeless": self.hopeless, "reason": self.reason}
+
+        if self.phase == "preamble":
+            report["hopeless"] = True
+            report["reason"] = report["reason"] or "no JSON object found"
+            return None, report
+
+        if "".join(self.preamble).strip().strip("`").strip().lower() not in ("", "json"):
+            self.repairs.add("leading_prose")
+        if "".join(self.trailing).strip().strip("`").strip():
+            self.repairs.add("trailing_prose")
+
+        if self.phase == "done":
+            text = "".join(self.chars)
+        else:
+            self.repairs.add("truncated")
+            text = self._close_truncated()
+
+        try:
+            data = json.loads(text, strict=False)
+        except ValueError as e:
+            report["repairs"] = sorted(self.repairs)
+            report["hopeless"] = True
+            report["reason"] = report["reason"] or f"unrepairable JSON: {e}"
+            return None, report
+
+        for key, (types, required) in self.schema.items():
+            if key not in data:
+                if required:
+                    report["missing"].append(key)
+                continue
+            value, ok = _coerce(data[key], types)
+            if ok:
+                if value is not data[key]:
+                    self.repairs.add("coerced_types")
+                data[key] = value
+            else:
+                report["type_errors"].append(key)
+
+        report["repairs"] = sorted(self.repairs)
+        if report["missing"] or any(key in self.required for key in report["type_errors"]):
+            report["hopeless"] = True
+            report["reason"] = report["reason"] or "required keys missing or unusable"
+        return data, report
+
+
+def decode_llm_json(text, schema=None):
+    """
+    One-shot helper: feeds the whole text through IncrementalJSONDecoder.
+    Returns (data, report); data is None when nothing usable could be recovered.
+    """
+    decoder = IncrementalJSONDecoder(schema)
+    decoder.feed(text or "")
+    if decoder.hopeless and decoder.phase == "preamble":
+        return None, {"repairs": [], "missing": [], "type_errors": [], "hopeless": True, "reason": decoder.reason}
+    return decoder.finish()
+
+
+def is_usable_response(text, schema=None):
+    data, report = decode_llm_json(text, schema)
+    return data is not None and "error" not in data and not report["hopeless"]
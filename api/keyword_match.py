@@ -0,0 +1,295 @@
+import os
+import re
+import time
+from collections import Counter
+
+try:
+    import config
+    from compaction import split_sections, section_priority, JD_PRIORITIES
+except ImportError:
+    import sys
+    sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+    import config
+    from compaction import split_sections, section_priority, JD_PRIORITIES
+
+
+# Provisional keyword scores below this count as clear mismatches (the full match prompt is skipped)
+KEYWORD_MISMATCH_BELOW = float(os.getenv("KEYWORD_MISMATCH_BELOW", "20"))
+# log (default): always run the full prompt, only log/count the pairs the screen would skip, until the
+# threshold is validated against the LLM (bench_keyword_match.py --live); short: a small LLM prompt writes
+# the recommendation; skip: no LLM call at all; off: don't judge pairs locally
+KEYWORD_MISMATCH_MODE = os.getenv("KEYWORD_MISMATCH_MODE", "log").lower()
+# JDs with fewer keywords than this are too thin to judge locally
+KEYWORD_MIN_TERMS = int(os.getenv("KEYWORD_MIN_TERMS", "8"))
+KEYWORD_MAX_TERMS = int(os.getenv("KEYWORD_MAX_TERMS", "30"))
+
+BM25_K1 = 1.2
+PHRASE_BOOST = 1.3
+# Broad terms that say little about fit on their own
+BROAD_WEIGHT = 0.4
+# Sections below this priority (benefits, EEO statements) are not read at all
+MIN_SECTION_PRIORITY = 0.3
+# Broad words that only show up in optional sections fall below this
+MIN_KEYWORD_WEIGHT = 0.3
+
+_WORD_RE = re.compile(r"ci/cd|ui/ux|\.net\b|[a-z0-9][a-z0-9+#]*(?:\.[a-z0-9]+)*", re.IGNORECASE)
+
+# Function words plus resume/JD boilerplate: never keywords, and they break phrases
+IGNORED = set("""
+a about above across after again against all also am an and any are as at be been before being below between
+both but by can could did do does doing done down during each either etc few for from further had has have
+having he her here hers him his how i if in into is it its itself just may me might more most must my no nor
+not now of off on once only or other our ours out over own per same she should so some such than that the
+their them then there these they this those through to too under until up upon us very via was we were what
+when where which while who whom why will with within without would yes you your yours e.g i.e eg ie
+ability able across advantage apply applicant applicants background benefit best better bonus build building
+candidate candidates closely company contribute core culture day deep degree desired drive driven eager
+employee employer environment equal excellent excited experience experienced expert expertise familiarity
+familiar fast field focus good great grow growing growth help high highly hire ideal impact including join
+key knowledge large least level looking love make minimum mission modern new nice opportunity part passion
+passionate plus position preferred problem problems proficiency proficient proven qualification
+qualifications related relevant remote required requirement requirements responsibilities responsibility
+responsible role similar skill skills solid strong success successful team teams understanding use using
+various well willing work working world year years
+""".split())
+
+# Broad technical words: still keywords, but at a lower weight
+BROAD_TERMS = {
+    "api", "application", "code", "computer", "data", "design", "develop", "developer", "development",
+    "engineer", "engineering", "platform", "product", "program", "programming", "science", "service",
+    "software", "solution", "system", "technology", "tool", "web", "backend", "frontend", "senior", "junior",
+}
+
+# Spellings -> one canonical term; joined forms ("node js" -> "nodejs") are looked up here too
+ALIASES = {
+    "js": "javascript", "ecmascript": "javascript", "ts": "typescript",
+    "node": "node.js", "nodejs": "node.js", "reactjs": "react", "react.js": "react",
+    "vuejs": "vue", "vue.js": "vue", "nextjs": "next.js", "angularjs": "angular",
+    "golang": "go", "k8s": "kubernetes", "postgres": "postgresql", "psql": "postgresql",
+    "apis": "api", "mongo": "mongodb", "scikitlearn": "scikit-learn", "sklearn": "scikit-learn",
+    "ml": "machine learning", "nlp": "natural language processing", "cicd": "ci/cd",
+    "gcp": "google cloud", "py": "python", "tf": "tensorflow", "dotnet": ".net",
+}
+
+# Two-word keywords worth matching as a unit even when they appear only once
+KNOWN_PHRASES = {
+    "machine learning", "deep learning", "computer vision", "data science", "data engineering",
+    "data analysis", "data structure", "distributed system", "system design", "rest api", "unit testing",
+    "test automation", "version control", "google cloud", "spring boot", "react native", "power bi",
+    "sql server", "project management", "product management", "cloud computing", "web development",
+    "mobile development", "event driven", "microservice architecture", "natural language",
+    "language processing", "big data", "time series", "feature engineering", "load balancing",
+    "infrastructure as", "design pattern", "object oriented", "functional programming", "user research",
+    "customer service", "financial modeling", "supply chain", "patient care", "social media",
+}
+
+# Words ending in "s" that aren't plurals
+KEEP_PLURAL = {
+    "kubernetes", "aws", "ios", "macos", "redis", "pandas", "jenkins", "rails", "analytics", "statistics",
+    "devops", "mlops", "graphics", "ops", "sales", "mathematics", "physics", "economics", "news", "series",
+    "windows", "dynamics", "logistics", "express", "sass", "less", "ses", "sns", "sqs", "ms", "js", "cms",
+}
+
+SINGLE_LETTER_TERMS = {"c", "r"}
+
+
+def _singular(word):
+    if word in KEEP_PLURAL or len(word) <= 3 or not word.endswith("s"):
+        return word
+    if word.endswith("ies") and len(word) > 4:
+        return word[:-3] + "y"
+    if word.endswith(("sses", "xes", "ches", "shes")):
+        return word[:-2]
+    if word.endswith(("ss", "us", "is")):
+        return word
+    return word[:-1]
+
+
+def normalize_term(word):
+    """Lowercased word -> canonical term, or None for words that never count."""
+    if word in IGNORED or not any(c.isalpha() for c in word):
+        return None
+    if word in ALIASES:
+        return ALIASES[word]
+    word = _singular(word)
+    word = ALIASES.get(word, word)
+    if len(word) == 1 and word not in SINGLE_LETTER_TERMS:
+        return None
+    return None if word in IGNORED else word
+
+
+def term_runs(line):
+    """
+    Splits one line into runs of adjacent terms [(term, surface)]; punctuation (other than
+    hyphens) and ignored words end a run, so phrases never span them.
+    """
+    runs, run = [], []
+    # The last word when it is run[-1], as (lowercased, start offset)
+    previous, end = None, 0
+    for match in _WORD_RE.finditer(line):
+        gap = line[end:match.start()]
+        end = match.end()
+        if gap.strip(" \t-"):
+            previous = None
+            if run:
+                runs.append(run)
+                run = []
+
+        surface = match.group()
+        raw = surface.lower()
+        # "Node JS", "scikit-learn", "CI CD": join with the previous word when that spells a known term
+        if previous is not None and previous[0] + raw in ALIASES:
+            run[-1] = (ALIASES[previous[0] + raw], line[previous[1]:end])
+            previous = None
+            continue
+
+        term = normalize_term(raw)
+        if term is None:
+            previous = None
+            if run:
+                runs.append(run)
+                run = []
+            continue
+        run.append((term, surface))
+        previous = (raw, match.start())
+    if run:
+        runs.append(run)
+    return runs
+
+
+def _bm25_tf(tf):
+    return tf * (BM25_K1 + 1) / (tf + BM25_K1)
+
+
+class ResumeTerms:
+    """
+    The resume's term set (unigrams and every adjacent pair), built once and
+    reused across job descriptions (batch matching).
+    """
+
+    def __init__(self, resume_text):
+        self.terms = set()
+        for line in resume_text.split("\n"):
+            for run in term_runs(line):
+                terms = [term for term, _ in run]
+                self.terms.update(terms)
+                self.terms.update(f"{a} {b}" for a, b in zip(terms, terms[1:]))
+
+
+class JobKeywords:
+    """
+    Weighted keywords of a job description. A term's weight is the BM25-saturated count of
+    its occurrences, each counted by its section's priority (requirements 1.0 ... benefits 0.2,
+    see compaction.JD_PRIORITIES), times BROAD_WEIGHT for broad words and PHRASE_BOOST for
+    two-word phrases. Without a document corpus, the BROAD_TERMS / IGNORED lists stand in for IDF.
+    """
+
+    def __init__(self, job_description, max_terms=KEYWORD_MAX_TERMS):
+        counts = Counter()
+        pair_counts = Counter()
+        surfaces = {}
+        for title, lines in split_sections(job_description):
+            factor = section_priority(title, JD_PRIORITIES)
+            if factor < MIN_SECTION_PRIORITY:
+                continue
+            for line in lines[1:] if title is not None else lines:
+                for run in term_runs(line):
+                    for term, surface in run:
+                        counts[term] += factor
+                        surfaces.setdefault(term, surface)
+                    for (a, surface_a), (b, surface_b) in zip(run, run[1:]):
+                        pair = f"{a} {b}"
+                        pair_counts[pair] += factor
+                        surfaces.setdefault(pair, f"{surface_a} {surface_b}")
+
+        weights = {}
+        for term, tf in counts.items():
+            weights[term] = _bm25_tf(tf) * (BROAD_WEIGHT if term in BROAD_TERMS else 1.0)
+        for pair, tf in pair_counts.items():
+            a, b = pair.split(" ")
+            # Arbitrary word pairs only count once they repeat
+            if pair in KNOWN_PHRASES or (tf >= 2 and a not in BROAD_TERMS and b not in BROAD_TERMS):
+                weights[pair] = _bm25_tf(tf) * PHRASE_BOOST
+
+        ranked = sorted(
+            (item for item in weights.items() if item[1] >= MIN_KEYWORD_WEIGHT),
+            key=lambda item: (-item[1], item[0]),
+        )[:max_terms]
+        # A word already covered by a chosen phrase ("learning" in "machine learning") is dropped
+        phrase_words = {word for term, _ in ranked if " " in term for word in term.split(" ")}
+        self.weights = {term: weight for term, weight in ranked if " " in term or term not in phrase_words}
+        self.surfaces = {term: surfaces.get(term, term) for term in self.weights}
+        self.total = sum(self.weights.values())
+
+
+def score_keywords(resume, job_description):
+    """
+    Local keyword match in a few milliseconds. `resume` is the resume text or a ResumeTerms,
+    `job_description` the JD text or a JobKeywords.
+    Returns match_score (0-100, the weighted share of JD keywords found in the resume),
+    matching_keywords / missing_keywords (most important first) and the keyword count.
+    """
+    start = time.perf_counter()
+    terms = resume if isinstance(resume, ResumeTerms) else ResumeTerms(resume)
+    keywords = job_description if isinstance(job_description, JobKeywords) else JobKeywords(job_description)
+
+    matching, missing = [], []
+    matched_weight = 0.0
+    for term, weight in keywords.weights.items():
+        if term in terms.terms:
+            matching.append(keywords.surfaces[term])
+            matched_weight += weight
+        else:
+            missing.append(keywords.surfaces[term])
+
+    coverage = matched_weight / keywords.total if keywords.total else 0.0
+    return {
+        "match_score": round(coverage * 100),
+        "matching_keywords": matching,
+        "missing_keywords": missing,
+        "keywords": len(keywords.weights),
+        "score_source": "keywords",
+        "elapsed_ms": round((time.perf_counter() - start) * 1000, 2),
+    }
+
+
+def is_clear_mismatch(report):
+    """The screen's verdict, whatever KEYWORD_MISMATCH_MODE does with it."""
+    return (
+        KEYWORD_MISMATCH_MODE != "off"
+        and report["keywords"] >= KEYWORD_MIN_TERMS
+        and report["match_score"] < KEYWORD_MISMATCH_BELOW
+    )
+
+
+def skips_full_prompt(report):
+    return KEYWORD_MISMATCH_MODE in ("short", "skip") and is_clear_mismatch(report)
+
+
+def mismatch_result(report, explanation=None):
+    """
+    /api/match answer for a clear mismatch, in the full prompt's schema. As that prompt asks
+    for scores below 75, detailed_improvements is empty. `explanation` is the short prompt's
+    decoded answer (recommendation, potential_score, technical_gaps), if it ran and succeeded.
+    """
+    explanation = explanation or {}
+    missing = report["missing_keywords"]
+    recommendation = explanation.get("recommendation") or (
+        f"Low match: the resume covers about {report['match_score']}% of this job's key requirements"
+        + (f" and doesn't mention {', '.join(missing[:5])}." if missing else ".")
+    )
+    return {
+        "match_score": report["match_score"],
+        "potential_score": explanation.get("potential_score", report["match_score"]),
+        "recommendation": recommendation,
+        "missing_keywords": missing,
+        "matching_keywords": report["matching_keywords"],
+        "improvements": [],
+        "detailed_improvements": [],
+        "gap_analysis": {
+            "technical_gaps": explanation.get("technical_gaps") or missing[:8],
+            "soft_skill_gaps": [],
+        },
+        "tailoring_advice": [],
+        "score_source": "keywords",
+    }
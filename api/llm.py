@@ -1,21 +1,42 @@
 import os
 import re
 import json
-import requests
-from groq import Groq
-from dotenv import load_dotenv
+import time
 
 
 try:
-    from parsing_service import extract_resume_data
-    from github_get import analyze_github_profile, match_projects, audit_repo
+    import config
+    from clients import get_http_session, get_groq, HTTP_TIMEOUT
+    from llm_cache import llm_cache, is_valid_json_response
+    from llm_router import ProviderRouter, AllProvidersFailed, CallCancelled
+    from json_decoder import IncrementalJSONDecoder, HopelessResponse, decode_llm_json, is_usable_response, ANALYSIS_SCHEMA, MATCH_SCHEMA, MISMATCH_SCHEMA
+    from json_decoder import SECTION_SCHEMA, SCORES_SCHEMA
+    from compaction import compact_for_prompt, RESUME_TOKEN_BUDGET, MATCH_RESUME_TOKEN_BUDGET, JD_TOKEN_BUDGET
+    from compaction import MISMATCH_RESUME_TOKEN_BUDGET, MISMATCH_JD_TOKEN_BUDGET, SECTION_TOKEN_BUDGET
+    from metrics import llm_answers, llm_fallbacks, llm_failures
 except ImportError:
     import sys
     sys.path.append(os.path.dirname(os.path.abspath(__file__)))
-    from parsing_service import extract_resume_data
-    from github_get import analyze_github_profile, match_projects, audit_repo
-
-load_dotenv(os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), '.env'))
+    import config
+    from clients import get_http_session, get_groq, HTTP_TIMEOUT
+    from llm_cache import llm_cache, is_valid_json_response
+    from llm_router import ProviderRouter, AllProvidersFailed, CallCancelled
+    from json_decoder import IncrementalJSONDecoder, HopelessResponse, decode_llm_json, is_usable_response, ANALYSIS_SCHEMA, MATCH_SCHEMA, MISMATCH_SCHEMA
+    from json_decoder import SECTION_SCHEMA, SCORES_SCHEMA
+    from compaction import compact_for_prompt, RESUME_TOKEN_BUDGET, MATCH_RESUME_TOKEN_BUDGET, JD_TOKEN_BUDGET
+    from compaction import MISMATCH_RESUME_TOKEN_BUDGET, MISMATCH_JD_TOKEN_BUDGET, SECTION_TOKEN_BUDGET
+    from metrics import llm_answers, llm_fallbacks, llm_failures
+
+
+GEMINI_API_URL = os.getenv("GEMINI_API_URL", "https://generativelanguage.googleapis.com").rstrip("/")
+GEMINI_MODEL = "gemini-1.5-flash"
+GROQ_MODEL = "llama-3.3-70b-versatile"
+GEMINI_GENERATION_CONFIG = {
+    "response_mime_type": "application/json",
+    "temperature": 0
+}
+
+llm_router = ProviderRouter(validate=is_valid_json_response)
 
 def extract_username_from_links(links):
     """
@@ -28,43 +49,195 @@ def extract_username_from_links(links):
             return match.group(1)
     return None
 
-def call_gemini_rest_api(prompt, api_key):
+def stream_gemini_rest_api(prompt, api_key, on_token):
     """
-    Calls Gemini 1.5 Flash via REST API to avoid heavy google-generativeai SDK.
+    Streams Gemini 1.5 Flash output via the REST streamGenerateContent endpoint (SSE; avoids the
+    heavy google-generativeai SDK), calling on_token for each text chunk. Returns the full text.
     """
-    url = f"https://generativelanguage.googleapis.com/v1beta/models/gemini-1.5-flash:generateContent?key={api_key}"
-    headers = {'Content-Type': 'application/json'}
+    url = f"{GEMINI_API_URL}/v1beta/models/{GEMINI_MODEL}:streamGenerateContent?alt=sse&key={api_key}"
     payload = {
         "contents": [{
             "parts": [{"text": prompt}]
         }],
-        "generationConfig": {
-            "response_mime_type": "application/json",
-            "temperature": 0
-        }
+        "generationConfig": GEMINI_GENERATION_CONFIG
     }
-    
-    try:
-        response = requests.post(url, headers=headers, json=payload)
+
+    chunks = []
+    with get_http_session().post(url, json=payload, timeout=HTTP_TIMEOUT, stream=True) as response:
         response.raise_for_status()
-        result = response.json()
-        
-        # Extract text from response structure
-        # { "candidates": [ { "content": { "parts": [ { "text": "..." } ] } } ] }
-        if 'candidates' in result and result['candidates']:
-            candidate = result['candidates'][0]
-            if 'content' in candidate and 'parts' in candidate['content']:
-                return candidate['content']['parts'][0]['text']
-        
-        return f'{{"error": "Empty or unexpected response from Gemini API", "details": "{str(result)}"}}'
-        
-    except Exception as e:
-        print(f"   ⚠️ Gemini REST API failed: {e}")
-        raise e
-
-def analyze_career_profile(resume_text, github_projects=None, user_context=None):
+        for line in response.iter_lines(decode_unicode=True):
+            if not line or not line.startswith("data:"):
+                continue
+            event = json.loads(line[5:].strip())
+            for candidate in event.get("candidates", [])[:1]:
+                for part in candidate.get("content", {}).get("parts", []):
+                    text = part.get("text")
+                    if text:
+                        chunks.append(text)
+                        on_token(text)
+
+    if not chunks:
+        raise RuntimeError("Empty streamed response from Gemini API")
+    return "".join(chunks)
+
+def stream_groq_api(prompt, api_key, on_token, temperature=0):
+    """
+    Streams Llama 3.3 on Groq in JSON mode (stream=True), calling on_token for each text delta.
+    Returns the full text.
+    """
+    client = get_groq(api_key)
+
+    stream = client.chat.completions.create(
+        messages=[{"role": "user", "content": prompt}],
+        model=GROQ_MODEL,
+        temperature=temperature,
+        response_format={"type": "json_object"},
+        stream=True
+    )
+
+    chunks = []
+    # Closes the HTTP response when on_token raises (aborted stream)
+    with stream:
+        for chunk in stream:
+            text = chunk.choices[0].delta.content if chunk.choices else None
+            if text:
+                chunks.append(text)
+                on_token(text)
+    return "".join(chunks)
+
+def generate_json(prompt, gemini_key, groq_key, groq_temperature=0, failure_label="LLM Analysis Failed", on_token=None, schema=None):
+    """
+    Runs the prompt on Gemini (primary) with Groq as fallback, through llm_router
+    (circuit breakers + a hedged Groq request when Gemini runs past its p95).
+    Valid JSON answers are cached per (model, prompt, generation config).
+
+    With a schema, answers are checked by json_decoder: repairable defects are fixed
+    locally (the repaired JSON is what gets returned and cached; a repaired truncation is
+    returned but not cached), and hopeless answers count as failures so the other provider
+    is asked instead.
+
+    Hedged calls read the providers' streaming endpoints too, so the losing request is
+    closed at its next chunk rather than generating its whole answer for nothing.
+
+    With on_token, output is streamed chunk by chunk (no hedging). If Gemini fails after
+    emitting some output, on_token(None) tells the consumer to discard it before Groq starts.
+    A streamed answer that turns hopeless is aborted mid-stream.
+    """
+    groq_config = {"temperature": groq_temperature, "response_format": "json_object"}
+
+    providers = []
+    if gemini_key:
+        providers.append((
+            "gemini", GEMINI_MODEL, GEMINI_GENERATION_CONFIG,
+            lambda emit: stream_gemini_rest_api(prompt, gemini_key, emit),
+        ))
+    if groq_key:
+        providers.append((
+            "groq", GROQ_MODEL, groq_config,
+            lambda emit: stream_groq_api(prompt, groq_key, emit, groq_temperature),
+        ))
+
+    if not providers:
+        return '{ "error": "No LLM API keys available" }'
+
+    # A cached answer from either provider is as good as a fresh one
+    cached = llm_cache.get_any(prompt, [(model, config) for _, model, config, _ in providers])
+    if cached is not None:
+        print("   ⚡ LLM cache hit")
+        llm_answers.labels("cache").inc()
+        if on_token:
+            on_token(cached)
+        return cached
+
+    validate = (lambda text: is_usable_response(text, schema)) if schema else None
+
+    start = time.perf_counter()
+    try:
+        if on_token:
+            name, text = _stream_with_fallback(providers, on_token, schema, validate)
+        else:
+            name, text = llm_router.hedged([(name, _until_cancelled(stream)) for name, _, _, stream in providers], validate=validate)
+    except AllProvidersFailed as e:
+        print(f"   ❌ All LLM providers failed: {e}")
+        llm_failures.inc()
+        return json.dumps({"error": failure_label, "details": str(e)})
+
+    print(f"   ✅ LLM answer from {name}")
+    llm_answers.labels(name).inc()
+    cacheable = True
+    if schema:
+        data, report = decode_llm_json(text, schema)
+        if report["repairs"]:
+            print(f"   🩹 Repaired LLM JSON: {', '.join(report['repairs'])}")
+            text = json.dumps(data)
+        # A cut-off answer is still better than none for this caller, but it isn't kept for the next one
+        cacheable = "truncated" not in report["repairs"]
+    for provider, model, config, _ in providers:
+        if provider == name and cacheable:
+            llm_cache.set(model, prompt, config, text, time.perf_counter() - start)
+    return text
+
+def _until_cancelled(stream):
+    """A hedged attempt over a streaming call: stops reading (and closes the request) once cancel is set."""
+    def call(cancel):
+        def emit(text):
+            if cancel.is_set():
+                raise CallCancelled("answer no longer needed")
+        return stream(emit)
+    return call
+
+def _stream_with_fallback(providers, on_token, schema=None, validate=None):
+    errors = []
+    for position, (name, _, _, stream) in enumerate(providers):
+        if position:
+            llm_fallbacks.labels("stream_error").inc()
+        emitted = []
+        decoder = IncrementalJSONDecoder(schema) if schema else None
+
+        def emit(text):
+            emitted.append(text)
+            on_token(text)
+            if decoder and not decoder.feed(text):
+                # Stop reading this stream and move on to the next provider
+                raise HopelessResponse(decoder.reason)
+
+        try:
+            return name, llm_router.call(name, lambda: stream(emit), validate=validate)
+        except Exception as e:
+            print(f"   ⚠️ {name} failed: {e}")
+            errors.append((name, str(e)))
+            if emitted:
+                on_token(None)
+
+    raise AllProvidersFailed(errors)
+
+def _context_str(user_context):
+    if not user_context:
+        return ""
+    role = user_context.get('role') or "Software Engineer"
+    level = user_context.get('level') or "Mid-Level"
+    category = user_context.get('category') or "Tech"
+    return (
+        f"CONTEXT: The candidate is applying for a '{role}' role at the '{level}' level in '{category}'. "
+        "Evaluate them strictly according to the expectations of this specific level and role."
+    )
+
+def _project_summaries(github_projects):
+    project_summaries = []
+    for p in github_projects:
+        project_summaries.append(
+            f"- **{p['name']}**: {p.get('description', 'No description')}\n"
+            f"  Tech: {', '.join(p.get('languages', []))}\n"
+            f"  Stars: {p['stars']}\n"
+            f"  Match Reason: {p['match_reason']}\n"
+            f"  Audit: {p.get('audit', {}).get('summary', 'Not Audited')}"
+        )
+    return "\n".join(project_summaries)
+
+def analyze_career_profile(resume_text, github_projects=None, user_context=None, on_token=None):
     """
     Analyzes the candidate's profile using Gemini (primary) with Groq as fallback.
+    Pass on_token to receive the model output as it streams.
     """
     gemini_key = os.getenv("GEMINI_API_KEY") or os.getenv("VITE_GEMINI_API_KEY")
     groq_key = os.getenv("GROQ_API_KEY") or os.getenv("VITE_GROQ_API_KEY")
@@ -72,29 +245,13 @@ def analyze_career_profile(resume_text, github_projects=None, user_context=None)
     if not gemini_key and not groq_key:
         return "⚠️  No API keys found. Please set GEMINI_API_KEY or GROQ_API_KEY in .env."
 
+    resume_block = compact_for_prompt(resume_text, RESUME_TOKEN_BUDGET, "resume", fallback_chars=15000)
 
-    context_str = ""
-    if user_context:
-        role = user_context.get('role') or "Software Engineer"
-        level = user_context.get('level') or "Mid-Level"
-        category = user_context.get('category') or "Tech"
-        context_str = (
-            f"CONTEXT: The candidate is applying for a '{role}' role at the '{level}' level in '{category}'. "
-            "Evaluate them strictly according to the expectations of this specific level and role."
-        )
+    context_str = _context_str(user_context)
 
     if github_projects:
 
-        project_summaries = []
-        for p in github_projects:
-            project_summaries.append(
-                f"- **{p['name']}**: {p.get('description', 'No description')}\n"
-                f"  Tech: {', '.join(p.get('languages', []))}\n"
-                f"  Stars: {p['stars']}\n"
-                f"  Match Reason: {p['match_reason']}\n"
-                f"  Audit: {p.get('audit', {}).get('summary', 'Not Audited')}"
-            )
-        projects_str = "\n".join(project_summaries)
+        projects_str = _project_summaries(github_projects)
 
         prompt = (
             "You are a helpful Mentor and expert Technical Recruiter. "
@@ -133,7 +290,7 @@ def analyze_career_profile(resume_text, github_projects=None, user_context=None)
             "- Score 1-2: Poor, major problems\n\n"
 
             "=== RESUME CONTENT ===\n"
-            f"{resume_text[:15000]}\n\n"
+            f"{resume_block}\n\n"
 
             "=== VERIFIED GITHUB PROJECTS ===\n"
             f"{projects_str}\n\n"
@@ -201,7 +358,7 @@ def analyze_career_profile(resume_text, github_projects=None, user_context=None)
             "- Score 9-10: Exceptional | 7-8: Good | 5-6: Average | 3-4: Below average | 1-2: Poor\n\n"
 
             "=== RESUME CONTENT ===\n"
-            f"{resume_text[:15000]}\n\n"
+            f"{resume_block}\n\n"
 
             "OUTPUT FORMAT:\n"
             "STRICTLY return a valid JSON object. No Markdown.\n"
@@ -233,41 +390,108 @@ def analyze_career_profile(resume_text, github_projects=None, user_context=None)
         )
 
 
-    if gemini_key:
-        try:
-            print("   🤖 Using Gemini 1.5 Flash (primary - REST)...")
-            return call_gemini_rest_api(prompt, gemini_key)
+    return generate_json(prompt, gemini_key, groq_key, groq_temperature=0, failure_label="LLM Analysis Failed", on_token=on_token, schema=ANALYSIS_SCHEMA)
 
-        except Exception as gemini_error:
-            print(f"   ⚠️ Gemini failed: {gemini_error}")
-            print("   🔄 Falling back to Groq...")
+def analyze_section(section, user_context=None):
+    """
+    Detailed improvements for one resume section (section_analysis), for a re-upload where
+    only this section changed. Same item format as analyze_career_profile's detailed_improvements.
+    """
+    gemini_key = os.getenv("GEMINI_API_KEY") or os.getenv("VITE_GEMINI_API_KEY")
+    groq_key = os.getenv("GROQ_API_KEY") or os.getenv("VITE_GROQ_API_KEY")
 
+    if not gemini_key and not groq_key:
+        return "⚠️  No API keys found."
 
-    if groq_key:
-        try:
-            print("   🦙 Using Groq/Llama (fallback)...")
-            client = Groq(api_key=groq_key)
+    section_block = compact_for_prompt(section["text"], SECTION_TOKEN_BUDGET, "resume", fallback_chars=6000)
 
-            chat_completion = client.chat.completions.create(
-                messages=[{
-                    "role": "user",
-                    "content": prompt,
-                }],
-                model="llama-3.3-70b-versatile",
-                temperature=0,
-                response_format={"type": "json_object"}
-            )
+    prompt = (
+        "You are a helpful Mentor and expert Technical Recruiter. "
+        f"I will provide ONE section of a candidate's Resume: '{section['title']}'.\n\n"
+        f"{_context_str(user_context)}\n\n"
+        "YOUR TASK:\n"
+        "Provide 0-4 SPECIFIC, ACTIONABLE improvements for this section only. "
+        "Return an empty list if the section is already strong.\n"
+        "For each improvement: name the EXACT item/entry, quote the ORIGINAL text that needs changing, "
+        "provide the SUGGESTED replacement text and explain WHY this change improves the resume.\n\n"
+        "OUTPUT FORMAT:\n"
+        "STRICTLY return a valid JSON object. No Markdown.\n"
+        "{\n"
+        "  \"detailed_improvements\": [\n"
+        "    {\n"
+        f"      \"section\": \"{section['title']}\",\n"
+        "      \"item\": \"<e.g., InsightLens, Software Engineer at Google>\",\n"
+        "      \"location\": \"<e.g., Bullet point 2, Line 1>\",\n"
+        "      \"original_text\": \"<exact text from the section that needs change>\",\n"
+        "      \"suggested_text\": \"<improved replacement text>\",\n"
+        "      \"reason\": \"<why this change helps>\"\n"
+        "    }\n"
+        "  ]\n"
+        "}\n\n"
+        "=== RESUME SECTION ===\n"
+        f"{section_block}\n"
+    )
+
+    return generate_json(prompt, gemini_key, groq_key, groq_temperature=0, failure_label="LLM Section Analysis Failed", schema=SECTION_SCHEMA)
 
-            return chat_completion.choices[0].message.content
+def score_profile(resume_text, github_projects=None, user_context=None, open_improvements=None):
+    """
+    The scores of analyze_career_profile for an edited resume (section_analysis): ats_score and
+    the 1-10 ratings only; summary, strengths and GitHub feedback are reused from the earlier
+    full analysis and detailed_improvements come per section. `open_improvements` maps section
+    titles to the suggestions still open there. Output of a few tokens.
+    """
+    gemini_key = os.getenv("GEMINI_API_KEY") or os.getenv("VITE_GEMINI_API_KEY")
+    groq_key = os.getenv("GROQ_API_KEY") or os.getenv("VITE_GROQ_API_KEY")
 
-        except Exception as groq_error:
-            return f'{{ "error": "LLM Analysis Failed", "details": "{str(groq_error)}" }}'
+    if not gemini_key and not groq_key:
+        return "⚠️  No API keys found."
 
-    return '{ "error": "No LLM API keys available" }'
+    # Same view of the resume as the full prompt, so both paths score the same text
+    resume_block = compact_for_prompt(resume_text, RESUME_TOKEN_BUDGET, "resume", fallback_chars=15000)
+    feedback = "\n".join(
+        f"- {title}: " + ("; ".join(item.get("reason") or item.get("suggested_text") or "" for item in items[:3])
+                          if items else "no open suggestions")
+        for title, items in (open_improvements or {}).items()
+    ) or "- none yet"
+    projects_str = _project_summaries(github_projects) if github_projects else "No verified GitHub projects were found linked in the resume."
 
-def compare_resume_to_job(resume_text, job_description):
+    prompt = (
+        "You are a helpful Mentor and expert Technical Recruiter. "
+        "I will provide a candidate's Resume (excerpt), their verified GitHub projects and the open "
+        "suggestions from a section-by-section review.\n\n"
+        f"{_context_str(user_context)}\n\n"
+        "YOUR TASK:\n"
+        "1. **ATS Score**: Calculate a fair ATS score (0-100) based on relevance and formatting.\n"
+        "2-6. Rate various aspects out of 10.\n"
+        "Return the scores only, no feedback text.\n\n"
+        "SCORING RULES:\n"
+        "- Be GENUINE and HONEST with all scores.\n"
+        "- Score 9-10: Exceptional | 7-8: Good | 5-6: Average | 3-4: Below average | 1-2: Poor\n\n"
+        "OUTPUT FORMAT:\n"
+        "STRICTLY return a valid JSON object. No Markdown.\n"
+        "{\n"
+        "  \"ats_score\": <0-100 integer>,\n"
+        "  \"content_quality\": <1-10>,\n"
+        "  \"ats_structure\": <1-10>,\n"
+        "  \"job_optimization\": <1-10>,\n"
+        "  \"writing_quality\": <1-10>,\n"
+        "  \"application_ready\": <1-10>\n"
+        "}\n\n"
+        "=== SECTION FEEDBACK ===\n"
+        f"{feedback}\n\n"
+        "=== VERIFIED GITHUB PROJECTS ===\n"
+        f"{projects_str}\n\n"
+        "=== RESUME (EXCERPT) ===\n"
+        f"{resume_block}\n"
+    )
+
+    return generate_json(prompt, gemini_key, groq_key, groq_temperature=0, failure_label="LLM Score Recompute Failed", schema=SCORES_SCHEMA)
+
+def compare_resume_to_job(resume_text, job_description, on_token=None):
     """
     Compares a resume against a specific job description using Gemini (primary) with Groq as fallback.
+    Pass on_token to receive the model output as it streams.
     """
     gemini_key = os.getenv("GEMINI_API_KEY") or os.getenv("VITE_GEMINI_API_KEY")
     groq_key = os.getenv("GROQ_API_KEY") or os.getenv("VITE_GROQ_API_KEY")
@@ -275,6 +499,9 @@ def compare_resume_to_job(resume_text, job_description):
     if not gemini_key and not groq_key:
         return "⚠️  No API keys found."
 
+    resume_block = compact_for_prompt(resume_text, MATCH_RESUME_TOKEN_BUDGET, "resume", fallback_chars=10000)
+    jd_block = compact_for_prompt(job_description, JD_TOKEN_BUDGET, "jd", fallback_chars=5000)
+
     prompt = (
         "You are an expert Technical Recruiter. I will provide a Candidate's Resume and a Job Description (JD).\n\n"
 
@@ -315,43 +542,50 @@ def compare_resume_to_job(resume_text, job_description):
         "}\n\n"
 
         "=== JOB DESCRIPTION ===\n"
-        f"{job_description[:5000]}\n\n"
+        f"{jd_block}\n\n"
 
         "=== RESUME ===\n"
-        f"{resume_text[:10000]}\n"
+        f"{resume_block}\n"
     )
 
 
-    if gemini_key:
-        try:
-            print("   🤖 Using Gemini 1.5 Flash (primary - REST)...")
-            return call_gemini_rest_api(prompt, gemini_key)
-
-        except Exception as gemini_error:
-            print(f"   ⚠️ Gemini failed: {gemini_error}")
-            print("   🔄 Falling back to Groq...")
-
+    return generate_json(prompt, gemini_key, groq_key, groq_temperature=0.1, failure_label="LLM Match Failed", on_token=on_token, schema=MATCH_SCHEMA)
 
-    if groq_key:
-        try:
-            print("   🦙 Using Groq/Llama (fallback)...")
-            client = Groq(api_key=groq_key)
+def explain_mismatch(resume_text, job_description, report):
+    """
+    Short prompt for a resume the keyword screen (keyword_match) already found to be a clear
+    mismatch: the score and keyword lists are computed locally, the LLM only writes the
+    recommendation. Much smaller input and output than compare_resume_to_job.
+    """
+    gemini_key = os.getenv("GEMINI_API_KEY") or os.getenv("VITE_GEMINI_API_KEY")
+    groq_key = os.getenv("GROQ_API_KEY") or os.getenv("VITE_GROQ_API_KEY")
 
-            chat_completion = client.chat.completions.create(
-                messages=[{"role": "user", "content": prompt}],
-                model="llama-3.3-70b-versatile",
-                temperature=0.1,
-                response_format={"type": "json_object"}
-            )
+    if not gemini_key and not groq_key:
+        return "⚠️  No API keys found."
 
-            return chat_completion.choices[0].message.content
+    resume_block = compact_for_prompt(resume_text, MISMATCH_RESUME_TOKEN_BUDGET, "resume", fallback_chars=2400)
+    jd_block = compact_for_prompt(job_description, MISMATCH_JD_TOKEN_BUDGET, "jd", fallback_chars=1600)
 
-        except Exception as groq_error:
-            return f'{{ "error": "LLM Match Failed", "details": "{str(groq_error)}" }}'
+    prompt = (
+        "You are an expert Technical Recruiter. A keyword screen found this candidate to be a poor fit "
+        f"for the job: the resume covers about {report['match_score']}% of the job's key terms.\n"
+        f"Missing: {', '.join(report['missing_keywords'][:15]) or 'none'}\n"
+        f"Matching: {', '.join(report['matching_keywords'][:15]) or 'none'}\n\n"
+        "In 2-3 sentences, explain clearly why the match is low and what the candidate would need for this role.\n"
+        "STRICTLY return a valid JSON object. No Markdown.\n"
+        "{\"recommendation\": \"...\", \"potential_score\": <0-100 after tailoring the resume>, "
+        "\"technical_gaps\": [\"most important missing skills\"]}\n\n"
+        "=== JOB (EXCERPT) ===\n"
+        f"{jd_block}\n\n"
+        "=== RESUME (EXCERPT) ===\n"
+        f"{resume_block}\n"
+    )
 
-    return '{ "error": "No LLM API keys available" }'
+    return generate_json(prompt, gemini_key, groq_key, groq_temperature=0.1, failure_label="LLM Mismatch Explanation Failed", schema=MISMATCH_SCHEMA)
 
 def main():
+    from parsing_service import extract_resume_data
+    from github_get import analyze_github_profile, match_projects, audit_repos
 
     resume_path = r"/Users/jayeshvishwakarma/Documents/Documents/Stuffs/Solo Build/backend/services/Jayesh SWE Resume.pdf"
 
@@ -383,8 +617,8 @@ def main():
 
             if verified_projects:
                  # Run the Audit Quality Check on matched projects
-                for project in verified_projects:
-                    audit = audit_repo(project['name'], username)
+                audits = audit_repos(verified_projects, username)
+                for project, audit in zip(verified_projects, audits):
                     project['audit'] = audit
         else:
              print(f"   ❌ GitHub Fetch Error: {gh_data['message']}")
@@ -0,0 +1,144 @@
+import hashlib
+import json
+import os
+import threading
+import time
+
+
+try:
+    import config
+    from cache import LRUCache, SQLiteStore
+except ImportError:
+    import sys
+    sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+    import config
+    from cache import LRUCache, SQLiteStore
+
+
+# "memory" (default), "sqlite" or "off"
+LLM_CACHE_BACKEND = os.getenv("LLM_CACHE_BACKEND", "memory").lower()
+LLM_CACHE_TTL = int(os.getenv("LLM_CACHE_TTL", str(24 * 60 * 60)))
+LLM_CACHE_MAX_BYTES = int(os.getenv("LLM_CACHE_MAX_BYTES", str(16 * 1024 * 1024)))
+LLM_CACHE_MAX_ENTRIES = int(os.getenv("LLM_CACHE_MAX_ENTRIES", "5000"))
+LLM_CACHE_DB = os.getenv("LLM_CACHE_DB", "/tmp/fitforworks/llm_cache.sqlite3")
+
+
+def _strip_fences(text):
+    clean = text.strip()
+    if clean.startswith("```json"):
+        clean = clean[7:]
+    elif clean.startswith("```"):
+        clean = clean[3:]
+    if clean.endswith("```"):
+        clean = clean[:-3]
+    return clean.strip()
+
+
+def is_valid_json_response(text):
+    """
+    Only responses that parse as a JSON object and aren't error payloads are worth keeping.
+    """
+    try:
+        data = json.loads(_strip_fences(text))
+    except (TypeError, ValueError):
+        return False
+    return isinstance(data, dict) and "error" not in data
+
+
+class LLMResponseCache:
+    """
+    Caches LLM responses keyed on sha256(model, prompt, generation config).
+    The backend is any object with get(key) / set(key, value) / stats()
+    (cache.LRUCache or cache.SQLiteStore).
+    """
+
+    def __init__(self, backend):
+        self.backend = backend
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.stores = 0
+        self.rejected = 0
+        self.saved_latency = 0.0
+
+    @staticmethod
+    def make_key(model, prompt, config):
+        payload = json.dumps([model, prompt, config or {}], sort_keys=True, ensure_ascii=False)
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def get(self, model, prompt, config=None):
+        return self.get_any(prompt, [(model, config)])
+
+    def get_any(self, prompt, candidates):
+        """
+        Looks the prompt up under each (model, config) in order; counts as a single hit or miss.
+        """
+        if self.backend is None:
+            return None
+
+        for model, config in candidates:
+            entry = self.backend.get(self.make_key(model, prompt, config))
+            if entry is not None:
+                with self._lock:
+                    self.hits += 1
+                    self.saved_latency += entry.get("latency", 0.0)
+                return entry["text"]
+
+        with self._lock:
+            self.misses += 1
+        return None
+
+    def set(self, model, prompt, config, text, latency=0.0):
+        if self.backend is None:
+            return False
+
+        if not is_valid_json_response(text):
+            with self._lock:
+                self.rejected += 1
+            return False
+
+        self.backend.set(self.make_key(model, prompt, config), {
+            "text": text,
+            "model": model,
+            "latency": round(latency, 4),
+        })
+        with self._lock:
+            self.stores += 1
+        return True
+
+    def cached_call(self, model, prompt, config, call):
+        """
+        Returns the cached response for (model, prompt, config) or runs `call()` and stores it.
+        """
+        cached = self.get(model, prompt, config)
+        if cached is not None:
+            return cached
+
+        start = time.perf_counter()
+        text = call()
+        self.set(model, prompt, config, text, time.perf_counter() - start)
+        return text
+
+    def stats(self):
+        lookups = self.hits + self.misses
+        return {
+            "backend": LLM_CACHE_BACKEND,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+            "stores": self.stores,
+            "rejected_invalid_json": self.rejected,
+            "saved_latency_seconds": round(self.saved_latency, 3),
+            "storage": self.backend.stats() if self.backend is not None else None,
+        }
+
+
+def _make_backend():
+    if LLM_CACHE_BACKEND == "off":
+        return None
+    if LLM_CACHE_BACKEND == "sqlite":
+        return SQLiteStore(LLM_CACHE_DB, ttl=LLM_CACHE_TTL, table="llm_cache", max_entries=LLM_CACHE_MAX_ENTRIES)
+    return LRUCache(max_bytes=LLM_CACHE_MAX_BYTES, ttl=LLM_CACHE_TTL)
+
+
+llm_cache = LLMResponseCache(_make_backend())
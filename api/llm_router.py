@@ -0,0 +1,331 @@
+import contextvars
+import math
+import os
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+
+
+try:
+    import config
+    from metrics import llm_abandoned_calls, llm_call_seconds, llm_fallbacks, record_span
+except ImportError:
+    import sys
+    sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+    import config
+    from metrics import llm_abandoned_calls, llm_call_seconds, llm_fallbacks, record_span
+
+LLM_ROUTER_WINDOW = int(os.getenv("LLM_ROUTER_WINDOW", "100"))
+LLM_ROUTER_MAX_WORKERS = int(os.getenv("LLM_ROUTER_MAX_WORKERS", "16"))
+LLM_ROUTER_TIMEOUT = float(os.getenv("LLM_ROUTER_TIMEOUT", "90"))
+# Hedge after the primary's p95; until enough samples exist, after this many seconds
+LLM_HEDGE_DEFAULT_DELAY = float(os.getenv("LLM_HEDGE_DEFAULT_DELAY", "12"))
+LLM_HEDGE_MIN_DELAY = float(os.getenv("LLM_HEDGE_MIN_DELAY", "1"))
+LLM_HEDGE_MIN_SAMPLES = int(os.getenv("LLM_HEDGE_MIN_SAMPLES", "10"))
+# Circuit breaker: open when the recent error rate crosses the threshold
+LLM_BREAKER_ERROR_RATE = float(os.getenv("LLM_BREAKER_ERROR_RATE", "0.5"))
+LLM_BREAKER_MIN_REQUESTS = int(os.getenv("LLM_BREAKER_MIN_REQUESTS", "5"))
+LLM_BREAKER_COOLDOWN = float(os.getenv("LLM_BREAKER_COOLDOWN", "30"))
+
+
+class CircuitOpenError(Exception):
+    pass
+
+
+class CallCancelled(Exception):
+    """Raised inside a provider call once its answer is no longer needed (see ProviderRouter.hedged)."""
+    pass
+
+
+class AllProvidersFailed(Exception):
+    def __init__(self, errors):
+        self.errors = errors
+        super().__init__("; ".join(f"{name}: {error}" for name, error in errors) or "No providers available")
+
+
+class ProviderStats:
+    """
+    Rolling latency/error window and circuit breaker for one provider.
+    closed -> open when the error rate over the window crosses the threshold;
+    open -> half_open after the cooldown (one trial request); a success closes it again.
+    """
+
+    def __init__(self, name):
+        self.name = name
+        self.latencies = deque(maxlen=LLM_ROUTER_WINDOW)
+        self.outcomes = deque(maxlen=LLM_ROUTER_WINDOW)
+        self.state = "closed"
+        self.opened_at = 0.0
+        self.trial_in_flight = False
+        self.requests = 0
+        self.successes = 0
+        self.failures = 0
+        self.rejected = 0
+        self._lock = threading.Lock()
+
+    def percentile(self, p):
+        with self._lock:
+            samples = sorted(self.latencies)
+        if not samples:
+            return None
+        rank = max(math.ceil(p / 100 * len(samples)) - 1, 0)
+        return samples[rank]
+
+    def error_rate(self):
+        with self._lock:
+            if not self.outcomes:
+                return 0.0
+            return 1 - sum(self.outcomes) / len(self.outcomes)
+
+    def allow(self):
+        with self._lock:
+            if self.state == "closed":
+                return True
+            if self.state == "open" and time.monotonic() - self.opened_at >= LLM_BREAKER_COOLDOWN:
+                self.state = "half_open"
+            if self.state == "half_open" and not self.trial_in_flight:
+                self.trial_in_flight = True
+                return True
+            self.rejected += 1
+            return False
+
+    def release_trial(self):
+        with self._lock:
+            self.trial_in_flight = False
+
+    def record(self, success, latency):
+        with self._lock:
+            self.requests += 1
+            self.outcomes.append(1 if success else 0)
+            if success:
+                self.successes += 1
+                self.latencies.append(latency)
+            else:
+                self.failures += 1
+
+            if self.state == "half_open":
+                self.trial_in_flight = False
+                if success:
+                    self.state = "closed"
+                    self.outcomes.clear()
+                else:
+                    self._open()
+            elif self.state == "closed" and len(self.outcomes) >= LLM_BREAKER_MIN_REQUESTS:
+                rate = 1 - sum(self.outcomes) / len(self.outcomes)
+                if rate >= LLM_BREAKER_ERROR_RATE:
+                    self._open()
+
+    def _open(self):
+        self.state = "open"
+        self.opened_at = time.monotonic()
+        print(f"   🔌 Circuit opened for {self.name}")
+
+    def snapshot(self):
+        p50, p95, p99 = (self.percentile(p) for p in (50, 95, 99))
+        return {
+            "state": self.state,
+            "requests": self.requests,
+            "successes": self.successes,
+            "failures": self.failures,
+            "rejected_by_breaker": self.rejected,
+            "error_rate": round(self.error_rate(), 4),
+            "latency_p50": round(p50, 3) if p50 is not None else None,
+            "latency_p95": round(p95, 3) if p95 is not None else None,
+            "latency_p99": round(p99, 3) if p99 is not None else None,
+        }
+
+
+class ProviderRouter:
+    """
+    Routes LLM calls across providers with per-provider circuit breakers and hedging.
+
+    hedged(): starts the first available provider; if it hasn't produced a valid answer
+    within its p95 latency (or fails), the next provider is started too and the first
+    valid answer wins. No hedge is started when the remaining budget is below the next
+    provider's p50: it would most likely not answer in time.
+
+    Losing calls that haven't started are cancelled. Started ones get their cancel event set;
+    a call that checks it (e.g. between streamed chunks) raises CallCancelled and closes its
+    request, which doesn't count against the provider's breaker. Either way it is counted in
+    fitforworks_llm_abandoned_calls_total (not_started, aborted, or completed = quota spent
+    on an answer nobody used).
+    """
+
+    def __init__(self, validate=None):
+        self.validate = validate or (lambda text: True)
+        self.providers = {}
+        self._executor = ThreadPoolExecutor(max_workers=LLM_ROUTER_MAX_WORKERS, thread_name_prefix="llm")
+        self._lock = threading.Lock()
+        self.hedges = 0
+        self.hedge_wins = 0
+        self.hedges_skipped = 0
+        self.abandoned = {"not_started": 0, "aborted": 0, "completed": 0}
+
+    def stats_for(self, name):
+        with self._lock:
+            if name not in self.providers:
+                self.providers[name] = ProviderStats(name)
+            return self.providers[name]
+
+    def hedge_delay(self, name):
+        stats = self.stats_for(name)
+        if len(stats.latencies) < LLM_HEDGE_MIN_SAMPLES:
+            return LLM_HEDGE_DEFAULT_DELAY
+        return max(stats.percentile(95), LLM_HEDGE_MIN_DELAY)
+
+    def expected_latency(self, name):
+        """The provider's p50, or 0 until it has LLM_HEDGE_MIN_SAMPLES latencies."""
+        stats = self.stats_for(name)
+        if len(stats.latencies) < LLM_HEDGE_MIN_SAMPLES:
+            return 0.0
+        return stats.percentile(50)
+
+    def call(self, name, fn, validate=None):
+        """
+        Runs one provider call through its breaker and records the outcome.
+        Raises CircuitOpenError when the breaker rejects it.
+        """
+        if not self.stats_for(name).allow():
+            raise CircuitOpenError(f"{name} circuit is open")
+        return self._timed(name, fn, validate)
+
+    def hedged(self, attempts, timeout=LLM_ROUTER_TIMEOUT, validate=None):
+        """
+        attempts: ordered [(provider_name, callable(cancel) returning text)], where cancel is a
+        threading.Event set once the call's answer is no longer needed.
+        Returns (provider_name, text) for the first valid answer; raises AllProvidersFailed.
+        validate overrides the router-wide check for this call (e.g. a per-prompt schema).
+        """
+        errors = []
+        pending = list(attempts)
+        running = {}
+        cancels = {}
+        deadline = time.monotonic() + timeout
+
+        def launch_next():
+            while pending:
+                name, fn = pending.pop(0)
+                if not self.stats_for(name).allow():
+                    errors.append((name, "circuit open"))
+                    continue
+                # The breaker slot is already taken above, so bypass allow() in the worker
+                submit(name, fn)
+                print(f"   🚀 LLM request -> {name}")
+                return name
+            return None
+
+        def submit(name, fn):
+            cancel = threading.Event()
+            future = self._executor.submit(contextvars.copy_context().run, self._timed, name, fn, validate, cancel)
+            running[future] = name
+            cancels[future] = cancel
+
+        primary = launch_next()
+        if primary is None:
+            # Every breaker is open: fail open on the first provider rather than refusing outright
+            if not attempts:
+                raise AllProvidersFailed(errors)
+            name, fn = attempts[0]
+            submit(name, fn)
+            primary = name
+
+        hedge_at = time.monotonic() + self.hedge_delay(primary)
+        hedged = False
+
+        while running:
+            now = time.monotonic()
+            if now >= deadline:
+                errors.append(("router", f"no valid response within {timeout}s"))
+                break
+
+            wait_until = deadline if (hedged or not pending) else min(hedge_at, deadline)
+            done, _ = wait(list(running), timeout=max(wait_until - now, 0), return_when=FIRST_COMPLETED)
+
+            if not done:
+                if not hedged and pending and time.monotonic() >= hedge_at:
+                    hedged = True
+                    if deadline - time.monotonic() < self.expected_latency(pending[0][0]):
+                        print(f"   ⏳ Not hedging to {pending[0][0]}: its p50 exceeds the remaining budget")
+                        with self._lock:
+                            self.hedges_skipped += 1
+                    elif launch_next():
+                        llm_fallbacks.labels("hedge").inc()
+                        with self._lock:
+                            self.hedges += 1
+                continue
+
+            for future in done:
+                name = running.pop(future)
+                try:
+                    text = future.result()
+                except Exception as e:
+                    errors.append((name, str(e)))
+                    continue
+
+                if hedged and name != primary:
+                    with self._lock:
+                        self.hedge_wins += 1
+                self._cancel(running, cancels)
+                return name, text
+
+            # Everything in flight failed: move on to the next provider right away
+            if not running and launch_next():
+                llm_fallbacks.labels("error").inc()
+
+        self._cancel(running, cancels)
+        raise AllProvidersFailed(errors)
+
+    def _timed(self, name, fn, validate=None, cancel=None):
+        start = time.perf_counter()
+        try:
+            text = fn() if cancel is None else fn(cancel)
+        except Exception as e:
+            if isinstance(e, CallCancelled) and cancel is not None and cancel.is_set():
+                # Aborted by the router, not a provider failure: keep it out of the breaker
+                self.stats_for(name).release_trial()
+                llm_call_seconds.labels(name, "cancelled").observe(time.perf_counter() - start)
+                raise
+            self._observe(name, "error", time.perf_counter() - start)
+            raise
+
+        ok = (validate or self.validate)(text)
+        self._observe(name, "ok" if ok else "invalid", time.perf_counter() - start)
+        if not ok:
+            raise ValueError(f"{name} returned an invalid response")
+        return text
+
+    def _observe(self, name, outcome, latency):
+        self.stats_for(name).record(outcome == "ok", latency)
+        llm_call_seconds.labels(name, outcome).observe(latency)
+        record_span(f"llm_{name}", latency)
+
+    def _cancel(self, running, cancels):
+        for future, name in running.items():
+            if future.cancel():
+                # Never ran: give back a half-open trial slot it may have held
+                self.stats_for(name).release_trial()
+                self._abandon("not_started")
+            else:
+                cancels[future].set()
+                future.add_done_callback(self._count_abandoned)
+        running.clear()
+
+    def _count_abandoned(self, future):
+        self._abandon("aborted" if isinstance(future.exception(), CallCancelled) else "completed")
+
+    def _abandon(self, outcome):
+        llm_abandoned_calls.labels(outcome).inc()
+        with self._lock:
+            self.abandoned[outcome] += 1
+
+    def stats(self):
+        with self._lock:
+            names = list(self.providers)
+        return {
+            "hedges_started": self.hedges,
+            "hedge_wins": self.hedge_wins,
+            "hedges_skipped_over_budget": self.hedges_skipped,
+            "abandoned_calls": dict(self.abandoned),
+            "providers": {name: self.stats_for(name).snapshot() for name in names},
+        }
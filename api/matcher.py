@@ -0,0 +1,190 @@
+import re
+from bisect import bisect_right
+from collections import defaultdict
+
+from rapidfuzz import fuzz, process
+from rapidfuzz.utils import default_process
+
+
+NAME_FUZZY_THRESHOLD = 90
+DESCRIPTION_THRESHOLD = 75
+MIN_DESCRIPTION_LENGTH = 20
+
+# Same as thefuzz.utils.full_process(force_ascii=True): drop chars 128-255, then rapidfuzz's default_process
+_ASCII_TABLE = {i: None for i in range(128, 256)}
+
+
+def full_process(text):
+    return default_process(text.translate(_ASCII_TABLE))
+
+
+def _trigrams(text):
+    return [text[i:i + 3] for i in range(len(text) - 2)]
+
+
+def _rounded(score):
+    # thefuzz rounds rapidfuzz's float scores to ints before comparing
+    return int(round(score))
+
+
+class ResumeIndex:
+    """
+    Tokenizes the resume once and keeps the indexes used to prefilter repos:
+    - a character-trigram -> positions index for fuzzy name matching (partial_ratio)
+    - a processed token set (+ total token length) for description matching (token_set_ratio)
+
+    Both prefilters are upper bounds on the real score, so they never drop a repo
+    that the exact scorer would have accepted.
+    """
+
+    def __init__(self, resume_text):
+        self.lower = resume_text.lower()
+        self.trigrams = defaultdict(list)
+        for position, gram in enumerate(_trigrams(self.lower)):
+            self.trigrams[gram].append(position)
+        self.processed = full_process(self.lower)
+        self.tokens = set(self.processed.split())
+        self.tokens_len = sum(len(t) for t in self.tokens)
+
+    def may_partial_match(self, name, threshold=NAME_FUZZY_THRESHOLD):
+        """
+        For partial_ratio(name, resume) to round above `threshold`, the best window must
+        share a long common subsequence with `name`, which leaves most of the name's
+        trigrams intact inside that one window.
+        """
+        length = len(name)
+        if length < 3:
+            return True
+
+        c = (threshold + 0.5) / 100
+        # Window length can shrink at the resume edges, but not below this
+        min_window = c * length / (2 - c)
+        # Each unmatched name char breaks <= 3 trigrams, each gap in the window <= 2
+        missing_max = max(
+            3 * length + 2 * m - 5 * c * (length + m) / 2
+            for m in (min_window, length)
+        )
+        required = (length - 2) - missing_max - 1
+        if required <= 0:
+            return True
+
+        name_grams = _trigrams(name)
+        if sum(1 for gram in name_grams if gram in self.trigrams) < required:
+            return False
+
+        # Trigram hits of one matching window all lie on nearly the same alignment
+        # diagonal (resume position - name offset), within the allowed indel count
+        max_shift = int((1 - c) * 2 * length) + 1
+        diagonals = sorted(
+            position - offset
+            for offset, gram in enumerate(name_grams)
+            for position in self.trigrams.get(gram, ())
+        )
+        if len(diagonals) < required:
+            return False
+
+        for i, diagonal in enumerate(diagonals):
+            if bisect_right(diagonals, diagonal + 2 * max_shift, lo=i) - i >= required:
+                return True
+        return False
+
+    def token_set_upper_bound(self, processed_desc):
+        """
+        Upper bound of token_set_ratio(desc, resume) on processed strings, computed
+        from token set sizes only (mirrors rapidfuzz's token_set_ratio formula).
+        """
+        desc_tokens = set(processed_desc.split())
+        if not desc_tokens or not self.tokens:
+            return 0
+
+        intersect = desc_tokens & self.tokens
+        diff_ab = desc_tokens - intersect
+        diff_ba_count = len(self.tokens) - len(intersect)
+
+        if intersect and (not diff_ab or not diff_ba_count):
+            return 100
+
+        sect_len = sum(len(t) for t in intersect) + max(len(intersect) - 1, 0)
+        ab_len = sum(len(t) for t in diff_ab) + max(len(diff_ab) - 1, 0)
+        ba_tokens_len = self.tokens_len - sum(len(t) for t in intersect)
+        ba_len = ba_tokens_len + max(diff_ba_count - 1, 0)
+
+        sep = 1 if sect_len else 0
+        sect_ab_len = sect_len + sep + ab_len
+        sect_ba_len = sect_len + sep + ba_len
+
+        # Indel distance between the two diff strings is at least their length difference
+        best = 100 * (1 - abs(ab_len - ba_len) / (sect_ab_len + sect_ba_len))
+        if sect_len:
+            best = max(
+                best,
+                100 * (1 - (sep + ab_len) / (sect_len + sect_ab_len)),
+                100 * (1 - (sep + ba_len) / (sect_len + sect_ba_len)),
+            )
+        return best
+
+
+def match_repos(resume_text, resume_urls, github_repos):
+    """
+    Same rules and thresholds as the original per-repo loop, but the resume is indexed
+    once, cheap exact checks run first, and the fuzzy scorers only run (batched via
+    rapidfuzz.process.cdist) on repos that survive the index prefilters.
+    """
+    index = ResumeIndex(resume_text)
+
+    slug_set = set()
+    for url in resume_urls:
+        match = re.search(r"github\.com/[\w-]+/([\w-]+)", url)
+        if match:
+            slug_set.add(match.group(1).lower())
+
+    reasons = [None] * len(github_repos)
+    fuzzy_name = []
+
+    for i, repo in enumerate(github_repos):
+        name_raw = repo['name'].lower()
+        name_clean = name_raw.replace("-", " ").replace("_", " ")
+
+        if name_raw in slug_set:
+            reasons[i] = "URL Link in Resume"
+        elif name_clean in index.lower or name_raw in index.lower:
+            reasons[i] = "Name Mentioned in Resume"
+        elif index.may_partial_match(name_clean):
+            fuzzy_name.append((i, name_clean))
+
+    if fuzzy_name:
+        scores = process.cdist(
+            [name for _, name in fuzzy_name], [index.lower],
+            scorer=fuzz.partial_ratio, workers=-1,
+        )
+        for (i, _), row in zip(fuzzy_name, scores):
+            if _rounded(row[0]) > NAME_FUZZY_THRESHOLD:
+                reasons[i] = "Fuzzy Name Match"
+
+    descriptions = []
+    for i, repo in enumerate(github_repos):
+        if reasons[i]:
+            continue
+        desc = (repo['description'] or "").lower()
+        if len(desc) <= MIN_DESCRIPTION_LENGTH:
+            continue
+        processed = full_process(desc)
+        if index.token_set_upper_bound(processed) >= DESCRIPTION_THRESHOLD + 0.5:
+            descriptions.append((i, processed))
+
+    if descriptions:
+        scores = process.cdist(
+            [desc for _, desc in descriptions], [index.processed],
+            scorer=fuzz.token_set_ratio, workers=-1,
+        )
+        for (i, _), row in zip(descriptions, scores):
+            score = _rounded(row[0])
+            if score > DESCRIPTION_THRESHOLD:
+                reasons[i] = f"Description Match ({score}%)"
+
+    matches = []
+    for repo, reason in zip(github_repos, reasons):
+        if reason:
+            repo['match_reason'] = reason
+            matches.append(repo)
+    return matches
@@ -0,0 +1,155 @@
+import contextvars
+import os
+import time
+from contextlib import contextmanager
+
+from prometheus_client import Counter, Gauge, Histogram, CONTENT_TYPE_LATEST, generate_latest
+
+try:
+    import config
+except ImportError:
+    import sys
+    sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+    import config
+
+# Adds a Server-Timing header (per-stage durations of that request) to every response
+METRICS_TIMING_HEADER = os.getenv("METRICS_TIMING_HEADER", "0") == "1"
+
+# Pipeline stages run from milliseconds (cache hits, local parsing) to over a minute (LLM, LlamaParse)
+STAGE_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 20, 40, 80)
+
+stage_seconds = Histogram(
+    "fitforworks_stage_seconds", "Wall time of one pipeline stage", ["stage"], buckets=STAGE_BUCKETS,
+)
+request_seconds = Histogram(
+    "fitforworks_request_seconds", "HTTP request time until the response finished",
+    ["method", "route", "status"], buckets=STAGE_BUCKETS,
+)
+llm_call_seconds = Histogram(
+    "fitforworks_llm_call_seconds", "One LLM provider call (outcome: ok, invalid, error, cancelled)",
+    ["provider", "outcome"], buckets=STAGE_BUCKETS,
+)
+llm_answers = Counter(
+    "fitforworks_llm_answers_total", "LLM requests answered, by provider (cache = LLM cache hit)", ["provider"],
+)
+llm_fallbacks = Counter(
+    "fitforworks_llm_fallbacks_total", "Next provider started (reason: hedge, error, stream_error)", ["reason"],
+)
+llm_abandoned_calls = Counter(
+    "fitforworks_llm_abandoned_calls_total",
+    "LLM calls whose answer was no longer needed: hedge losers and calls past the router timeout "
+    "(outcome: not_started, aborted, completed = ran to the end anyway)", ["outcome"],
+)
+llm_failures = Counter("fitforworks_llm_failures_total", "LLM requests where every provider failed")
+json_decodes = Counter(
+    "fitforworks_json_decode_total", "Decoded LLM answers (outcome: clean, repaired, failed)", ["kind", "outcome"],
+)
+match_shortcuts = Counter(
+    "fitforworks_match_shortcuts_total",
+    "Clear mismatches by the keyword screen (mode: short, skip = answered without the full prompt; "
+    "log = full prompt ran anyway)", ["mode"],
+)
+analysis_sections = Counter(
+    "fitforworks_analysis_sections_total",
+    "Resume sections per analysis (outcome: reused, reanalyzed, full = sent with the full prompt)", ["outcome"],
+)
+coalesced_calls = Counter(
+    "fitforworks_coalesced_total", "Calls that joined an identical in-flight computation", ["scope"],
+)
+github_rate_limit_remaining = Gauge(
+    "fitforworks_github_rate_limit_remaining", "GitHub requests left, summed over the token pool", ["api"],
+)
+github_requests = Counter(
+    "fitforworks_github_requests_total",
+    "GitHub API calls by priority (outcome: ok, rate_limited, error, skipped = refused by the scheduler)",
+    ["priority", "outcome"],
+)
+
+_request_spans = contextvars.ContextVar("request_spans", default=None)
+
+
+def record_span(name, seconds):
+    """Adds a finished span to the current request's Server-Timing collector, if any."""
+    spans = _request_spans.get()
+    if spans is not None:
+        spans.append((name, seconds))
+
+
+@contextmanager
+def span(stage):
+    """
+    Times the block into fitforworks_stage_seconds{stage} and the request's timing collector.
+    The collector is carried into worker threads by run_blocking / copy_context().
+    """
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        elapsed = time.perf_counter() - start
+        stage_seconds.labels(stage).observe(elapsed)
+        record_span(stage, elapsed)
+
+
+def server_timing(spans, total):
+    """
+    Server-Timing header value; repeated spans (one per audited repo) are summed
+    and their count is given as the description.
+    """
+    merged = {}
+    for name, seconds in spans:
+        count, sum_seconds = merged.get(name, (0, 0.0))
+        merged[name] = (count + 1, sum_seconds + seconds)
+
+    parts = []
+    for name, (count, seconds) in merged.items():
+        desc = f';desc="x{count}"' if count > 1 else ""
+        parts.append(f"{name};dur={seconds * 1000:.1f}{desc}")
+    parts.append(f"total;dur={total * 1000:.1f}")
+    return ", ".join(parts)
+
+
+class MetricsMiddleware:
+    """
+    Times every HTTP request into fitforworks_request_seconds (by route template) and
+    collects the spans recorded while handling it. With METRICS_TIMING_HEADER=1 they are
+    sent back as a Server-Timing header; for streamed responses that only covers the
+    stages finished before the first byte.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        spans = []
+        token = _request_spans.set(spans)
+        start = time.perf_counter()
+        status = 500
+
+        async def send_with_timing(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+                if METRICS_TIMING_HEADER:
+                    header = server_timing(spans, time.perf_counter() - start)
+                    message = dict(message, headers=list(message.get("headers", [])) + [
+                        (b"server-timing", header.encode("latin-1")),
+                    ])
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_timing)
+        finally:
+            _request_spans.reset(token)
+            route = scope.get("route")
+            request_seconds.labels(
+                scope["method"], getattr(route, "path", "unmatched"), str(status),
+            ).observe(time.perf_counter() - start)
+
+
+def render_metrics():
+    """Returns (body, content type) in the Prometheus text exposition format."""
+    return generate_latest(), CONTENT_TYPE_LATEST
@@ -1,44 +1,235 @@
-from llama_parse import LlamaParse
-import pdfplumber
 import os
-from dotenv import load_dotenv
+import io
+import time
+import hashlib
+import threading
 
-
-load_dotenv(os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), '.env'))
+try:
+    import config
+    from cache import LRUCache, SQLiteStore, TieredCache
+    from pdf_text import page_lines, has_columns, lines_to_markdown, body_font_size, score_quality, PAGE_BREAK
+    from executor import get_process_pool, share_bytes, read_shared, PDF_POOL_TRANSFER
+    from metrics import span
+except ImportError:
+    import sys
+    sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+    import config
+    from cache import LRUCache, SQLiteStore, TieredCache
+    from pdf_text import page_lines, has_columns, lines_to_markdown, body_font_size, score_quality, PAGE_BREAK
+    from executor import get_process_pool, share_bytes, read_shared, PDF_POOL_TRANSFER
+    from metrics import span
 
 
 if os.getenv("LLAMA_API_KEY") or os.getenv("VITE_LLAMA_API_KEY"):
     os.environ["LLAMA_CLOUD_API_KEY"] = os.getenv("LLAMA_API_KEY") or os.getenv("VITE_LLAMA_API_KEY")
 
-def extract_resume_data(file_path):
+PARSE_CACHE_ENABLED = os.getenv("PARSE_CACHE_ENABLED", "1") != "0"
+PARSE_CACHE_MAX_BYTES = int(os.getenv("PARSE_CACHE_MAX_BYTES", str(32 * 1024 * 1024)))
+PARSE_CACHE_TTL = int(os.getenv("PARSE_CACHE_TTL", str(24 * 60 * 60)))
+PARSE_CACHE_DB = os.getenv("PARSE_CACHE_DB")
+# "auto": local pdfplumber text, escalating to LlamaParse when its quality score is low;
+# "local": never call LlamaParse; "llamaparse": always call it (previous behaviour)
+PARSE_MODE = os.getenv("PARSE_MODE", "auto").lower()
+PARSE_QUALITY_THRESHOLD = float(os.getenv("PARSE_QUALITY_THRESHOLD", "0.75"))
+
+
+parse_cache = TieredCache(
+    LRUCache(max_bytes=PARSE_CACHE_MAX_BYTES, ttl=PARSE_CACHE_TTL),
+    SQLiteStore(PARSE_CACHE_DB, ttl=PARSE_CACHE_TTL, table="parse_cache") if PARSE_CACHE_DB else None,
+)
+
+
+def hash_pdf(file_path):
     """
-    1. LlamaParse: Get full text (Markdown) for semantic/name matching.
-    2. pdfplumber: Get Hyperlinks (URLs) for 100% precision matching.
+    Content hash of the PDF bytes, used as the parse cache key.
+    file_path may also be the PDF bytes themselves.
     """
-    print("   🦙 Sending Resume to LlamaParse...")
+    if isinstance(file_path, bytes):
+        return hashlib.sha256(file_path).hexdigest()
+    digest = hashlib.sha256()
+    with open(file_path, "rb") as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
 
-    full_markdown = ""
+
+class PDFJobStats:
+    """
+    CPU and wall time of PDF scan jobs, wherever they ran (thread or worker process).
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.jobs = 0
+        self.cpu_time = 0.0
+        self.wall_time = 0.0
+        self.max_cpu_time = 0.0
+        self.workers = set()
+
+    def record(self, job):
+        with self._lock:
+            self.jobs += 1
+            self.cpu_time += job["cpu_time"]
+            self.wall_time += job["wall_time"]
+            self.max_cpu_time = max(self.max_cpu_time, job["cpu_time"])
+            self.workers.add(job["pid"])
+
+    def stats(self):
+        with self._lock:
+            return {
+                "backend": "process" if get_process_pool() is not None else "thread",
+                "jobs": self.jobs,
+                "cpu_time_seconds": round(self.cpu_time, 3),
+                "avg_cpu_time": round(self.cpu_time / self.jobs, 4) if self.jobs else 0.0,
+                "max_cpu_time": round(self.max_cpu_time, 4),
+                "avg_wall_time": round(self.wall_time / self.jobs, 4) if self.jobs else 0.0,
+                "worker_pids_seen": len(self.workers),
+            }
+
+
+pdf_job_stats = PDFJobStats()
+
+
+def scan_pdf(file_path, extract_text=True):
+    """
+    Single pdfplumber pass: collects GitHub hyperlinks and, with extract_text, builds
+    markdown-ish text locally and scores its quality (see pdf_text.score_quality).
+    Returns (markdown, urls, quality); quality is None when no text was extracted.
+    file_path may also be the PDF bytes or a file-like object.
+    """
     extracted_urls = set()
+    page_lines_list = []
+    multi_column = False
+    pages = 0
+
+    import pdfplumber
+
+    if isinstance(file_path, bytes):
+        file_path = io.BytesIO(file_path)
 
+    with pdfplumber.open(file_path) as pdf:
+        for page in pdf.pages:
+            pages += 1
+            if page.annots:
+                for annot in page.annots:
+                    uri = annot.get('uri')
+                    if uri and 'github.com' in uri:
+                        extracted_urls.add(uri)
+            if extract_text:
+                lines = page_lines(page)
+                multi_column = multi_column or has_columns(lines, page.width)
+                page_lines_list.append(lines)
 
+    if not extract_text:
+        return "", extracted_urls, None
+
+    body_size = body_font_size([line for lines in page_lines_list for line in lines])
+    markdown = PAGE_BREAK.join(lines_to_markdown(lines, body_size) for lines in page_lines_list if lines)
+    return markdown, extracted_urls, score_quality(markdown, pages, multi_column)
+
+
+def scan_pdf_job(file_path, extract_text=True, shared=None):
+    """
+    scan_pdf as a self-contained job for the process pool: takes a path or bytes, or a
+    (shared memory name, size) pair holding the PDF bytes, and reports its own CPU time.
+    """
+    start_wall, start_cpu = time.perf_counter(), time.thread_time()
+    source = io.BytesIO(read_shared(*shared)) if shared else file_path
+    markdown, urls, quality = scan_pdf(source, extract_text)
+    job = {
+        "cpu_time": time.thread_time() - start_cpu,
+        "wall_time": time.perf_counter() - start_wall,
+        "pid": os.getpid(),
+    }
+    return markdown, sorted(urls), quality, job
+
+
+def run_scan_pdf(file_path, extract_text=True):
+    """
+    Runs scan_pdf_job on the PDF process pool when one is configured (PDF_POOL_WORKERS),
+    otherwise on the calling thread. Returns (markdown, urls, quality).
+    """
+    pool = get_process_pool()
+    if pool is None:
+        markdown, urls, quality, job = scan_pdf_job(file_path, extract_text)
+    elif PDF_POOL_TRANSFER == "shm":
+        if isinstance(file_path, bytes):
+            data = file_path
+        else:
+            with open(file_path, "rb") as f:
+                data = f.read()
+        block = share_bytes(data)
+        try:
+            markdown, urls, quality, job = pool.submit(scan_pdf_job, None, extract_text, (block.name, len(data))).result()
+        finally:
+            block.close()
+            block.unlink()
+    else:
+        markdown, urls, quality, job = pool.submit(scan_pdf_job, file_path, extract_text).result()
+
+    pdf_job_stats.record(job)
+    print(f"   ⏱️ PDF scan: {job['cpu_time'] * 1000:.0f} ms CPU, {job['wall_time'] * 1000:.0f} ms wall (pid {job['pid']})")
+    return markdown, set(urls), quality
+
+
+def parse_with_llamaparse(file_path):
+    print("   🦙 Sending Resume to LlamaParse...")
     try:
+        # Heavy import (~2 s), only paid when a resume actually needs the cloud parser
+        from llama_parse import LlamaParse
         parser = LlamaParse(result_type="markdown", verbose=True)
-        documents = parser.load_data(file_path)
-        full_markdown = "\n".join([doc.text for doc in documents])
+        if isinstance(file_path, bytes):
+            documents = parser.load_data(file_path, extra_info={"file_name": "resume.pdf"})
+        else:
+            documents = parser.load_data(file_path)
+        return PAGE_BREAK.join([doc.text for doc in documents])
     except Exception as e:
         print(f"   ❌ LlamaParse Error: {e}")
+        return ""
+
+
+def extract_resume_data(file_path):
+    """
+    1. pdfplumber: Get Hyperlinks (URLs) for 100% precision matching, and (PARSE_MODE=auto)
+       the full text as markdown, in the same pass.
+    2. LlamaParse: only when the local text scores below PARSE_QUALITY_THRESHOLD
+       (scanned pages, garbled fonts, multi-column layouts).
 
+    file_path is the PDF's path or its bytes (uploads small enough to stay in memory).
+    Results are cached by PDF content hash, so re-uploading the same file skips both steps.
+    """
+    cache_key = None
+    if PARSE_CACHE_ENABLED:
+        cache_key = hash_pdf(file_path)
+        cached = parse_cache.get(cache_key)
+        if cached is not None:
+            print("   ⚡ Parse cache hit, skipping LlamaParse")
+            return cached["markdown"], list(cached["urls"])
 
     print("   📄 Scanning PDF for Hyperlinks...")
+    local_markdown, extracted_urls, quality = "", set(), None
     try:
-        with pdfplumber.open(file_path) as pdf:
-            for page in pdf.pages:
-                if page.annots:
-                    for annot in page.annots:
-                        uri = annot.get('uri')
-                        if uri and 'github.com' in uri:
-                            extracted_urls.add(uri)
+        with span("pdf_scan"):
+            local_markdown, extracted_urls, quality = run_scan_pdf(file_path, extract_text=PARSE_MODE != "llamaparse")
     except Exception as e:
         print(f"   ❌ PDF Banner Error: {e}")
 
+    full_markdown = ""
+    if quality and (PARSE_MODE == "local" or quality["score"] >= PARSE_QUALITY_THRESHOLD):
+        print(f"   ⚡ Local extraction is good enough (quality {quality['score']}), skipping LlamaParse")
+        full_markdown = local_markdown
+    else:
+        if quality:
+            print(f"   🔎 Local extraction quality {quality['score']} is too low: {quality}")
+        if PARSE_MODE != "local":
+            with span("llamaparse"):
+                full_markdown = parse_with_llamaparse(file_path)
+        if not full_markdown and local_markdown:
+            print("   ↩️ Falling back to the local extraction")
+            full_markdown = local_markdown
+
+    # Only cache successful parses so a transient LlamaParse failure is retried next time
+    if cache_key and full_markdown:
+        parse_cache.set(cache_key, {"markdown": full_markdown, "urls": sorted(extracted_urls)})
+
     return full_markdown, list(extracted_urls)
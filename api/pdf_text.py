@@ -0,0 +1,129 @@
+import re
+import statistics
+
+
+BULLET_CHARS = "•●▪■◦‣∙·-–*⋄◆►>"
+# Horizontal gap (pt) between words that separates two fields on one line (e.g. title ... date)
+FIELD_GAP = 30
+# A vertical band this wide with no text, and text on both sides, marks a column gutter
+MIN_GUTTER_WIDTH = 12
+MIN_COLUMN_LINE_SHARE = 0.3
+MIN_CHARS_PER_PAGE = 300
+# Between pages of parsed markdown, so compaction.normalize_markdown can tell running headers/footers apart
+PAGE_BREAK = "\n\n<!-- page break -->\n\n"
+GARBLED_RE = re.compile(r"\(cid:\d+\)|[\ufffd\ue000-\uf8ff\x00-\x08\x0b\x0c\x0e-\x1f]")
+
+
+def _is_bold(fontname):
+    name = fontname.split("+")[-1].lower()
+    return any(tag in name for tag in ("bold", "black", "heavy", "semibold", "cmbx"))
+
+
+def page_lines(page, tolerance=3):
+    """
+    Groups the page's words into visual lines (top to bottom, left to right).
+    Each line is a list of pdfplumber word dicts (with size and fontname).
+    """
+    words = page.extract_words(extra_attrs=["size", "fontname"])
+    words.sort(key=lambda w: (round(w["top"]), w["x0"]))
+
+    lines = []
+    for word in words:
+        if lines and abs(lines[-1][0]["top"] - word["top"]) <= tolerance:
+            lines[-1].append(word)
+        else:
+            lines.append([word])
+    for line in lines:
+        line.sort(key=lambda w: w["x0"])
+    return lines
+
+
+def has_columns(lines, page_width):
+    """
+    Multi-column layouts have an empty vertical band (the gutter) in the middle of the
+    page with text on both sides of it on a good share of lines. Single-column resumes
+    with right-aligned dates don't: full-width bullet lines cover every band.
+    """
+    if len(lines) < 5:
+        return False
+
+    bins = [0] * (int(page_width) // 2 + 1)
+    for line in lines:
+        for word in line:
+            for b in range(int(word["x0"]) // 2, min(int(word["x1"]) // 2 + 1, len(bins))):
+                bins[b] += 1
+
+    lo, hi = int(page_width * 0.25) // 2, int(page_width * 0.75) // 2
+    run_start = None
+    for b in range(lo, hi + 1):
+        if bins[b] == 0 and run_start is None:
+            run_start = b
+        elif bins[b] != 0 and run_start is not None:
+            if (b - run_start) * 2 >= MIN_GUTTER_WIDTH:
+                gutter = (run_start + b)  # midpoint in points (bins are 2pt wide)
+                both_sides = sum(
+                    1 for line in lines
+                    if line[0]["x0"] < gutter and line[-1]["x1"] > gutter
+                )
+                if both_sides / len(lines) >= MIN_COLUMN_LINE_SHARE:
+                    return True
+            run_start = None
+    return False
+
+
+def lines_to_markdown(lines, body_size):
+    """
+    Renders visual lines as markdown-ish text: larger-than-body or short bold/all-caps
+    lines become headings, bullet glyphs become "- " items, and wide gaps between words
+    (title ... dates) become " | " so fields don't run together.
+    """
+    out = []
+    for line in lines:
+        parts = [line[0]["text"]]
+        for prev, word in zip(line, line[1:]):
+            parts.append(" | " if word["x0"] - prev["x1"] > FIELD_GAP else " ")
+            parts.append(word["text"])
+        text = "".join(parts).strip()
+        if not text:
+            continue
+
+        size = max(w["size"] for w in line)
+        bold = all(_is_bold(w["fontname"]) for w in line)
+        letters = "".join(c for c in text if c.isalpha())
+        caps = bool(letters) and letters.isupper()
+
+        if line[0]["text"] in BULLET_CHARS:
+            out.append("- " + text[1:].strip())
+        elif size >= body_size * 1.5:
+            out.append("# " + text)
+        elif len(line) <= 4 and (size >= body_size * 1.1 or (caps and bold)):
+            out.append("\n## " + text)
+        else:
+            out.append(text)
+    return "\n".join(out)
+
+
+def body_font_size(lines):
+    sizes = [round(w["size"], 1) for line in lines for w in line]
+    return statistics.mode(sizes) if sizes else 10.0
+
+
+def score_quality(text, pages, multi_column):
+    """
+    0..1 score for a local extraction:
+    - text density: scanned/image PDFs yield little or no text per page
+    - garbled-glyph ratio: (cid:NN) placeholders, U+FFFD, private-use and control chars
+    - column layout: pdfplumber reads multi-column pages line by line across columns,
+      interleaving unrelated text, so those are heavily penalised
+    """
+    chars = len(text.strip())
+    density = min(1.0, chars / (MIN_CHARS_PER_PAGE * max(pages, 1)))
+    garbled = len(GARBLED_RE.findall(text)) / chars if chars else 1.0
+    score = density * max(0.0, 1 - 5 * garbled) * (0.4 if multi_column else 1.0)
+    return {
+        "score": round(score, 3),
+        "chars": chars,
+        "density": round(density, 3),
+        "garbled_ratio": round(garbled, 4),
+        "multi_column": multi_column,
+    }
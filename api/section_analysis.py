@@ -0,0 +1,278 @@
+import hashlib
+import json
+import os
+import re
+import threading
+
+try:
+    import config
+    from cache import LRUCache, SQLiteStore
+    from compaction import normalize_markdown, split_sections
+except ImportError:
+    import sys
+    sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+    import config
+    from cache import LRUCache, SQLiteStore
+    from compaction import normalize_markdown, split_sections
+
+
+# auto: re-uploads only re-analyze the sections that changed; off: always the full prompt
+SECTION_ANALYSIS = os.getenv("SECTION_ANALYSIS", "auto").lower()
+# "memory" (default), "sqlite" or "off"
+SECTION_CACHE_BACKEND = os.getenv("SECTION_CACHE_BACKEND", "memory").lower()
+SECTION_CACHE_TTL = int(os.getenv("SECTION_CACHE_TTL", str(7 * 24 * 60 * 60)))
+SECTION_CACHE_MAX_BYTES = int(os.getenv("SECTION_CACHE_MAX_BYTES", str(8 * 1024 * 1024)))
+SECTION_CACHE_MAX_ENTRIES = int(os.getenv("SECTION_CACHE_MAX_ENTRIES", "20000"))
+SECTION_CACHE_DB = os.getenv("SECTION_CACHE_DB", "/tmp/fitforworks/section_cache.sqlite3")
+# With more of the resume (by characters) changed than this, or fewer than half of its sections
+# unchanged, the full prompt is run instead; Experience alone is often half of a resume
+SECTION_REANALYZE_MAX_SHARE = float(os.getenv("SECTION_REANALYZE_MAX_SHARE", "0.75"))
+
+# Bump when the analysis or section prompts change, so feedback for the old prompts isn't reused
+SECTION_FEEDBACK_VERSION = 2
+
+# Whole-resume fields of a full analysis the incremental path reuses; only the scores are recomputed
+PROFILE_FIELDS = ("domain_mismatch", "domain_mismatch_advice", "summary", "strengths", "improvements", "github_feedback")
+
+# Section title keywords -> kind; titles matching none ("Software Engineer, Acme") are entries of
+# the section before them
+SECTION_KINDS = [
+    ("experience", ("experience", "employment", "work history", "internship")),
+    ("projects", ("project",)),
+    ("skills", ("skill", "technolog", "tools", "stack")),
+    ("education", ("education", "academic", "coursework")),
+    ("summary", ("summary", "objective", "profile", "about")),
+]
+
+
+def section_kind(title):
+    if title is None:
+        return "header"
+    lower = title.lower()
+    for kind, keywords in SECTION_KINDS:
+        if any(keyword in lower for keyword in keywords):
+            return kind
+    return "other"
+
+
+def _hash(text):
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+def segment_resume(text):
+    """
+    Splits resume markdown into [{"kind", "title", "text", "hash"}] in resume order: the header
+    (name, contact) and one section per Experience / Projects / Skills / Education / Summary
+    heading. The hash is over the normalized text, so a re-parse with different whitespace or
+    page breaks leaves an unedited section's hash unchanged.
+    """
+    sections = []
+    for title, lines in split_sections(normalize_markdown(text)):
+        body = "\n".join(lines).strip()
+        if not body:
+            continue
+        kind = section_kind(title)
+        if kind == "other" and sections and sections[-1]["kind"] != "header":
+            sections[-1]["text"] += "\n" + body
+            continue
+        sections.append({"kind": kind, "title": title or "Header", "text": body})
+    for section in sections:
+        section["hash"] = _hash(section["text"])
+    return sections
+
+
+def document_lineage(sections):
+    """
+    Identifies one resume across its edits: the hash of its opening block (name, contact),
+    which edits rarely touch. Another candidate's identical "Skills" section doesn't share
+    cache entries with this one.
+    """
+    return sections[0]["hash"] if sections else ""
+
+
+def projects_digest(projects):
+    """The verified GitHub projects as the profile entry depends on them (github_feedback)."""
+    return sorted(f"{p.get('name')}: {(p.get('audit') or {}).get('summary')}" for p in projects or [])
+
+
+def analysis_context(user_context):
+    """The part of the request that changes the feedback: the target category, role and level."""
+    user_context = user_context or {}
+    return [user_context.get("category"), user_context.get("role"), user_context.get("level")]
+
+
+def _searchable(text):
+    return " ".join(re.sub(r"[*_`#|]", " ", text or "").lower().split())
+
+
+def assign_improvements(sections, improvements):
+    """
+    Splits an analysis' detailed_improvements by section: the section quoting the suggestion's
+    original_text, else the first one whose kind matches its "section" field.
+    Returns ([improvements per section], [improvements that fit none]).
+    """
+    assigned = [[] for _ in sections]
+    unassigned = []
+    texts = [_searchable(section["text"]) for section in sections]
+    for improvement in improvements:
+        if not isinstance(improvement, dict):
+            continue
+        quote = _searchable(improvement.get("original_text"))
+        index = next((i for i, text in enumerate(texts) if quote and quote in text), None)
+        if index is None:
+            kind = section_kind(improvement.get("section") or "")
+            index = next((i for i, section in enumerate(sections) if section["kind"] == kind), None)
+        if index is None:
+            unassigned.append(improvement)
+        else:
+            assigned[index].append(improvement)
+    return assigned, unassigned
+
+
+class SectionFeedbackCache:
+    """
+    detailed_improvements per resume section, keyed on sha256(prompt version, document lineage,
+    section kind, section hash, analysis context). An empty list is a valid entry: the section
+    was reviewed and needs no changes. Next to them, one profile entry per resume (lineage,
+    context, verified projects) keeps the full analysis' PROFILE_FIELDS and the suggestions
+    that fit no section. The backend is cache.LRUCache or cache.SQLiteStore.
+    """
+
+    def __init__(self, backend):
+        self.backend = backend
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.stores = 0
+
+    @staticmethod
+    def make_key(*parts):
+        payload = json.dumps([SECTION_FEEDBACK_VERSION, *parts])
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def get(self, section, context, lineage):
+        entry = self._get(self.make_key(lineage, section["kind"], section["hash"], context))
+        return None if entry is None else entry["improvements"]
+
+    def set(self, section, context, lineage, improvements):
+        self._set(self.make_key(lineage, section["kind"], section["hash"], context), {"improvements": improvements})
+
+    def get_profile(self, lineage, context, projects):
+        """{"fields": PROFILE_FIELDS values, "unassigned": [improvements]} or None."""
+        return self._get(self.make_key(lineage, "profile", projects_digest(projects), context))
+
+    def set_profile(self, lineage, context, projects, fields, unassigned):
+        self._set(self.make_key(lineage, "profile", projects_digest(projects), context),
+                  {"fields": fields, "unassigned": unassigned})
+
+    def _get(self, key):
+        entry = self.backend.get(key) if self.backend is not None else None
+        with self._lock:
+            if entry is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+        return entry
+
+    def _set(self, key, entry):
+        if self.backend is None:
+            return
+        self.backend.set(key, entry)
+        with self._lock:
+            self.stores += 1
+
+    def stats(self):
+        lookups = self.hits + self.misses
+        return {
+            "backend": SECTION_CACHE_BACKEND,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+            "stores": self.stores,
+            "storage": self.backend.stats() if self.backend is not None else None,
+        }
+
+
+def _make_backend():
+    if SECTION_CACHE_BACKEND == "off":
+        return None
+    if SECTION_CACHE_BACKEND == "sqlite":
+        return SQLiteStore(SECTION_CACHE_DB, ttl=SECTION_CACHE_TTL, table="section_feedback",
+                           max_entries=SECTION_CACHE_MAX_ENTRIES)
+    return LRUCache(max_bytes=SECTION_CACHE_MAX_BYTES, ttl=SECTION_CACHE_TTL)
+
+
+section_cache = SectionFeedbackCache(_make_backend())
+
+
+def plan_sections(sections, context, projects):
+    """
+    Looks this resume's sections and profile entry up in section_cache. Returns ([cached
+    improvements, or None for a changed section], the profile entry, share of the resume's
+    characters in changed sections) and whether the incremental path applies: the profile is
+    cached, some but not most sections changed and not too much of the text changed. An
+    unchanged resume runs the full prompt again, which the LLM cache answers with the same
+    scores as last time instead of a fresh score recompute.
+    """
+    lineage = document_lineage(sections)
+    cached = [section_cache.get(section, context, lineage) for section in sections]
+    profile = section_cache.get_profile(lineage, context, projects)
+    total = sum(len(section["text"]) for section in sections)
+    changed = sum(len(section["text"]) for section, feedback in zip(sections, cached) if feedback is None)
+    share = changed / total if total else 1.0
+    incremental = (
+        SECTION_ANALYSIS == "auto"
+        and profile is not None
+        and any(feedback is None for feedback in cached)
+        and sum(feedback is not None for feedback in cached) * 2 > len(sections)
+        and share <= SECTION_REANALYZE_MAX_SHARE
+    )
+    return cached, profile, share, incremental
+
+
+def store_section(sections, index, context, improvements):
+    section_cache.set(sections[index], context, document_lineage(sections), improvements)
+
+
+def seed_sections(sections, context, projects, analysis):
+    """
+    Stores a full analysis for the next upload of this resume: each section's feedback, and the
+    PROFILE_FIELDS with the suggestions that fit no section as the resume's profile entry.
+    """
+    if "error" in analysis or not isinstance(analysis.get("detailed_improvements"), list):
+        return
+    assigned, unassigned = assign_improvements(sections, analysis["detailed_improvements"])
+    for index, improvements in enumerate(assigned):
+        store_section(sections, index, context, improvements)
+    fields = {field: analysis[field] for field in PROFILE_FIELDS if field in analysis}
+    section_cache.set_profile(document_lineage(sections), context, projects, fields, unassigned)
+
+
+def merge_analysis(scores, profile, sections, feedback, reanalyzed):
+    """
+    The /api/analyze answer: the recomputed scores (ats_score, ratings) over the profile entry's
+    summary, strengths, ..., and each section's detailed_improvements in resume order, then the
+    suggestions that fit no section.
+    """
+    analysis = dict(profile["fields"])
+    analysis.update(scores)
+    analysis["detailed_improvements"] = [item for improvements in feedback for item in improvements]
+    analysis["detailed_improvements"] += profile["unassigned"]
+    analysis["section_analysis"] = section_report(sections, "incremental", reanalyzed)
+    return analysis
+
+
+def section_report(sections, mode, reanalyzed=None):
+    """`section_analysis` block of the answer: how it was produced and which sections were (re)analyzed."""
+    return {
+        "mode": mode,
+        "sections": [
+            {
+                "kind": section["kind"],
+                "title": section["title"],
+                "hash": section["hash"][:16],
+                "reanalyzed": reanalyzed is None or index in reanalyzed,
+            }
+            for index, section in enumerate(sections)
+        ],
+    }
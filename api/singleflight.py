@@ -0,0 +1,109 @@
+import asyncio
+import copy
+import os
+import threading
+
+try:
+    import config
+    from metrics import coalesced_calls
+except ImportError:
+    import sys
+    sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+    import config
+    from metrics import coalesced_calls
+
+
+class SingleFlight:
+    """
+    Coalesces concurrent calls with the same key (for worker threads): the first caller
+    runs fn(), callers arriving while it is in flight wait for it and share the outcome
+    (result or exception). Followers get a deep copy, since callers mutate what they get back.
+    Nothing is cached: once the call finishes, the next caller runs fn() again.
+    """
+
+    def __init__(self, name):
+        self.name = name
+        self._calls = {}
+        self._lock = threading.Lock()
+        self.leaders = 0
+        self.coalesced = 0
+
+    def do(self, key, fn):
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = {"done": threading.Event(), "followers": 0, "result": None, "error": None}
+                self._calls[key] = call
+                self.leaders += 1
+            else:
+                call["followers"] += 1
+                self.coalesced += 1
+                coalesced_calls.labels(self.name).inc()
+
+        if not leader:
+            call["done"].wait()
+            if call["error"] is not None:
+                raise call["error"]
+            return copy.deepcopy(call["result"])
+
+        result = None
+        try:
+            result = fn()
+            return result
+        except BaseException as e:
+            call["error"] = e
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            # Snapshot before the leader's caller gets (and may mutate) the original
+            if call["followers"] and call["error"] is None:
+                call["result"] = copy.deepcopy(result)
+            call["done"].set()
+
+    def stats(self):
+        with self._lock:
+            return {"in_flight": len(self._calls), "leaders": self.leaders, "coalesced": self.coalesced}
+
+
+class AsyncSingleFlight:
+    """
+    SingleFlight for coroutines on the event loop. The computation runs as its own task,
+    so a caller that disconnects (and is cancelled) doesn't cancel it for the others.
+    """
+
+    def __init__(self, name):
+        self.name = name
+        self._tasks = {}
+        self.leaders = 0
+        self.coalesced = 0
+
+    def join(self, key, factory):
+        """
+        Returns (task, leader). factory() creates the coroutine and is only called when no
+        computation for `key` is in flight (leader=True). Await the task through
+        asyncio.shield() so cancelling one caller leaves it running.
+        """
+        task = self._tasks.get(key)
+        if task is not None:
+            self.coalesced += 1
+            coalesced_calls.labels(self.name).inc()
+            return task, False
+
+        task = asyncio.ensure_future(factory())
+        self._tasks[key] = task
+        self.leaders += 1
+
+        def finished(done):
+            if self._tasks.get(key) is done:
+                del self._tasks[key]
+            # Mark the exception as retrieved in case every caller went away
+            if not done.cancelled():
+                done.exception()
+
+        task.add_done_callback(finished)
+        return task, True
+
+    def stats(self):
+        return {"in_flight": len(self._tasks), "leaders": self.leaders, "coalesced": self.coalesced}
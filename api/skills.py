@@ -0,0 +1,251 @@
+import json
+import os
+import re
+import threading
+import time
+from collections import deque
+
+try:
+    import config
+except ImportError:
+    import sys
+    sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+    import config
+
+
+# Versioned taxonomy: {"version", "skills": [{"name", "category", "aliases", "case_sensitive"}]}
+SKILLS_DATA_FILE = os.getenv(
+    "SKILLS_DATA_FILE", os.path.join(os.path.dirname(os.path.abspath(__file__)), "data", "skills_v1.json"),
+)
+
+# Characters that continue a word: "C" doesn't match inside "C++", nor "R" inside "R&D"
+_WORD_CHARS = set("+#&_")
+
+
+def _fold(form):
+    return " ".join(form.lower().split())
+
+
+def _is_word_char(ch):
+    return ch.isalnum() or ch in _WORD_CHARS
+
+
+def _word(text, index, step):
+    """The run of word characters from text[index] in direction `step` (1 or -1)."""
+    end = index
+    while 0 <= end < len(text) and _is_word_char(text[end]):
+        end += step
+    return text[index:end] if step > 0 else text[end + 1:index + 1]
+
+
+def _neighbour(text, index, step, skip=("and", "or")):
+    """
+    The word next to text[index] in direction `step`, across at most three separator characters
+    on the same line (", ", " / ", "-") and past one of `skip`; "" when there is none.
+    """
+    for _ in range(2):
+        gap = 0
+        while 0 <= index < len(text) and not _is_word_char(text[index]):
+            if text[index] == "\n" or gap == 3:
+                return ""
+            index += step
+            gap += 1
+        word = _word(text, index, step)
+        if word.lower() not in skip:
+            return word
+        index += step * len(word)
+    return ""
+
+
+def _in_letter_list(text, start, end, skill_letters):
+    """
+    True when a one-letter match ("C", "R") sits in an enumeration like "A, B, C and D": a
+    neighbour is a standalone letter that isn't a skill itself. "C++" and "C#" are whole
+    words, so "C, C++" isn't one; neither is "C, R".
+    """
+    return any(
+        len(word) == 1 and word.isalpha() and word not in skill_letters
+        for word in (_neighbour(text, start - 1, -1), _neighbour(text, end, 1))
+    )
+
+
+class SkillIndex:
+    """
+    Aho-Corasick automaton over every skill name and alias of the taxonomy. extract() finds
+    all of them in one pass over the text (case-folded, whitespace runs read as one space),
+    keeps matches that sit on word boundaries, and resolves overlaps leftmost-longest
+    ("Node.js" over "Node", "Spring Boot" over "Spring").
+
+    Forms listed under "case_sensitive" (Go, R, Swift, Excel, ...) only match with that exact
+    casing, so everyday words don't turn into skills; "not_followed_by" patterns (matched against
+    the whole next word) reject the phrases that are still English: "Go to market", "Excel at",
+    "Spring 2023".
+    """
+
+    def __init__(self, skills, version=None):
+        self.version = version
+        self.skills = [(skill["name"], skill.get("category")) for skill in skills]
+        self.guards = {
+            skill_id: re.compile("|".join(skill["not_followed_by"]), re.IGNORECASE)
+            for skill_id, skill in enumerate(skills) if skill.get("not_followed_by")
+        }
+        self.goto = [{}]
+        self.fail = [0]
+        # state -> [(pattern length, skill id, exact forms or None)]
+        self.out = [[]]
+        self.patterns = 0
+        self.letters = set()
+
+        for skill_id, skill in enumerate(skills):
+            exact = {_fold(form): [] for form in skill.get("case_sensitive", [])}
+            for form in skill.get("case_sensitive", []):
+                exact[_fold(form)].append(" ".join(form.split()))
+                if len(form) == 1:
+                    self.letters.add(form)
+            forms = {_fold(form) for form in [skill["name"]] + skill.get("aliases", [])}
+            for form in forms:
+                self._add(form, skill_id, tuple(exact[form]) if form in exact else None)
+        self._link()
+
+    def _add(self, pattern, skill_id, exact):
+        state = 0
+        for ch in pattern:
+            nxt = self.goto[state].get(ch)
+            if nxt is None:
+                nxt = len(self.goto)
+                self.goto.append({})
+                self.fail.append(0)
+                self.out.append([])
+                self.goto[state][ch] = nxt
+            state = nxt
+        self.out[state].append((len(pattern), skill_id, exact))
+        self.patterns += 1
+
+    def _link(self):
+        """Failure links, breadth first; each state also emits the patterns of its failure state."""
+        queue = deque(self.goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for ch, nxt in self.goto[state].items():
+                queue.append(nxt)
+                fallback = self.fail[state]
+                while fallback and ch not in self.goto[fallback]:
+                    fallback = self.fail[fallback]
+                # Depth-1 states fail to the root
+                self.fail[nxt] = self.goto[fallback].get(ch, 0) if state else 0
+                self.out[nxt] = self.out[nxt] + self.out[self.fail[nxt]]
+
+    def find(self, text):
+        """Yields (start, end, skill id) for every accepted match, in text order."""
+        goto, fail, out = self.goto, self.fail, self.out
+        # Position in `text` of each folded character consumed so far
+        positions = []
+        candidates = []
+        state = 0
+        previous_space = True
+        for index, ch in enumerate(text):
+            if ch.isspace():
+                if previous_space:
+                    continue
+                ch = " "
+                previous_space = True
+            else:
+                ch = ch.lower()
+                previous_space = False
+            positions.append(index)
+
+            while state and ch not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(ch, 0)
+            for length, skill_id, exact in out[state]:
+                start = positions[-length]
+                candidates.append((start, index + 1, skill_id, exact))
+
+        # Leftmost-longest, skipping matches inside words or with the wrong casing
+        candidates.sort(key=lambda match: (match[0], -match[1]))
+        taken_until = 0
+        for start, end, skill_id, exact in candidates:
+            if start < taken_until:
+                continue
+            if start > 0 and _is_word_char(text[start - 1]) and _is_word_char(text[start]):
+                continue
+            if end < len(text) and _is_word_char(text[end]) and _is_word_char(text[end - 1]):
+                continue
+            if exact is not None and " ".join(text[start:end].split()) not in exact:
+                continue
+            if end - start == 1 and _in_letter_list(text, start, end, self.letters):
+                continue
+            guard = self.guards.get(skill_id)
+            if guard is not None and guard.fullmatch(_neighbour(text, end, 1, skip=())):
+                continue
+            taken_until = end
+            yield start, end, skill_id
+
+    def extract(self, text):
+        """
+        Canonical skills in `text` as [{"name", "category", "mentions"}], most mentioned
+        first (ties in order of first appearance).
+        """
+        counts = {}
+        for _, _, skill_id in self.find(text or ""):
+            counts[skill_id] = counts.get(skill_id, 0) + 1
+        ranked = sorted(counts.items(), key=lambda item: -item[1])
+        return [
+            {"name": self.skills[skill_id][0], "category": self.skills[skill_id][1], "mentions": mentions}
+            for skill_id, mentions in ranked
+        ]
+
+    def stats(self):
+        return {
+            "version": self.version,
+            "skills": len(self.skills),
+            "patterns": self.patterns,
+            "states": len(self.goto),
+        }
+
+
+def load_skill_index(path=SKILLS_DATA_FILE):
+    with open(path, encoding="utf-8") as f:
+        data = json.load(f)
+    start = time.perf_counter()
+    index = SkillIndex(data["skills"], data.get("version"))
+    print(f"   🧭 Skills index v{index.version}: {len(index.skills)} skills, {index.patterns} patterns "
+          f"built in {(time.perf_counter() - start) * 1000:.1f} ms")
+    return index
+
+
+_lock = threading.Lock()
+_index = None
+
+
+def get_skill_index():
+    """The shared SkillIndex, built on first use (index.py builds it at startup)."""
+    global _index
+    if _index is None:
+        with _lock:
+            if _index is None:
+                _index = load_skill_index()
+    return _index
+
+
+def extract_skills(text):
+    return get_skill_index().extract(text)
+
+
+def compare_skills(resume, job_description):
+    """
+    Canonical skills of the resume and of the JD, and which of the JD's the resume
+    has (matching) or lacks (missing). `resume` is the resume text or its already
+    extracted skills (batch matching).
+    """
+    index = get_skill_index()
+    if isinstance(resume, str):
+        resume = index.extract(resume)
+    jd = index.extract(job_description)
+    have = {skill["name"] for skill in resume}
+    return {
+        "resume": resume,
+        "jd": jd,
+        "matching": [skill["name"] for skill in jd if skill["name"] in have],
+        "missing": [skill["name"] for skill in jd if skill["name"] not in have],
+    }
@@ -0,0 +1,87 @@
+"""
+Benchmark: cold-start import cost of the serverless entry point.
+
+Each scenario runs in a fresh interpreter with `python -X importtime`: it imports
+index (what every cold request pays, e.g. GET /) and then whatever the route imports
+on first use. Reports the median wall time, the summed import time and the slowest
+top-level imports.
+
+Usage:
+    python benchmarks/bench_cold_start.py --runs 5
+"""
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+API_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "api")
+
+# The pdfplumber/matcher imports stand in for the first local PDF scan and repo match,
+# which import them lazily; LlamaParse and groq are left out since the common path
+# (good local extraction, Gemini answering) never imports them.
+SCENARIOS = {
+    "/": "import index",
+    "/api/match": "import index; index.match_pipeline(); import pdfplumber",
+    "/api/analyze": "import index; index.analysis_pipeline(); import pdfplumber, matcher",
+}
+
+
+def parse_importtime(stderr):
+    """Returns (total self time in s, {top-level module: cumulative s})."""
+    total = 0
+    top = {}
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|")
+        total += int(self_us)
+        # Top-level imports are the ones with no extra indentation
+        if name.startswith(" ") and not name.startswith("  "):
+            top[name.strip()] = int(cumulative_us) / 1e6
+    return total / 1e6, top
+
+
+def run(code):
+    env = dict(os.environ, PYTHONWARNINGS="ignore", PYTHONDONTWRITEBYTECODE="1")
+    start = time.perf_counter()
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", code],
+        cwd=API_DIR, env=env, capture_output=True, text=True,
+    )
+    wall = time.perf_counter() - start
+    if result.returncode != 0:
+        raise SystemExit(f"{code!r} failed:\n{result.stderr[-2000:]}")
+    total, top = parse_importtime(result.stderr)
+    return wall, total, top
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--top", type=int, default=8, help="slowest top-level imports to list")
+    args = parser.parse_args()
+
+    # Warm the bytecode/OS file caches so every scenario is measured the same way
+    run(SCENARIOS["/api/analyze"])
+
+    for route, code in SCENARIOS.items():
+        walls, totals, top = [], [], {}
+        for _ in range(args.runs):
+            wall, total, modules = run(code)
+            walls.append(wall)
+            totals.append(total)
+            for name, seconds in modules.items():
+                top.setdefault(name, []).append(seconds)
+
+        print(f"{route}")
+        print(f"  interpreter wall: {statistics.median(walls) * 1000:7.0f} ms (median of {args.runs})")
+        print(f"  import time:      {statistics.median(totals) * 1000:7.0f} ms")
+        slowest = sorted(((statistics.median(v), k) for k, v in top.items()), reverse=True)[:args.top]
+        for seconds, name in slowest:
+            print(f"    {seconds * 1000:7.1f} ms  {name}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,207 @@
+"""
+Benchmark: compaction.compact vs the old blind character slices in llm.py
+(resume [:15000] for analysis, resume [:10000] + JD [:5000] for matching).
+
+Documents: the bundled PDFs (local extraction), the same text dressed up the way
+LlamaParse markdown comes back (table pipes, page headers/footers, rules, duplicated
+lines), and over-long resumes / job descriptions where the slice cuts real content.
+For each document reports estimated input tokens for the slice and for compaction,
+which sections survive each, and the compaction time.
+
+End-to-end LLM latency is only measured with --live (needs GEMINI_API_KEY or
+GROQ_API_KEY; the LLM cache is turned off so every call reaches the provider).
+Without it the latency change is an estimate from the token delta at --prefill-tps,
+and is printed as such.
+
+Usage:
+    python benchmarks/bench_compaction.py
+    python benchmarks/bench_compaction.py --live --runs 3
+"""
+import argparse
+import glob
+import os
+import statistics
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(ROOT, "api"))
+os.environ.setdefault("LLM_CACHE_BACKEND", "off")
+
+import compaction
+from compaction import (
+    compact, estimate_tokens, split_sections, normalize_markdown,
+    RESUME_TOKEN_BUDGET, MATCH_RESUME_TOKEN_BUDGET, JD_TOKEN_BUDGET,
+)
+
+
+def llamaparse_style(markdown, name="Jake Ryan"):
+    """Re-renders clean markdown with the layout noise LlamaParse typically emits."""
+    out = []
+    for n, line in enumerate(markdown.split("\n")):
+        if n and n % 25 == 0:
+            out += ["", f"{name} — Resume", f"Page {n // 25} of 3", "", "---", "", f"# {name}", ""]
+        if " | " in line:
+            cells = line.split(" | ")
+            out += ["| " + "  |  ".join(cells) + " |", "|" + "|".join("---" for _ in cells) + "|"]
+        elif line.startswith("- "):
+            out += [f"- **{line[2:]}**   ", line]
+        else:
+            out.append(line.replace(" ", "   "))
+    out += ["", "![logo](page_1_image_1.png)", "", "Page 3 of 3"]
+    return "\n".join(out)
+
+
+BULLETS = [
+    "Designed and shipped a {x} service in Python handling {n}k requests per day with p99 under 80 ms",
+    "Migrated the {x} pipeline from cron jobs to Airflow, cutting failed nightly runs by {n}%",
+    "Led a team of {n} engineers building the {x} dashboard in React and TypeScript",
+    "Reduced {x} infrastructure cost by {n}% by right-sizing Kubernetes workloads",
+    "Introduced contract tests for the {x} API, catching {n} breaking changes before release",
+]
+AREAS = ["billing", "search", "ingestion", "reporting", "auth", "notifications", "analytics", "payments"]
+
+
+def long_resume(jobs=14):
+    lines = ["# Alex Morgan", "alex@example.com | github.com/alexm | linkedin.com/in/alexm", "",
+             "## Summary", "Backend engineer with ten years of experience building data-heavy web services.", "",
+             "## Experience"]
+    for j in range(jobs):
+        lines.append(f"Senior Engineer | Company {j} | 20{10 + j} – 20{11 + j}")
+        for b, bullet in enumerate(BULLETS):
+            lines.append("- " + bullet.format(x=AREAS[(j + b) % len(AREAS)], n=3 + j * 7 + b))
+    lines += ["", "## Projects", "Open-source rate limiter | Go, Redis",
+              "- Token-bucket limiter used by 40+ services, 2k GitHub stars", "",
+              "## Education", "B.S. Computer Science | State University | 2010", "",
+              "## Skills", "Languages: Python, Go, TypeScript, SQL",
+              "Infrastructure: Kubernetes, Terraform, AWS, PostgreSQL, Kafka", "",
+              "## Certifications", "AWS Certified Solutions Architect", "",
+              "## Interests", "Climbing, chess, home espresso"]
+    return "\n".join(lines)
+
+
+def long_jd():
+    about = ("We are a fast-growing company on a mission to make payroll effortless for small businesses "
+             "across the world, backed by leading investors and trusted by thousands of customers. ")
+    return "\n".join([
+        "# Senior Backend Engineer", "", "## About Us", about * 24, "",
+        "## What you'll do",
+        "- Own the design of our payments ledger and its APIs",
+        "- Partner with product on reliability and latency goals", "",
+        "## Requirements",
+        "- 5+ years building backend services in Python or Go",
+        "- Deep knowledge of PostgreSQL and event-driven systems (Kafka)",
+        "- Experience running services on Kubernetes in AWS", "",
+        "## Nice to have", "- Fintech or payments background", "",
+        "## Benefits", "- Remote-first, home office budget, 401k matching " * 6, "",
+        "## Equal Opportunity", "We are an equal opportunity employer. " * 20,
+    ])
+
+
+def sections_kept(source, output):
+    """Section titles whose heading and first content line both made it into the prompt."""
+    kept, total = [], []
+    for title, lines in split_sections(normalize_markdown(source)):
+        if title is None:
+            continue
+        body = [line for line in lines[1:] if line.strip()]
+        total.append(title)
+        if title in output and (not body or body[0][:40] in output):
+            kept.append(title)
+    return kept, total
+
+
+def load_documents():
+    documents = []
+    pdfs = sorted(glob.glob(os.path.join(ROOT, "resume_temp", "*.pdf")))
+    if pdfs:
+        from parsing_service import scan_pdf
+        for path in pdfs:
+            markdown, _, _ = scan_pdf(path)
+            name = os.path.basename(path)
+            documents.append((f"{name} (local)", "resume", markdown))
+            documents.append((f"{name} (llamaparse-style)", "resume", llamaparse_style(markdown)))
+    long = long_resume()
+    documents.append(("long resume (clean)", "resume", long))
+    documents.append(("long resume (llamaparse-style)", "resume", llamaparse_style(long, "Alex Morgan")))
+    documents.append(("long job description", "jd", long_jd()))
+    return documents
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--runs", type=int, default=20, help="compaction timing runs per document")
+    parser.add_argument("--prefill-tps", type=float, default=1500.0,
+                        help="assumed prompt tokens/s for the latency estimate")
+    parser.add_argument("--live", action="store_true", help="time real compare_resume_to_job calls")
+    args = parser.parse_args()
+
+    documents = load_documents()
+    # (label, kind, old char slice, token budget)
+    targets = [("analysis", "resume", 15000, RESUME_TOKEN_BUDGET),
+               ("match", "resume", 10000, MATCH_RESUME_TOKEN_BUDGET),
+               ("match", "jd", 5000, JD_TOKEN_BUDGET)]
+
+    total_before = total_after = 0
+    for name, kind, text in documents:
+        print(f"{name}: {len(text)} chars, {estimate_tokens(text)} tokens")
+        for label, target_kind, chars, budget in targets:
+            if target_kind != kind:
+                continue
+            sliced = text[:chars]
+            start = time.perf_counter()
+            for _ in range(args.runs):
+                compacted, report = compact(text, budget, kind)
+            elapsed = (time.perf_counter() - start) / args.runs
+
+            before, after = estimate_tokens(sliced), report["output_tokens"]
+            total_before += before
+            total_after += after
+            # Normalized so the slice is only penalised for what it cuts off
+            kept_slice, titles = sections_kept(text, normalize_markdown(sliced))
+            kept_compact, _ = sections_kept(text, compacted)
+            print(f"  {label:8} slice [:{chars}] {before:6d} tokens, sections {len(kept_slice)}/{len(titles)}"
+                  f"  | compacted (budget {budget}) {after:6d} tokens, sections {len(kept_compact)}/{len(titles)}"
+                  f"  | {elapsed * 1000:.2f} ms")
+            lost = [t for t in titles if t not in kept_slice and t in kept_compact]
+            if lost:
+                print(f"           slice loses {lost}")
+            if report["trimmed"] or report["dropped"]:
+                print(f"           compaction trimmed {report['trimmed']} dropped {report['dropped']}")
+
+    saved = total_before - total_after
+    print(f"\nprompt input tokens: {total_before} -> {total_after} ({saved / total_before:.0%} saved)")
+    print(f"ESTIMATED prefill time saved at {args.prefill_tps:.0f} tokens/s: "
+          f"{saved / args.prefill_tps / len(documents) * 1000:.0f} ms per document (not measured; use --live)")
+
+    if args.live:
+        live(documents, args.runs)
+
+
+def live(documents, runs):
+    import llm
+
+    gemini_key = os.getenv("GEMINI_API_KEY")
+    groq_key = os.getenv("GROQ_API_KEY")
+    if not gemini_key and not groq_key:
+        raise SystemExit("--live needs GEMINI_API_KEY or GROQ_API_KEY")
+
+    resumes = [text for _, kind, text in documents if kind == "resume"]
+    jd = next(text for _, kind, text in documents if kind == "jd")
+    print("\nlive compare_resume_to_job latency (median of %d per resume):" % runs)
+    for enabled in (False, True):
+        compaction.COMPACTION_ENABLED = enabled
+        timings = []
+        for resume in resumes:
+            samples = []
+            for _ in range(runs):
+                start = time.perf_counter()
+                llm.compare_resume_to_job(resume, jd)
+                samples.append(time.perf_counter() - start)
+            timings.append(statistics.median(samples))
+        label = "compaction" if enabled else "char slices"
+        print(f"  {label:12} {statistics.mean(timings) * 1000:8.0f} ms mean of medians")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,218 @@
+"""
+Benchmark: json_decoder.decode_llm_json vs the old fence-strip + json.loads recovery.
+
+Builds a corpus by mutating well-formed analysis/match answers the way LLMs tend to
+break them (fences, prose around the object, smart quotes, trailing commas, truncation)
+plus hopeless answers (refusals, wrong schema), then reports:
+  - repair rate: usable dicts recovered, per defect kind, for both decoders
+  - decode time per document
+  - how many characters the streaming decoder read before giving up on hopeless answers
+
+Usage:
+    python benchmarks/bench_json_decoder.py --docs 2000
+"""
+import argparse
+import json
+import os
+import random
+import sys
+import time
+from collections import defaultdict
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "api"))
+
+from json_decoder import IncrementalJSONDecoder, decode_llm_json, ANALYSIS_SCHEMA, MATCH_SCHEMA
+
+
+WORDS = (
+    "quantify impact metrics lead team project api latency python react docker kubernetes "
+    "ownership scaled users pipeline reduced improved migrated built designed deployed tested"
+).split()
+
+
+def sentence(rng, n=12):
+    return " ".join(rng.choice(WORDS) for _ in range(n)).capitalize() + "."
+
+
+def make_analysis(rng):
+    return {
+        "ats_score": rng.randint(30, 95),
+        "domain_mismatch": rng.random() < 0.1,
+        "domain_mismatch_advice": None,
+        "summary": sentence(rng, 40),
+        "strengths": [sentence(rng) for _ in range(4)],
+        "improvements": [sentence(rng) for _ in range(4)],
+        "detailed_improvements": [
+            {"section": "Experience", "current_text": sentence(rng), "suggested_text": sentence(rng), "reason": sentence(rng)}
+            for _ in range(3)
+        ],
+        "github_feedback": sentence(rng, 20),
+        "content_quality": rng.randint(1, 10),
+        "ats_structure": rng.randint(1, 10),
+        "job_optimization": rng.randint(1, 10),
+        "writing_quality": rng.randint(1, 10),
+        "application_ready": rng.randint(1, 10),
+    }
+
+
+def make_match(rng):
+    return {
+        "match_score": rng.randint(20, 95),
+        "potential_score": rng.randint(40, 100),
+        "recommendation": sentence(rng, 25),
+        "missing_keywords": rng.sample(WORDS, 5),
+        "matching_keywords": rng.sample(WORDS, 5),
+        "improvements": [sentence(rng) for _ in range(3)],
+        "gap_analysis": {"critical_gaps": [sentence(rng)], "minor_gaps": [sentence(rng)]},
+        "tailoring_advice": [sentence(rng) for _ in range(3)],
+    }
+
+
+def smart_quotes(text):
+    # Models that "prettify" output swap the delimiters of keys (and some values)
+    out = []
+    in_string = False
+    for i, ch in enumerate(text):
+        if ch == '"' and text[i - 1] != "\\":
+            out.append("”" if in_string else "“")
+            in_string = not in_string
+        else:
+            out.append(ch)
+    return "".join(out)
+
+
+def trailing_commas(text):
+    return text.replace("]", ",]").replace("}", ",}")
+
+
+MUTATIONS = {
+    "clean": lambda rng, text: text,
+    "fenced": lambda rng, text: f"```json\n{text}\n```",
+    "leading_prose": lambda rng, text: "Here is the analysis you asked for:\n\n" + text,
+    "trailing_prose": lambda rng, text: text + "\n\nLet me know if you'd like me to expand on any section!",
+    "smart_quotes": lambda rng, text: smart_quotes(text),
+    "trailing_commas": lambda rng, text: trailing_commas(text),
+    "truncated": lambda rng, text: text[:rng.randint(len(text) // 3, len(text) - 2)],
+    "fenced_truncated": lambda rng, text: "```json\n" + text[:rng.randint(len(text) // 3, len(text) - 2)],
+}
+
+HOPELESS = {
+    "refusal": lambda rng, text: "I'm sorry, but I can't evaluate this resume. " * 30,
+    "wrong_schema": lambda rng, text: json.dumps({
+        "name": "Jane", "email": "jane@example.com", "phone": "555", "location": "Remote",
+        "skills": WORDS[:10], "education": sentence(rng, 50),
+    }),
+    "missing_score": lambda rng, text: json.dumps({k: v for k, v in json.loads(text).items() if not k.endswith("score")}),
+}
+
+
+def baseline_decode(text):
+    """The old index.parse_analysis_json recovery."""
+    clean = text.strip()
+    if clean.startswith("```json"):
+        clean = clean[7:]
+    elif clean.startswith("```"):
+        clean = clean[3:]
+    if clean.endswith("```"):
+        clean = clean[:-3]
+    try:
+        return json.loads(clean.strip())
+    except json.JSONDecodeError:
+        return None
+
+
+def usable(data, schema):
+    if not isinstance(data, dict):
+        return False
+    for key, (types, required) in schema.items():
+        if required and not isinstance(data.get(key), types):
+            return False
+    return True
+
+
+def build_corpus(rng, docs):
+    corpus = []
+    kinds = list(MUTATIONS) + list(HOPELESS)
+    for n in range(docs):
+        schema, make = (ANALYSIS_SCHEMA, make_analysis) if n % 2 else (MATCH_SCHEMA, make_match)
+        text = json.dumps(make(rng), indent=2)
+        kind = kinds[n % len(kinds)]
+        mutate = MUTATIONS.get(kind) or HOPELESS[kind]
+        corpus.append((kind, kind in HOPELESS, schema, mutate(rng, text)))
+    return corpus
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--docs", type=int, default=2000)
+    parser.add_argument("--chunk", type=int, default=16, help="stream chunk size in characters")
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    corpus = build_corpus(rng, args.docs)
+
+    per_kind = defaultdict(lambda: {"docs": 0, "baseline": 0, "decoder": 0})
+    baseline_time = decoder_time = 0.0
+    false_accepts = 0
+
+    for kind, hopeless, schema, text in corpus:
+        row = per_kind[kind]
+        row["docs"] += 1
+
+        start = time.perf_counter()
+        old = baseline_decode(text)
+        baseline_time += time.perf_counter() - start
+
+        start = time.perf_counter()
+        new, report = decode_llm_json(text, schema)
+        decoder_time += time.perf_counter() - start
+
+        if usable(old, schema):
+            row["baseline"] += 1
+        accepted = new is not None and not report["hopeless"]
+        if hopeless:
+            if accepted:
+                false_accepts += 1
+            else:
+                # For hopeless answers "decoder" counts correct rejections
+                row["decoder"] += 1
+        elif accepted and usable(new, schema):
+            row["decoder"] += 1
+
+    # Early abort: how much of a hopeless stream is read before the decoder gives up
+    read = total = 0
+    for kind, hopeless, schema, text in corpus:
+        if not hopeless:
+            continue
+        decoder = IncrementalJSONDecoder(schema)
+        for i in range(0, len(text), args.chunk):
+            if not decoder.feed(text[i:i + args.chunk]):
+                break
+        read += decoder.consumed
+        total += len(text)
+
+    recoverable = [k for k in per_kind if k in MUTATIONS]
+    docs = sum(per_kind[k]["docs"] for k in recoverable)
+    print(f"{len(corpus)} documents, avg {sum(len(t) for *_, t in corpus) // len(corpus)} chars")
+    print(f"  {'defect':24} {'docs':>5} {'baseline':>9} {'decoder':>8}")
+    for kind in recoverable:
+        row = per_kind[kind]
+        print(f"  {kind:24} {row['docs']:5d} {row['baseline'] / row['docs']:9.0%} {row['decoder'] / row['docs']:8.0%}")
+    print(f"  {'all recoverable':24} {docs:5d} "
+          f"{sum(per_kind[k]['baseline'] for k in recoverable) / docs:9.0%} "
+          f"{sum(per_kind[k]['decoder'] for k in recoverable) / docs:8.0%}")
+    for kind in HOPELESS:
+        row = per_kind[kind]
+        print(f"  {kind + ' (rejected)':24} {row['docs']:5d} {'':>9} {row['decoder'] / row['docs']:8.0%}")
+    print(f"  hopeless answers accepted: {false_accepts}")
+    print(f"  decode time: baseline {baseline_time / len(corpus) * 1e6:.0f} us/doc, "
+          f"decoder {decoder_time / len(corpus) * 1e6:.0f} us/doc")
+    if total:
+        print(f"  hopeless streams: aborted after {read / total:.0%} of the output on average")
+
+    sys.exit(1 if false_accepts else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,295 @@
+"""
+Benchmark: local keyword screen (keyword_match.score_keywords) for /api/match.
+
+Accuracy: synthetic resume / job description pairs are generated from role skill pools,
+labelled fit (same role), adjacent (related role, e.g. backend vs devops) or mismatch
+(unrelated field). Reports the keyword score per label and how often each label would
+be short-circuited as a clear mismatch. A short-circuited fit pair is an error: it hides
+the full LLM answer. Adjacent pairs are expected to score low, and are reported separately.
+
+Against the LLM: --live runs compare_resume_to_job on --live-pairs of the pairs (needs
+GEMINI_API_KEY or GROQ_API_KEY) and --pairs reads recorded pairs from a JSONL file with
+{"resume", "jd", "llm_score"}; both report the correlation between keyword and LLM scores
+and how many short-circuited pairs the LLM scored >= 75 (where the full answer would
+have had detailed improvements).
+
+Latency: per-pair scoring time for a fresh resume and for a reused ResumeTerms
+(the batch path), on the synthetic pairs and the bundled PDFs.
+
+Usage:
+    python benchmarks/bench_keyword_match.py --pairs-per-role 40
+    python benchmarks/bench_keyword_match.py --live --live-pairs 30
+"""
+import argparse
+import glob
+import json
+import math
+import os
+import random
+import statistics
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(ROOT, "api"))
+os.environ.setdefault("LLM_CACHE_BACKEND", "off")
+
+from keyword_match import ResumeTerms, JobKeywords, score_keywords, is_clear_mismatch, KEYWORD_MISMATCH_BELOW, KEYWORD_MISMATCH_MODE
+
+
+ROLES = {
+    "backend": ["Python", "Go", "PostgreSQL", "REST APIs", "Docker", "Kafka", "Redis", "microservices",
+                "gRPC", "Django", "FastAPI", "SQL", "AWS", "unit testing", "system design"],
+    "devops": ["Kubernetes", "Terraform", "AWS", "Docker", "CI/CD", "Jenkins", "Prometheus", "Grafana",
+               "Linux", "Bash", "Ansible", "Helm", "Python", "monitoring", "incident response"],
+    "frontend": ["JavaScript", "TypeScript", "React", "Redux", "CSS", "HTML", "Next.js", "Webpack",
+                 "accessibility", "Jest", "GraphQL", "Figma", "responsive design", "Vue", "Storybook"],
+    "mobile": ["Swift", "Kotlin", "iOS", "Android", "React Native", "Flutter", "Xcode", "Jetpack Compose",
+               "Firebase", "REST APIs", "TypeScript", "app store", "push notifications", "SwiftUI", "Dart"],
+    "data": ["Python", "pandas", "scikit-learn", "machine learning", "SQL", "TensorFlow", "PyTorch",
+             "statistics", "A/B testing", "Spark", "Airflow", "data visualization", "Tableau", "NumPy",
+             "feature engineering"],
+    "nurse": ["RN license", "BLS", "ACLS", "patient care", "ICU", "medication administration", "triage",
+              "Epic", "telemetry", "wound care", "IV therapy", "charting", "critical care", "HIPAA",
+              "care plans"],
+    "accountant": ["CPA", "GAAP", "QuickBooks", "reconciliation", "accounts payable", "accounts receivable",
+                   "Excel", "month-end close", "audit", "tax preparation", "financial statements", "SAP",
+                   "budgeting", "payroll", "general ledger"],
+    "marketing": ["SEO", "Google Analytics", "content strategy", "social media", "HubSpot", "email campaigns",
+                  "copywriting", "paid search", "brand strategy", "CRM", "market research", "Salesforce",
+                  "campaign management", "conversion rate", "Canva"],
+}
+ADJACENT = {("backend", "devops"), ("frontend", "mobile"), ("backend", "data"), ("frontend", "backend")}
+
+JD_TEMPLATE = """{title}
+About the role
+We are a growing company looking for a {title} to join our team and own {area}.
+
+Responsibilities:
+- Work with {a} and {b} to deliver {area} features
+- Improve reliability and quality of {area}
+
+Requirements:
+- 3+ years of professional experience with {required}
+- Solid knowledge of {more}
+
+Nice to have:
+- {nice}
+
+Benefits:
+- Health insurance, 401k matching, remote-first culture, learning budget
+"""
+RESUME_TEMPLATE = """# Sam Candidate
+sam@example.com | linkedin.com/in/sam
+
+## Summary
+{title} with {years} years of experience in {area}.
+
+## Experience
+{title} | Company A | 2019 – Present
+- Delivered {area} improvements using {a} and {b}, cutting turnaround time by {n}%
+- Led a project with {c} across three teams
+{extra}
+
+## Skills
+{skills}
+
+## Education
+B.S. | State University | 2016
+"""
+TITLES = {"backend": "Backend Engineer", "devops": "DevOps Engineer", "frontend": "Frontend Engineer",
+          "mobile": "Mobile Developer", "data": "Data Scientist", "nurse": "Registered Nurse",
+          "accountant": "Staff Accountant", "marketing": "Marketing Manager"}
+AREAS = {"backend": "payment services", "devops": "the deployment platform", "frontend": "the web dashboard",
+         "mobile": "the mobile app", "data": "forecasting models", "nurse": "the intensive care unit",
+         "accountant": "the monthly close", "marketing": "growth campaigns"}
+
+
+def make_jd(role, rng):
+    skills = rng.sample(ROLES[role], 11)
+    return JD_TEMPLATE.format(
+        title=TITLES[role], area=AREAS[role], a=skills[0], b=skills[1],
+        required=", ".join(skills[2:6]), more=", ".join(skills[6:9]), nice=", ".join(skills[9:11]),
+    )
+
+
+def make_resume(role, rng, overlap):
+    """A resume for `role` listing `overlap` of its skills plus a few from other roles."""
+    own = rng.sample(ROLES[role], max(3, round(overlap * len(ROLES[role]))))
+    other = rng.sample([s for r, pool in ROLES.items() if r != role for s in pool], 3)
+    skills = own + other
+    rng.shuffle(skills)
+    return RESUME_TEMPLATE.format(
+        title=TITLES[role], years=rng.randint(2, 9), area=AREAS[role], a=own[0], b=own[1], c=own[2],
+        n=rng.randint(10, 60), extra="- Mentored two junior colleagues", skills=", ".join(skills),
+    )
+
+
+def label(resume_role, jd_role):
+    if resume_role == jd_role:
+        return "fit"
+    if (resume_role, jd_role) in ADJACENT or (jd_role, resume_role) in ADJACENT:
+        return "adjacent"
+    return "mismatch"
+
+
+def build_pairs(pairs_per_role, seed):
+    rng = random.Random(seed)
+    pairs = []
+    for jd_role in ROLES:
+        for _ in range(pairs_per_role):
+            resume_role = rng.choice(list(ROLES))
+            pairs.append({
+                "resume": make_resume(resume_role, rng, rng.uniform(0.3, 0.8)),
+                "jd": make_jd(jd_role, rng),
+                "label": label(resume_role, jd_role),
+            })
+    return pairs
+
+
+def percentile(samples, p):
+    ordered = sorted(samples)
+    return ordered[max(math.ceil(p / 100 * len(ordered)) - 1, 0)]
+
+
+def pearson(xs, ys):
+    if len(xs) < 2 or statistics.pstdev(xs) == 0 or statistics.pstdev(ys) == 0:
+        return None
+    mx, my = statistics.mean(xs), statistics.mean(ys)
+    cov = sum((x - mx) * (y - my) for x, y in zip(xs, ys)) / len(xs)
+    return cov / (statistics.pstdev(xs) * statistics.pstdev(ys))
+
+
+def accuracy(pairs):
+    print(f"accuracy on {len(pairs)} synthetic pairs (clear mismatch below {KEYWORD_MISMATCH_BELOW:g}; "
+          f"KEYWORD_MISMATCH_MODE={KEYWORD_MISMATCH_MODE}, only short/skip actually short-circuit):")
+    by_label = {}
+    for pair in pairs:
+        report = score_keywords(pair["resume"], pair["jd"])
+        pair["keyword_score"] = report["match_score"]
+        pair["shortcut"] = is_clear_mismatch(report)
+        by_label.setdefault(pair["label"], []).append(pair)
+
+    for name in ("fit", "adjacent", "mismatch"):
+        group = by_label.get(name, [])
+        if not group:
+            continue
+        scores = [p["keyword_score"] for p in group]
+        shortcut = sum(p["shortcut"] for p in group)
+        print(f"  {name:9} {len(group):4d} pairs | score mean {statistics.mean(scores):5.1f}  "
+              f"min {min(scores):3d}  max {max(scores):3d} | short-circuited {shortcut:4d} ({shortcut / len(group):.0%})")
+
+    wrong = sum(p["shortcut"] for p in by_label.get("fit", []))
+    mismatches = by_label.get("mismatch", [])
+    caught = sum(p["shortcut"] for p in mismatches)
+    print(f"  full-prompt calls saved: {caught}/{len(mismatches)} mismatches; fit pairs short-circuited: {wrong}")
+
+    # Share of each label below the threshold, for tuning KEYWORD_MISMATCH_BELOW
+    print("  threshold sweep (share short-circuited, fit / adjacent / mismatch):")
+    for threshold in (10, 15, 20, 25, 30, 40):
+        shares = []
+        for name in ("fit", "adjacent", "mismatch"):
+            group = by_label.get(name, [])
+            shares.append(f"{sum(p['keyword_score'] < threshold for p in group) / len(group):4.0%}" if group else "  - ")
+        print(f"    below {threshold:3d}: {' / '.join(shares)}")
+
+
+def compare_llm(rows):
+    """rows: [(keyword report, llm score)]"""
+    keyword_scores = [report["match_score"] for report, _ in rows]
+    llm_scores = [score for _, score in rows]
+    r = pearson(keyword_scores, llm_scores)
+    shortcut = [(report, score) for report, score in rows if is_clear_mismatch(report)]
+    high = sum(1 for _, score in shortcut if score >= 75)
+    low_llm = sum(1 for score in llm_scores if score < 75)
+    print(f"  {len(rows)} pairs | pearson r = {r:.2f}" if r is not None else f"  {len(rows)} pairs | pearson r = n/a")
+    print(f"  short-circuited {len(shortcut)}; LLM scored >= 75 on {high} of them "
+          f"(LLM < 75 overall: {low_llm}/{len(rows)})")
+    print(f"  LLM score of short-circuited pairs: "
+          f"{statistics.mean([s for _, s in shortcut]):.1f} mean" if shortcut else "  nothing short-circuited")
+
+
+def live(pairs, count, seed):
+    import llm
+    from json_decoder import decode_llm_json, MATCH_SCHEMA
+
+    if not (os.getenv("GEMINI_API_KEY") or os.getenv("GROQ_API_KEY")):
+        raise SystemExit("--live needs GEMINI_API_KEY or GROQ_API_KEY")
+
+    sample = random.Random(seed).sample(pairs, min(count, len(pairs)))
+    rows, latencies = [], []
+    for pair in sample:
+        start = time.perf_counter()
+        data, _ = decode_llm_json(llm.compare_resume_to_job(pair["resume"], pair["jd"]), MATCH_SCHEMA)
+        latencies.append(time.perf_counter() - start)
+        if data and "error" not in data:
+            rows.append((score_keywords(pair["resume"], pair["jd"]), float(data["match_score"])))
+    print(f"\nvs live compare_resume_to_job (median {statistics.median(latencies) * 1000:.0f} ms per call):")
+    compare_llm(rows)
+
+
+def recorded(path):
+    rows = []
+    with open(path) as f:
+        for line in f:
+            if line.strip():
+                pair = json.loads(line)
+                rows.append((score_keywords(pair["resume"], pair["jd"]), float(pair["llm_score"])))
+    print(f"\nvs recorded LLM scores in {path}:")
+    compare_llm(rows)
+
+
+def latency(pairs, runs):
+    documents = [(p["resume"], p["jd"]) for p in pairs]
+    pdfs = sorted(glob.glob(os.path.join(ROOT, "resume_temp", "*.pdf")))
+    if pdfs:
+        from parsing_service import scan_pdf
+        for path in pdfs:
+            markdown, _, _ = scan_pdf(path)
+            documents += [(markdown, jd) for _, jd in documents[:20]]
+
+    fresh, reused = [], []
+    for _ in range(runs):
+        for resume, jd in documents:
+            start = time.perf_counter()
+            score_keywords(resume, jd)
+            fresh.append(time.perf_counter() - start)
+    terms = {resume: ResumeTerms(resume) for resume, _ in documents}
+    for _ in range(runs):
+        for resume, jd in documents:
+            start = time.perf_counter()
+            score_keywords(terms[resume], jd)
+            reused.append(time.perf_counter() - start)
+    jd_only = []
+    for _, jd in documents:
+        start = time.perf_counter()
+        JobKeywords(jd)
+        jd_only.append(time.perf_counter() - start)
+
+    print(f"\nlatency over {len(fresh)} scorings:")
+    for name, samples in (("resume + JD", fresh), ("reused resume", reused), ("JD keywords only", jd_only)):
+        print(f"  {name:17} p50 {percentile(samples, 50) * 1000:6.2f} ms  p95 {percentile(samples, 95) * 1000:6.2f} ms"
+              f"  max {max(samples) * 1000:6.2f} ms")
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--pairs-per-role", type=int, default=40)
+    parser.add_argument("--seed", type=int, default=11)
+    parser.add_argument("--runs", type=int, default=5, help="latency repetitions")
+    parser.add_argument("--pairs", help="JSONL of recorded {resume, jd, llm_score}")
+    parser.add_argument("--live", action="store_true", help="compare against real compare_resume_to_job calls")
+    parser.add_argument("--live-pairs", type=int, default=24)
+    args = parser.parse_args()
+
+    pairs = build_pairs(args.pairs_per_role, args.seed)
+    accuracy(pairs)
+    latency(pairs, args.runs)
+    if args.pairs:
+        recorded(args.pairs)
+    if args.live:
+        live(pairs, args.live_pairs, args.seed)
+
+
+if __name__ == "__main__":
+    main()
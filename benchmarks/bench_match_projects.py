@@ -0,0 +1,132 @@
+"""
+Benchmark: indexed matcher (matcher.match_repos) vs the original per-repo fuzzy loop.
+
+Builds synthetic GitHub profiles with N repos and a long resume, checks both
+implementations return identical matches/reasons, and reports timings.
+
+Usage:
+    python benchmarks/bench_match_projects.py --repos 1000 --profiles 5
+"""
+import argparse
+import copy
+import os
+import random
+import re
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "api"))
+
+from matcher import match_repos
+
+try:
+    from thefuzz import fuzz as legacy_fuzz
+except ImportError:
+    legacy_fuzz = None
+
+
+WORDS = (
+    "python react fastapi docker kubernetes pipeline dashboard analytics tracker bot scraper "
+    "resume parser api backend frontend cli tool machine learning model classifier vision chat "
+    "realtime graph database cache queue auth payments weather finance portfolio game engine "
+    "compiler interpreter shell notes todo blog ecommerce crawler monitor sensor iot mobile app"
+).split()
+
+
+def legacy_match_projects(resume_text, resume_urls, github_repos):
+    """The original github_get.match_projects loop, kept here as the reference."""
+    matches = []
+    resume_lower = resume_text.lower()
+    slug_set = set()
+    for url in resume_urls:
+        match = re.search(r"github\.com/[\w-]+/([\w-]+)", url)
+        if match:
+            slug_set.add(match.group(1).lower())
+
+    for repo in github_repos:
+        name_raw = repo['name'].lower()
+        name_clean = name_raw.replace("-", " ").replace("_", " ")
+        desc = (repo['description'] or "").lower()
+        match_reason = None
+        if name_raw in slug_set:
+            match_reason = "URL Link in Resume"
+        if not match_reason:
+            if name_clean in resume_lower or name_raw in resume_lower:
+                match_reason = "Name Mentioned in Resume"
+            elif legacy_fuzz.partial_ratio(name_clean, resume_lower) > 90:
+                match_reason = "Fuzzy Name Match"
+        if not match_reason and len(desc) > 20:
+            score = legacy_fuzz.token_set_ratio(desc, resume_lower)
+            if score > 75:
+                match_reason = f"Description Match ({score}%)"
+        if match_reason:
+            repo['match_reason'] = match_reason
+            matches.append(repo)
+    return matches
+
+
+def make_vocabulary(rng, size):
+    syllables = ["ka", "lo", "mi", "zen", "tor", "vex", "qua", "ril", "dex", "nu", "pho", "gra", "sy", "bel", "tron"]
+    return list({"".join(rng.choices(syllables, k=rng.randint(2, 4))) for _ in range(size)})
+
+
+def make_profile(rng, n_repos, resume_words, vocabulary):
+    repos = []
+    for i in range(n_repos):
+        name = "-".join(rng.sample(vocabulary, rng.randint(1, 3)))
+        words = rng.choices(vocabulary, k=rng.randint(0, 10)) + rng.sample(WORDS, 2)
+        description = " ".join(rng.sample(words, len(words))) if rng.random() < 0.7 else None
+        repos.append({"name": f"{name}-{i}", "description": description, "match_reason": None, "audit": {}})
+
+    picked = rng.sample(repos, 10)
+    lines = [f"Built {p['name'].replace('-', ' ')} using {' '.join(rng.sample(WORDS, 4))}" for p in picked[:4]]
+    # Near-miss names for the fuzzy path
+    lines += [f"Project: {p['name'][:-1].replace('-', '_')}x" for p in picked[4:6]]
+    # Paraphrased descriptions for the description path
+    lines += [p["description"] or "" for p in picked[6:8]]
+    filler = [" ".join(rng.choices(WORDS, k=12)) for _ in range(resume_words // 12)]
+    resume = "\n".join(lines + filler)
+    urls = [f"https://github.com/someone/{p['name']}" for p in picked[8:]]
+    return resume, urls, repos
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--repos", type=int, default=1000)
+    parser.add_argument("--profiles", type=int, default=5)
+    parser.add_argument("--resume-words", type=int, default=1200)
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    vocabulary = make_vocabulary(rng, 4000)
+    profiles = [make_profile(rng, args.repos, args.resume_words, vocabulary) for _ in range(args.profiles)]
+
+    new_time = legacy_time = 0.0
+    mismatches = 0
+    for resume, urls, repos in profiles:
+        start = time.perf_counter()
+        new = match_repos(resume, urls, copy.deepcopy(repos))
+        new_time += time.perf_counter() - start
+
+        if legacy_fuzz is not None:
+            start = time.perf_counter()
+            old = legacy_match_projects(resume, urls, copy.deepcopy(repos))
+            legacy_time += time.perf_counter() - start
+            if [(r['name'], r['match_reason']) for r in old] != [(r['name'], r['match_reason']) for r in new]:
+                mismatches += 1
+
+    print(f"{args.profiles} profiles x {args.repos} repos, ~{args.resume_words}-word resumes")
+    print(f"  indexed matcher: {new_time / args.profiles * 1000:8.1f} ms/profile")
+    if legacy_fuzz is not None:
+        print(f"  legacy loop:     {legacy_time / args.profiles * 1000:8.1f} ms/profile "
+              f"(x{legacy_time / new_time:.1f})")
+        print(f"  result mismatches: {mismatches}")
+    else:
+        print("  (install thefuzz to compare against the legacy loop)")
+
+    sys.exit(1 if mismatches else 0)
+
+
+if __name__ == "__main__":
+    main()
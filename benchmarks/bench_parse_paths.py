@@ -0,0 +1,72 @@
+"""
+Benchmark: local pdfplumber extraction (parsing_service.scan_pdf) vs LlamaParse.
+
+For each bundled PDF, reports the local extraction time, its quality score and the
+decision PARSE_MODE=auto would take. When LLAMA_CLOUD_API_KEY / LLAMA_API_KEY is
+set, LlamaParse is timed too and the word overlap between both outputs is shown.
+
+Usage:
+    python benchmarks/bench_parse_paths.py --runs 10
+    python benchmarks/bench_parse_paths.py resume_temp/*.pdf --show
+"""
+import argparse
+import glob
+import os
+import re
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(ROOT, "api"))
+
+from parsing_service import scan_pdf, parse_with_llamaparse, PARSE_QUALITY_THRESHOLD
+
+
+def words(text):
+    return set(re.findall(r"[a-z0-9]+", text.lower()))
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("pdfs", nargs="*", default=sorted(glob.glob(os.path.join(ROOT, "resume_temp", "*.pdf"))))
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--show", action="store_true", help="print the local markdown")
+    args = parser.parse_args()
+
+    use_cloud = bool(os.getenv("LLAMA_CLOUD_API_KEY"))
+    if not use_cloud:
+        print("(LLAMA_CLOUD_API_KEY not set: timing the local path only)")
+
+    for path in args.pdfs:
+        start = time.perf_counter()
+        for _ in range(args.runs):
+            scan_pdf(path, extract_text=False)
+        links_only = (time.perf_counter() - start) / args.runs
+
+        start = time.perf_counter()
+        for _ in range(args.runs):
+            markdown, _, quality = scan_pdf(path)
+        local = (time.perf_counter() - start) / args.runs
+
+        decision = "local" if quality["score"] >= PARSE_QUALITY_THRESHOLD else "escalate to LlamaParse"
+        print(f"{os.path.basename(path)}")
+        print(f"  hyperlink scan only:   {links_only * 1000:8.1f} ms")
+        print(f"  local text + links:    {local * 1000:8.1f} ms  quality={quality['score']} "
+              f"(density {quality['density']}, garbled {quality['garbled_ratio']}, "
+              f"multi-column {quality['multi_column']}) -> {decision}")
+
+        if use_cloud:
+            start = time.perf_counter()
+            cloud_markdown = parse_with_llamaparse(path)
+            cloud = time.perf_counter() - start
+            ours, theirs = words(markdown), words(cloud_markdown)
+            recall = len(ours & theirs) / len(theirs) if theirs else 0.0
+            print(f"  LlamaParse:            {cloud * 1000:8.1f} ms  (x{cloud / local:.0f} slower, "
+                  f"local covers {recall:.0%} of its words)")
+
+        if args.show:
+            print(markdown)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,135 @@
+"""
+Benchmark: section-level re-analysis (api/section_analysis.py) for edited re-uploads.
+
+Runs the analysis step of /api/analyze (index.analyze_text) against the local LLM stand-ins
+of fake_services.py with the LLM cache off, for the bundled PDFs' markdown plus synthetic
+resumes, in three scenarios per resume:
+
+    first upload    nothing cached: the full prompt, which seeds the section cache
+    one edit        one Experience bullet rewritten: that section's prompt + the score recompute
+    heavy edit      every section changed: back to the full prompt
+
+and reports per scenario the LLM calls, prompt and answer sizes (estimated tokens) and
+wall time. The stand-ins answer every prompt after a sampled latency regardless of its
+size, so the wall times show the concurrency of the section prompts, not the savings of
+shorter outputs; real models take time per output token, so answer tokens are the measure
+(the stand-ins' full answers carry 5-8 suggestions, as the prompt asks).
+
+Usage:
+    python benchmarks/bench_section_analysis.py --resumes 20 --scale 0.05
+"""
+import argparse
+import asyncio
+import glob
+import math
+import os
+import random
+import statistics
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(ROOT, "api"))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from fake_services import FakeServices, build_profiles
+
+
+def percentile(samples, p):
+    ordered = sorted(samples)
+    return ordered[max(math.ceil(p / 100 * len(ordered)) - 1, 0)]
+
+
+def build_resumes(count, seed):
+    from bench_keyword_match import ROLES, make_resume
+    from parsing_service import scan_pdf
+
+    resumes = [scan_pdf(path)[0] for path in sorted(glob.glob(os.path.join(ROOT, "resume_temp", "*.pdf")))]
+    rng = random.Random(seed)
+    while len(resumes) < count:
+        # One candidate each: the section cache is scoped to the resume's name/contact block
+        resume = make_resume(rng.choice(list(ROLES)), rng, rng.uniform(0.3, 0.8))
+        resumes.append(resume.replace("Sam Candidate", f"Sam Candidate {len(resumes)}").replace("sam@", f"sam{len(resumes)}@"))
+    return resumes[:count]
+
+
+def edit_one(text, rng):
+    """Rewrites one bullet of the Experience section (the first bullet when there is no Experience heading)."""
+    lines = text.split("\n")
+    start = next((i for i, line in enumerate(lines) if "experience" in line.lower() and len(line.split()) <= 4), 0)
+    bullets = [i for i in range(start, len(lines)) if lines[i].lstrip().startswith(("-", "•", "*"))]
+    if not bullets:
+        bullets = [min(start + 1, len(lines) - 1)]
+    index = bullets[0]
+    lines[index] += f", improving throughput by {rng.randint(10, 90)}%"
+    return "\n".join(lines)
+
+
+def edit_all(text, rng):
+    """Changes a line in every section (and the header)."""
+    return "\n".join(
+        line + f" ({rng.randint(2000, 2024)})" if line.strip() and i % 3 == 0 else line
+        for i, line in enumerate(text.split("\n"))
+    )
+
+
+async def run(resumes, services, seed):
+    from index import analyze_text
+    from llm import analyze_career_profile
+
+    rng = random.Random(seed)
+    context = {"category": "Tech", "role": "Software Engineer", "level": "Mid-Level"}
+    rows = {name: {"calls": [], "prompt": [], "answer": [], "seconds": [], "modes": []}
+            for name in ("first upload", "one edit", "heavy edit")}
+
+    for resume in resumes:
+        for name, text in (("first upload", resume), ("one edit", edit_one(resume, rng)),
+                           ("heavy edit", edit_all(resume, rng))):
+            before = len(services.llm_calls)
+            start = time.perf_counter()
+            analysis = await analyze_text(text, [], context, analyze_career_profile)
+            elapsed = time.perf_counter() - start
+            calls = services.llm_calls[before:]
+            row = rows[name]
+            row["calls"].append(len(calls))
+            # ~4 characters per token
+            row["prompt"].append(sum(prompt for prompt, _ in calls) / 4)
+            row["answer"].append(sum(answer for _, answer in calls) / 4)
+            row["seconds"].append(elapsed)
+            row["modes"].append(analysis.get("section_analysis", {}).get("mode", "error"))
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--resumes", type=int, default=20)
+    parser.add_argument("--scale", type=float, default=0.05, help="multiplier on the fake services' latencies")
+    parser.add_argument("--seed", type=int, default=5)
+    args = parser.parse_args()
+
+    services = FakeServices(build_profiles(scale=args.scale, seed=args.seed)).start()
+    os.environ.update(services.env())
+    os.environ["LLM_CACHE_BACKEND"] = "off"
+    os.environ["SECTION_CACHE_BACKEND"] = "memory"
+
+    try:
+        resumes = build_resumes(args.resumes, args.seed)
+        rows = asyncio.run(run(resumes, services, args.seed))
+    finally:
+        services.stop()
+
+    print(f"\n{len(resumes)} resumes, LLM latencies x{args.scale}")
+    print(f"{'scenario':14} {'modes':28} {'calls':>6} {'prompt tok':>11} {'answer tok':>11} {'p50 s':>7} {'p95 s':>7}")
+    baseline = statistics.mean(rows["first upload"]["prompt"])
+    baseline_answer = statistics.mean(rows["first upload"]["answer"])
+    for name, row in rows.items():
+        modes = ", ".join(f"{mode} {row['modes'].count(mode)}" for mode in sorted(set(row["modes"])))
+        prompt = statistics.mean(row["prompt"])
+        print(f"{name:14} {modes:28} {statistics.mean(row['calls']):6.1f} {prompt:11.0f} "
+              f"{statistics.mean(row['answer']):11.0f} {percentile(row['seconds'], 50):7.2f} "
+              f"{percentile(row['seconds'], 95):7.2f}   (prompt {prompt / baseline:.0%}, answer "
+              f"{statistics.mean(row['answer']) / baseline_answer:.0%} of a first upload)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,453 @@
+"""
+Local stand-ins for the external services the API calls, for offline benchmarks.
+
+One threaded HTTP server answers for:
+  - GitHub REST   GET  /users/{user}/repos, GET /repos/{user}/{repo}/contents/
+                  (ETag / 304 revalidation, X-RateLimit-* headers, 403 once the limit is spent)
+  - GitHub GraphQL POST /graphql
+  - Gemini        POST /v1beta/models/{model}:generateContent and :streamGenerateContent?alt=sse
+  - Groq          POST /openai/v1/chat/completions (plain and stream=true)
+Point the API at it with GITHUB_API_URL, GITHUB_GRAPHQL_URL, GEMINI_API_URL and GROQ_BASE_URL
+(see FakeServices.env()).
+
+LlamaParse's job-polling upload protocol is replaced in process instead:
+install_llamaparse_double() swaps parsing_service.parse_with_llamaparse for a function
+with the same latency/error model that returns the local pdfplumber text.
+
+Every service has a latency distribution (log-normal from a median and a p95, in seconds)
+and an error rate. Answers are deterministic per request so runs are comparable.
+
+Usage (standalone, e.g. to run the API under uvicorn against it):
+    python benchmarks/fake_services.py --port 8765 --profile gemini=1.5,4,0.02
+"""
+import argparse
+import hashlib
+import json
+import math
+import random
+import re
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlparse
+
+
+# service -> (median latency s, p95 latency s, error rate)
+DEFAULT_PROFILES = {
+    "github": (0.08, 0.25, 0.0),
+    "gemini": (1.5, 4.0, 0.02),
+    "groq": (0.8, 2.0, 0.01),
+    "llamaparse": (6.0, 15.0, 0.02),
+}
+STREAM_CHUNKS = 12
+REPO_LANGUAGES = ["Python", "TypeScript", "Go", "Java", "Rust"]
+
+
+class ServiceProfile:
+    def __init__(self, median, p95, error_rate=0.0, seed=0):
+        self.median = median
+        self.p95 = p95
+        self.error_rate = error_rate
+        # Log-normal: median = e^mu, p95 = e^(mu + 1.645 sigma)
+        self.mu = math.log(max(median, 1e-6))
+        self.sigma = math.log(max(p95, median) / max(median, 1e-6)) / 1.645 if median > 0 else 0.0
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+
+    def sample(self):
+        """Returns (latency seconds, whether this call fails)."""
+        with self._lock:
+            latency = self._rng.lognormvariate(self.mu, self.sigma) if self.median > 0 else 0.0
+            failed = self._rng.random() < self.error_rate
+        return latency, failed
+
+    def describe(self):
+        return {"median": self.median, "p95": self.p95, "error_rate": self.error_rate}
+
+
+def parse_profile(spec):
+    """'gemini=1.5,4,0.02' -> ('gemini', (1.5, 4.0, 0.02))"""
+    name, _, values = spec.partition("=")
+    numbers = [float(v) for v in values.split(",")]
+    if name not in DEFAULT_PROFILES or not 2 <= len(numbers) <= 3:
+        raise argparse.ArgumentTypeError(f"expected <{'|'.join(DEFAULT_PROFILES)}>=median,p95[,error_rate]: {spec}")
+    median, p95 = numbers[:2]
+    error_rate = numbers[2] if len(numbers) == 3 else DEFAULT_PROFILES[name][2]
+    return name, (median, p95, error_rate)
+
+
+def build_profiles(overrides=(), scale=1.0, seed=7):
+    values = dict(DEFAULT_PROFILES)
+    values.update(dict(overrides))
+    return {
+        name: ServiceProfile(median * scale, p95 * scale, error_rate, seed=seed + i)
+        for i, (name, (median, p95, error_rate)) in enumerate(sorted(values.items()))
+    }
+
+
+def repo_names(user, count):
+    return [f"project-{i}" for i in range(count)]
+
+
+def _digest(text):
+    return int(hashlib.sha256(text.encode("utf-8")).hexdigest()[:8], 16)
+
+
+FAKE_SECTIONS = ["Experience", "Projects", "Skills", "Summary"]
+
+
+def fake_analysis(prompt):
+    rng = random.Random(_digest(prompt))
+    return {
+        "ats_score": rng.randint(40, 95),
+        "domain_mismatch": False,
+        "domain_mismatch_advice": None,
+        "summary": "Solid backend profile with measurable impact; tighten the project descriptions.",
+        "strengths": ["Quantified achievements", "Relevant stack", "Clear structure"],
+        "improvements": ["Add metrics to projects", "Trim the skills list"],
+        # The prompt asks for 5-10 when the score is below 90
+        "detailed_improvements": [{
+            "section": FAKE_SECTIONS[i % len(FAKE_SECTIONS)], "item": "First entry", "location": "Bullet point 1",
+            "original_text": "Worked on APIs", "suggested_text": "Built REST APIs serving 2k req/s",
+            "reason": "Quantifies impact",
+        } for i in range(rng.randint(5, 8))],
+        "github_feedback": "Repositories have READMEs and code.",
+        "content_quality": rng.randint(5, 10),
+        "ats_structure": rng.randint(5, 10),
+        "job_optimization": rng.randint(5, 10),
+        "writing_quality": rng.randint(5, 10),
+        "application_ready": rng.randint(5, 10),
+    }
+
+
+def fake_match(prompt):
+    rng = random.Random(_digest(prompt))
+    return {
+        "match_score": rng.randint(30, 90),
+        "potential_score": rng.randint(60, 100),
+        "recommendation": "Good fit once the cloud experience is made explicit.",
+        "missing_keywords": ["Kubernetes", "Terraform"],
+        "matching_keywords": ["Python", "PostgreSQL", "REST"],
+        "improvements": [],
+        "gap_analysis": {"technical_gaps": ["Kubernetes"], "soft_skill_gaps": []},
+        "tailoring_advice": ["Lead with the API work"],
+    }
+
+
+def fake_mismatch(prompt):
+    rng = random.Random(_digest(prompt))
+    return {
+        "recommendation": "Low match: the role needs a different core stack than the resume shows.",
+        "potential_score": rng.randint(20, 50),
+        "technical_gaps": ["Kubernetes", "Terraform"],
+    }
+
+
+def fake_section(prompt):
+    rng = random.Random(_digest(prompt))
+    section = re.search(r"ONE section of a candidate's Resume: '([^']*)'", prompt)
+    return {"detailed_improvements": [{
+        "section": section.group(1) if section else "Experience", "item": "First entry",
+        "location": "Bullet point 1", "original_text": "Worked on APIs",
+        "suggested_text": "Built REST APIs serving 2k req/s", "reason": "Quantifies impact",
+    } for _ in range(rng.randint(0, 2))]}
+
+
+def fake_scores(prompt):
+    data = fake_analysis(prompt)
+    return {key: data[key] for key in ("ats_score", "content_quality", "ats_structure", "job_optimization",
+                                       "writing_quality", "application_ready")}
+
+
+def fake_llm_answer(prompt):
+    if "=== SECTION FEEDBACK ===" in prompt:
+        data = fake_scores(prompt)
+    elif "=== RESUME SECTION ===" in prompt:
+        data = fake_section(prompt)
+    elif "=== JOB DESCRIPTION ===" in prompt:
+        data = fake_match(prompt)
+    elif "=== JOB (EXCERPT) ===" in prompt:
+        data = fake_mismatch(prompt)
+    else:
+        data = fake_analysis(prompt)
+    return json.dumps(data)
+
+
+def _chunks(text, count=STREAM_CHUNKS):
+    size = max(len(text) // count, 1)
+    return [text[i:i + size] for i in range(0, len(text), size)]
+
+
+class FakeServices:
+    """
+    The fake GitHub / Gemini / Groq server, started on a background thread.
+    github_rate_limit is the per-run REST budget of each of the github_tokens tokens;
+    304 revalidations don't spend it.
+    """
+
+    def __init__(self, profiles=None, port=0, github_repos=30, github_rate_limit=5000, github_tokens=1):
+        self.profiles = profiles or build_profiles()
+        self.github_repos = github_repos
+        self.github_rate_limit = github_rate_limit
+        self.github_tokens = [f"fake-github-token-{i + 1}" for i in range(github_tokens)]
+        self.github_remaining = {token: github_rate_limit for token in self.github_tokens}
+        self.github_reset = int(time.time()) + 3600
+        self.calls = {}
+        # (prompt characters, answer characters) of every LLM call
+        self.llm_calls = []
+        self._lock = threading.Lock()
+        self.server = ThreadingHTTPServer(("127.0.0.1", port), self._handler_class())
+        self.server.daemon_threads = True
+        self._thread = None
+
+    @property
+    def url(self):
+        host, port = self.server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def env(self):
+        """Environment variables that point the API (and fake keys) at this server."""
+        return {
+            "GITHUB_API_URL": self.url,
+            "GITHUB_GRAPHQL_URL": f"{self.url}/graphql",
+            "GEMINI_API_URL": self.url,
+            "GROQ_BASE_URL": self.url,
+            "GITHUB_TOKEN": self.github_tokens[0],
+            "GITHUB_TOKENS": ",".join(self.github_tokens),
+            "GEMINI_API_KEY": "fake-gemini-key",
+            "GROQ_API_KEY": "fake-groq-key",
+        }
+
+    def start(self):
+        self._thread = threading.Thread(target=self.server.serve_forever, name="fake-services", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+    def count(self, name):
+        with self._lock:
+            self.calls[name] = self.calls.get(name, 0) + 1
+
+    def record_llm(self, prompt, text):
+        with self._lock:
+            self.llm_calls.append((len(prompt), len(text)))
+
+    def spend_github(self, token):
+        """Returns the token's remaining budget after this call, or None once it is exhausted."""
+        with self._lock:
+            if self.github_remaining.get(token, 0) <= 0:
+                return None
+            self.github_remaining[token] -= 1
+            return self.github_remaining[token]
+
+    def _handler_class(self):
+        services = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def log_message(self, *args):
+                pass
+
+            def do_GET(self):
+                path = urlparse(self.path).path
+                match = re.fullmatch(r"/users/([^/]+)/repos", path)
+                if match:
+                    return self.github(path, lambda: self.repos(match.group(1)))
+                match = re.fullmatch(r"/repos/([^/]+)/([^/]+)/contents/?", path)
+                if match:
+                    return self.github(path, lambda: self.contents(match.group(2)))
+                self.send_json(404, {"message": "Not Found"})
+
+            def do_POST(self):
+                parsed = urlparse(self.path)
+                body = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))) or b"{}")
+                if parsed.path == "/graphql":
+                    return self.graphql(body)
+                match = re.fullmatch(r"/v1beta/models/[^/:]+:(generateContent|streamGenerateContent)", parsed.path)
+                if match:
+                    return self.gemini(body, stream=match.group(1) == "streamGenerateContent")
+                if parsed.path == "/openai/v1/chat/completions":
+                    return self.groq(body)
+                self.send_json(404, {"error": "unknown endpoint"})
+
+            # --- helpers ---------------------------------------------------------
+
+            def delay(self, service):
+                """Sleeps for a sampled latency; returns True when the call should fail."""
+                services.count(service)
+                latency, failed = services.profiles[service].sample()
+                time.sleep(latency)
+                return failed
+
+            def send_json(self, status, payload, headers=None):
+                body = json.dumps(payload).encode("utf-8")
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(body)))
+                for key, value in (headers or {}).items():
+                    self.send_header(key, value)
+                self.end_headers()
+                self.wfile.write(body)
+
+            def send_sse(self, events):
+                self.send_response(200)
+                self.send_header("Content-Type", "text/event-stream")
+                self.send_header("Transfer-Encoding", "chunked")
+                self.end_headers()
+                for event in events:
+                    data = f"data: {event}\n\n".encode("utf-8")
+                    self.wfile.write(f"{len(data):x}\r\n".encode() + data + b"\r\n")
+                    self.wfile.flush()
+                self.wfile.write(b"0\r\n\r\n")
+
+            # --- GitHub ----------------------------------------------------------
+
+            def github(self, key, build):
+                failed = self.delay("github")
+                etag = f'"{_digest(key):x}"'
+                token = self.token()
+                if token not in services.github_remaining:
+                    return self.send_json(401, {"message": "Bad credentials"})
+                rate = {"X-RateLimit-Limit": str(services.github_rate_limit),
+                        "X-RateLimit-Reset": str(services.github_reset)}
+                if self.headers.get("If-None-Match") == etag:
+                    rate["X-RateLimit-Remaining"] = str(services.github_remaining[token])
+                    self.send_response(304)
+                    for k, v in dict(rate, ETag=etag).items():
+                        self.send_header(k, v)
+                    self.send_header("Content-Length", "0")
+                    self.end_headers()
+                    return
+
+                remaining = services.spend_github(token)
+                if remaining is None:
+                    rate["X-RateLimit-Remaining"] = "0"
+                    return self.send_json(403, {"message": "API rate limit exceeded"}, rate)
+                rate["X-RateLimit-Remaining"] = str(remaining)
+                if failed:
+                    return self.send_json(502, {"message": "Server Error"}, rate)
+                self.send_json(200, build(), dict(rate, ETag=etag))
+
+            def repos(self, user):
+                return [{
+                    "name": name,
+                    "html_url": f"https://github.com/{user}/{name}",
+                    "description": f"{name.replace('-', ' ')} built with {REPO_LANGUAGES[i % len(REPO_LANGUAGES)]}",
+                    "stargazers_count": i * 3,
+                    "pushed_at": "2024-01-01T00:00:00Z",
+                } for i, name in enumerate(repo_names(user, services.github_repos))]
+
+            def contents(self, repo):
+                entries = [{"name": "README.md", "type": "file"}, {"name": "src", "type": "dir"}]
+                # Every third repo lacks a dependency manifest, so audits aren't all identical
+                if _digest(repo) % 3:
+                    entries.append({"name": "requirements.txt", "type": "file"})
+                return entries
+
+            def graphql(self, body):
+                failed = self.delay("github")
+                if failed:
+                    return self.send_json(502, {"message": "Server Error"})
+                user = body.get("variables", {}).get("login", "user")
+                nodes = [{
+                    "name": repo["name"], "url": repo["html_url"], "description": repo["description"],
+                    "stargazerCount": repo["stargazers_count"], "pushedAt": repo["pushed_at"],
+                    "languages": {"nodes": [{"name": "Python"}]},
+                    "object": {"entries": [{"name": e["name"], "type": "blob" if e["type"] == "file" else "tree"}
+                                           for e in self.contents(repo["name"])]},
+                } for repo in self.repos(user)]
+                self.send_json(200, {"data": {"user": {"repositories": {
+                    "nodes": nodes, "pageInfo": {"hasNextPage": False, "endCursor": None},
+                }}}}, {"X-RateLimit-Remaining": str(services.github_remaining.get(self.token(), 0))})
+
+            def token(self):
+                return self.headers.get("Authorization", "").removeprefix("Bearer ")
+
+            # --- LLMs ------------------------------------------------------------
+
+            def gemini(self, body, stream):
+                failed = self.delay("gemini")
+                if failed:
+                    return self.send_json(503, {"error": {"code": 503, "message": "The model is overloaded."}})
+                prompt = body["contents"][0]["parts"][0]["text"]
+                text = fake_llm_answer(prompt)
+                services.record_llm(prompt, text)
+                if not stream:
+                    return self.send_json(200, {"candidates": [{"content": {"parts": [{"text": text}]}}]})
+                self.send_sse(json.dumps({"candidates": [{"content": {"parts": [{"text": chunk}]}}]})
+                              for chunk in _chunks(text))
+
+            def groq(self, body):
+                failed = self.delay("groq")
+                if failed:
+                    return self.send_json(429, {"error": {"message": "Rate limit reached", "type": "tokens"}},
+                                          {"retry-after": "1"})
+                text = fake_llm_answer(body["messages"][-1]["content"])
+                services.record_llm(body["messages"][-1]["content"], text)
+                base = {"id": "chatcmpl-fake", "created": int(time.time()), "model": body.get("model", "fake")}
+                if not body.get("stream"):
+                    return self.send_json(200, dict(base, object="chat.completion", choices=[{
+                        "index": 0, "finish_reason": "stop",
+                        "message": {"role": "assistant", "content": text},
+                    }], usage={"prompt_tokens": 0, "completion_tokens": 0, "total_tokens": 0}))
+                events = [json.dumps(dict(base, object="chat.completion.chunk", choices=[{
+                    "index": 0, "finish_reason": None, "delta": {"content": chunk},
+                }])) for chunk in _chunks(text)]
+                self.send_sse(events + ["[DONE]"])
+
+        return Handler
+
+
+def install_llamaparse_double(profile):
+    """
+    Replaces parsing_service.parse_with_llamaparse with an in-process double: sampled
+    latency, failures returned as "" (what the real wrapper returns on errors), and the
+    local pdfplumber markdown as the parsed text.
+    """
+    import parsing_service
+
+    calls = {"llamaparse": 0}
+
+    def parse_with_llamaparse(file_path):
+        calls["llamaparse"] += 1
+        latency, failed = profile.sample()
+        time.sleep(latency)
+        if failed:
+            print("   ❌ LlamaParse Error: (fake) job failed")
+            return ""
+        markdown, _, _ = parsing_service.scan_pdf(file_path)
+        return markdown
+
+    parsing_service.parse_with_llamaparse = parse_with_llamaparse
+    return calls
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--profile", type=parse_profile, action="append", default=[],
+                        help="service=median,p95[,error_rate] (seconds); repeatable")
+    parser.add_argument("--scale", type=float, default=1.0, help="multiply every latency")
+    parser.add_argument("--github-repos", type=int, default=30)
+    parser.add_argument("--github-rate-limit", type=int, default=5000, help="per token")
+    parser.add_argument("--github-tokens", type=int, default=1)
+    args = parser.parse_args()
+
+    services = FakeServices(build_profiles(args.profile, args.scale), port=args.port,
+                            github_repos=args.github_repos, github_rate_limit=args.github_rate_limit,
+                            github_tokens=args.github_tokens)
+    print(f"Fake services on {services.url}; start the API with:")
+    for key, value in services.env().items():
+        print(f"  export {key}={value}")
+    try:
+        services.server.serve_forever()
+    except KeyboardInterrupt:
+        services.stop()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,293 @@
+"""
+Offline load test: drives /api/analyze and /api/match with the PDFs in resume_temp/
+at fixed concurrency levels, with every external service replaced by the local
+stand-ins in fake_services.py (GitHub, Gemini, Groq over HTTP; LlamaParse in process).
+
+For each endpoint and concurrency level it reports throughput, p50/p95/p99 latency,
+the error rate and a per-stage breakdown (from the Server-Timing header, see
+api/metrics.py), and writes everything to a JSON report. Pass a previous report with
+--compare to print the deltas; --max-regression makes the run fail when p95 latency or
+throughput got worse by more than that fraction.
+
+The bundled PDFs have no GitHub profile link, so by default the parsed links get
+https://github.com/<--github-user> plus --linked-repos repo URLs appended; that makes
+the GitHub lookup, project matching and audits run too (--github-user "" turns it off).
+
+Caches (parse, GitHub, LLM, section feedback) are disabled unless --warm-caches is given, so every
+request pays for every stage. Each request's job_role / jd carries a request number, so concurrent
+requests for the same PDF don't coalesce into one run (api/singleflight.py); --same-requests sends
+identical requests instead. Each level reports how many requests coalesced (those carry no per-stage
+timing of their own).
+
+Usage:
+    python benchmarks/load_harness.py --concurrency 1,8,32 --requests 32 --out load.json
+    python benchmarks/load_harness.py --scale 0.1 --profile gemini=1.5,4,0.2 --compare load.json
+"""
+import argparse
+import asyncio
+import contextlib
+import glob
+import json
+import math
+import os
+import platform
+import subprocess
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(ROOT, "api"))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from fake_services import FakeServices, build_profiles, install_llamaparse_double, parse_profile, repo_names
+
+
+JOB_DESCRIPTION = """Senior Backend Engineer
+We are looking for an engineer to own our payments APIs.
+Requirements:
+- 4+ years of Python or Go
+- PostgreSQL, REST API design, Docker
+- Kubernetes and AWS experience is a plus
+"""
+
+
+def percentile(samples, p):
+    if not samples:
+        return None
+    ordered = sorted(samples)
+    return ordered[max(math.ceil(p / 100 * len(ordered)) - 1, 0)]
+
+
+def parse_server_timing(header):
+    """'parse;dur=12.5, github_audit_repo;dur=40;desc="x3", total;dur=80' -> {name: ms}"""
+    stages = {}
+    for item in filter(None, (part.strip() for part in (header or "").split(","))):
+        name, *params = item.split(";")
+        for param in params:
+            key, _, value = param.partition("=")
+            if key.strip() == "dur":
+                stages[name.strip()] = float(value)
+    return stages
+
+
+def configure(args, services):
+    """Points the API at the fakes; must run before any api module is imported."""
+    os.environ.update(services.env())
+    os.environ["METRICS_TIMING_HEADER"] = "1"
+    os.environ["PARSE_MODE"] = args.parse_mode
+    if not args.warm_caches:
+        os.environ["PARSE_CACHE_ENABLED"] = "0"
+        os.environ["LLM_CACHE_BACKEND"] = "off"
+        os.environ["SECTION_CACHE_BACKEND"] = "off"
+        os.environ["GITHUB_CACHE_MAX_BYTES"] = "0"
+
+
+def install_github_links(user, linked_repos):
+    import parsing_service
+
+    extract = parsing_service.extract_resume_data
+    links = [f"https://github.com/{user}"] + [
+        f"https://github.com/{user}/{name}" for name in repo_names(user, linked_repos)
+    ]
+
+    def extract_resume_data(file_path):
+        text, urls = extract(file_path)
+        return text, list(urls) + links
+
+    parsing_service.extract_resume_data = extract_resume_data
+
+
+async def run_level(app, endpoint, concurrency, total, pdfs, salt=True):
+    import httpx
+
+    samples = []
+    queue = asyncio.Queue()
+    for i in range(total):
+        queue.put_nowait(i)
+
+    async def worker(client):
+        while True:
+            try:
+                i = queue.get_nowait()
+            except asyncio.QueueEmpty:
+                return
+            name, pdf = pdfs[i % len(pdfs)]
+            tag = f" (request {i})" if salt else ""
+            data = {"jd": JOB_DESCRIPTION + tag} if endpoint == "/api/match" else {"job_role": "Backend Engineer" + tag}
+            start = time.perf_counter()
+            try:
+                response = await client.post(endpoint, files={"file": (name, pdf, "application/pdf")}, data=data)
+                status, timing = response.status_code, response.headers.get("server-timing")
+                ok = status == 200 and "error" not in response.json()
+            except Exception as e:
+                status, timing, ok = type(e).__name__, None, False
+            samples.append({
+                "latency": time.perf_counter() - start,
+                "status": status,
+                "ok": ok,
+                "stages": parse_server_timing(timing),
+            })
+
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=600) as client:
+        start = time.perf_counter()
+        await asyncio.gather(*(worker(client) for _ in range(concurrency)))
+        elapsed = time.perf_counter() - start
+
+    return summarize(endpoint, concurrency, samples, elapsed)
+
+
+def summarize(endpoint, concurrency, samples, elapsed):
+    latencies = [s["latency"] for s in samples]
+    stages = {}
+    for sample in samples:
+        for name, ms in sample["stages"].items():
+            stages.setdefault(name, []).append(ms)
+
+    def ms(value):
+        return round(value * 1000, 1) if value is not None else None
+
+    return {
+        "endpoint": endpoint,
+        "concurrency": concurrency,
+        "requests": len(samples),
+        "errors": sum(1 for s in samples if not s["ok"]),
+        "statuses": {str(k): sum(1 for s in samples if s["status"] == k) for k in {s["status"] for s in samples}},
+        "elapsed_s": round(elapsed, 3),
+        "throughput_rps": round(len(samples) / elapsed, 3) if elapsed else None,
+        "latency_ms": {
+            "mean": ms(sum(latencies) / len(latencies)) if latencies else None,
+            "p50": ms(percentile(latencies, 50)),
+            "p95": ms(percentile(latencies, 95)),
+            "p99": ms(percentile(latencies, 99)),
+            "max": ms(max(latencies)) if latencies else None,
+        },
+        # Server-Timing durations per request; stages a request skipped aren't averaged in, and
+        # repeated spans (one per audited repo, running in parallel) are summed per request
+        "stages_ms": {
+            name: {
+                "requests": len(values),
+                "mean": round(sum(values) / len(values), 1),
+                "p95": round(percentile(values, 95), 1),
+            }
+            for name, values in sorted(stages.items(), key=lambda item: -sum(item[1]))
+        },
+    }
+
+
+def print_result(result):
+    latency = result["latency_ms"]
+    print(f"{result['endpoint']} x{result['concurrency']}: {result['requests']} requests in {result['elapsed_s']}s "
+          f"-> {result['throughput_rps']} req/s | p50 {latency['p50']} ms  p95 {latency['p95']} ms  "
+          f"p99 {latency['p99']} ms | errors {result['errors']} {result['statuses']} | coalesced {result.get('coalesced')}")
+    for name, stage in result["stages_ms"].items():
+        print(f"    {name:20} mean {stage['mean']:9.1f} ms  p95 {stage['p95']:9.1f} ms  ({stage['requests']} requests)")
+
+
+def compare(report, baseline_path, max_regression):
+    """Prints throughput / p95 deltas against a previous report; returns the regressions found."""
+    with open(baseline_path) as f:
+        baseline = json.load(f)
+    previous = {(r["endpoint"], r["concurrency"]): r for r in baseline["results"]}
+    regressions = []
+    print(f"\nvs {baseline_path} ({baseline['meta'].get('commit')}):")
+    for result in report["results"]:
+        old = previous.get((result["endpoint"], result["concurrency"]))
+        if old is None:
+            continue
+        rps_change = result["throughput_rps"] / old["throughput_rps"] - 1 if old["throughput_rps"] else 0.0
+        p95_change = result["latency_ms"]["p95"] / old["latency_ms"]["p95"] - 1 if old["latency_ms"]["p95"] else 0.0
+        flag = ""
+        if max_regression is not None and (rps_change < -max_regression or p95_change > max_regression):
+            regressions.append((result["endpoint"], result["concurrency"]))
+            flag = "  <-- regression"
+        # Coalesced requests skip the work, so levels with different counts aren't like for like
+        if result.get("coalesced") != old.get("coalesced"):
+            flag += f"  (coalesced {old.get('coalesced')} -> {result.get('coalesced')})"
+        print(f"  {result['endpoint']} x{result['concurrency']}: throughput {rps_change:+.1%}, p95 {p95_change:+.1%}{flag}")
+    return regressions
+
+
+def git_commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=ROOT,
+                              capture_output=True, text=True).stdout.strip() or None
+    except OSError:
+        return None
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--endpoints", default="/api/analyze,/api/match")
+    parser.add_argument("--concurrency", default="1,8,32", help="comma-separated levels")
+    parser.add_argument("--requests", type=int, default=32, help="requests per endpoint and level")
+    parser.add_argument("--pdfs", nargs="*", default=sorted(glob.glob(os.path.join(ROOT, "resume_temp", "*.pdf"))))
+    parser.add_argument("--profile", type=parse_profile, action="append", default=[],
+                        help="service=median,p95[,error_rate] (seconds); repeatable")
+    parser.add_argument("--scale", type=float, default=1.0, help="multiply every fake latency")
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--parse-mode", default="auto", choices=["auto", "local", "llamaparse"])
+    parser.add_argument("--github-user", default="bench-user")
+    parser.add_argument("--linked-repos", type=int, default=4)
+    parser.add_argument("--github-repos", type=int, default=30)
+    parser.add_argument("--github-rate-limit", type=int, default=100000, help="per token")
+    parser.add_argument("--github-tokens", type=int, default=1, help="size of the GITHUB_TOKENS pool")
+    parser.add_argument("--warm-caches", action="store_true")
+    parser.add_argument("--same-requests", action="store_true",
+                        help="don't vary job_role / jd per request, so identical concurrent requests coalesce")
+    parser.add_argument("--verbose", action="store_true", help="keep the API's own log output")
+    parser.add_argument("--out", default=os.path.join(ROOT, "benchmarks", "results", "load_report.json"))
+    parser.add_argument("--compare", help="previous JSON report")
+    parser.add_argument("--max-regression", type=float, help="fail when p95/throughput regress more than this")
+    args = parser.parse_args()
+
+    profiles = build_profiles(args.profile, args.scale, args.seed)
+    services = FakeServices(profiles, github_repos=args.github_repos, github_rate_limit=args.github_rate_limit,
+                            github_tokens=args.github_tokens).start()
+    configure(args, services)
+
+    import index
+
+    llamaparse_calls = install_llamaparse_double(profiles["llamaparse"])
+    if args.github_user:
+        install_github_links(args.github_user, args.linked_repos)
+
+    pdfs = [(os.path.basename(path), open(path, "rb").read()) for path in args.pdfs]
+    if not pdfs:
+        raise SystemExit("No PDFs to send (resume_temp/ is empty?)")
+
+    flights = {"/api/analyze": index.analysis_flights, "/api/match": index.match_flights}
+    results = []
+    for endpoint in args.endpoints.split(","):
+        for level in (int(c) for c in args.concurrency.split(",")):
+            coalesced = flights[endpoint].coalesced if endpoint in flights else 0
+            with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(sys.stdout if args.verbose else devnull):
+                result = asyncio.run(run_level(index.app, endpoint, level, args.requests, pdfs, not args.same_requests))
+            result["coalesced"] = flights[endpoint].coalesced - coalesced if endpoint in flights else None
+            print_result(result)
+            results.append(result)
+
+    services.stop()
+    report = {
+        "meta": {
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+            "commit": git_commit(),
+            "python": platform.python_version(),
+            "args": {k: v for k, v in vars(args).items() if k not in ("out", "compare", "profile")},
+            "profiles": {name: profile.describe() for name, profile in profiles.items()},
+            "fake_calls": dict(services.calls, **llamaparse_calls),
+        },
+        "results": results,
+    }
+
+    os.makedirs(os.path.dirname(os.path.abspath(args.out)), exist_ok=True)
+    with open(args.out, "w") as f:
+        json.dump(report, f, indent=2)
+    print(f"\nReport written to {args.out}")
+
+    regressions = compare(report, args.compare, args.max_regression) if args.compare else []
+    sys.exit(1 if regressions else 0)
+
+
+if __name__ == "__main__":
+    main()
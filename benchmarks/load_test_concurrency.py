@@ -0,0 +1,116 @@
+"""
+Load test: concurrent /api/analyze and /api/match requests must overlap, not serialize.
+
+Every external stage is replaced by a blocking sleep (time.sleep), which is what the
+real LlamaParse / pdfplumber / PyGithub / requests / Groq calls look like to the event loop.
+If the handlers block the loop, N requests take ~N x the single-request time.
+Each request uploads different bytes, so identical-request coalescing (singleflight) can't
+fold them into one computation; the run fails unless all N led their own flight.
+
+Usage:
+    python benchmarks/load_test_concurrency.py --requests 16 --stage-delay 0.1
+"""
+import argparse
+import asyncio
+import json
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "api"))
+
+import httpx
+
+import index
+import parsing_service
+import github_get
+import llm
+
+
+FAKE_ANALYSIS = {"ats_score": 80, "summary": "ok"}
+FAKE_MATCH = {"match_score": 70, "recommendation": "ok"}
+
+
+def install_fakes(delay):
+    def fake_extract(file_path):
+        time.sleep(delay)
+        return "Jane Doe\nProjects: demo-app", ["https://github.com/janedoe/demo-app"]
+
+    def fake_profile(username):
+        time.sleep(delay)
+        return {"status": "success", "repos": [{
+            "name": "demo-app", "url": "", "description": None, "stars": 0,
+            "pushed_at": None, "match_reason": None, "audit": {},
+        }]}
+
+    def fake_audit(repo_name, username, timeout=None):
+        time.sleep(delay)
+        return {"summary": "GitHub is perfect", "has_readme": True, "has_requirements": True, "has_code": True}
+
+    def fake_analyze(resume_text, github_projects=None, user_context=None, on_token=None):
+        time.sleep(delay)
+        return json.dumps(FAKE_ANALYSIS)
+
+    def fake_compare(resume_text, job_description, on_token=None):
+        time.sleep(delay)
+        return json.dumps(FAKE_MATCH)
+
+    parsing_service.extract_resume_data = fake_extract
+    github_get.analyze_github_profile = fake_profile
+    github_get.audit_repo = fake_audit
+    llm.analyze_career_profile = fake_analyze
+    llm.compare_resume_to_job = fake_compare
+
+
+FLIGHTS = {"/api/analyze": index.analysis_flights, "/api/match": index.match_flights}
+
+
+async def fire(client, path, data, tag):
+    files = {"file": ("resume.pdf", b"%PDF-1.4 fake " + str(tag).encode(), "application/pdf")}
+    response = await client.post(path, files=files, data=data)
+    response.raise_for_status()
+
+
+async def run(path, data, n):
+    transport = httpx.ASGITransport(app=index.app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://test", timeout=120) as client:
+        start = time.perf_counter()
+        await fire(client, path, data, "single")
+        single = time.perf_counter() - start
+
+        leaders = FLIGHTS[path].leaders
+        start = time.perf_counter()
+        await asyncio.gather(*(fire(client, path, data, i) for i in range(n)))
+        concurrent = time.perf_counter() - start
+        leaders = FLIGHTS[path].leaders - leaders
+
+    return single, concurrent, leaders
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--requests", type=int, default=16)
+    parser.add_argument("--stage-delay", type=float, default=0.1)
+    args = parser.parse_args()
+
+    install_fakes(args.stage_delay)
+
+    failed = False
+    for path, data in [("/api/analyze", {"job_role": "SWE"}), ("/api/match", {"jd": "Python developer"})]:
+        single, concurrent, leaders = asyncio.run(run(path, data, args.requests))
+        serialized = single * args.requests
+        speedup = serialized / concurrent if concurrent else float("inf")
+        print(f"{path}: 1 request {single:.2f}s | {args.requests} concurrent {concurrent:.2f}s "
+              f"| serialized would be {serialized:.2f}s | overlap x{speedup:.1f} | {leaders} computed")
+        if leaders != args.requests:
+            print(f"   expected {args.requests} independent computations, got {leaders}")
+            failed = True
+        # Anything close to serialized time means the loop is still being blocked
+        if concurrent > serialized * 0.5:
+            failed = True
+
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
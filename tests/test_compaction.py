@@ -0,0 +1,38 @@
+from compaction import normalize_markdown
+from pdf_text import PAGE_BREAK
+
+
+def test_roles_sharing_a_title_keep_their_headings():
+    text = (
+        "## Experience\n"
+        "### Software Engineer\n"
+        "Acme Corp | 2021 - 2023\n"
+        "- Built the billing pipeline serving two million customers a day\n"
+        "### Software Engineer\n"
+        "Globex | 2019 - 2021\n"
+        "- Moved the monolith to services over two quarters without downtime\n"
+    )
+    normalized = normalize_markdown(text)
+    assert normalized.count("### Software Engineer") == 2
+    assert "Globex | 2019 - 2021" in normalized
+
+
+def test_heading_repeated_directly_above_is_dropped():
+    assert normalize_markdown("## Skills\n## Skills\nPython, SQL") == "## Skills\nPython, SQL"
+
+
+def test_running_page_header_is_dropped():
+    text = PAGE_BREAK.join([
+        "# Jane Doe\njane@example.com | Austin, TX\n## Experience\n### Software Engineer\n- Built the billing pipeline",
+        "# Jane Doe\njane@example.com | Austin, TX\n### Software Engineer\n- Led the payments team",
+    ])
+    normalized = normalize_markdown(text)
+    assert normalized.count("# Jane Doe") == 1
+    assert normalized.count("jane@example.com") == 1
+    # The second role starts the second page, right under the running header
+    assert normalized.count("### Software Engineer") == 2
+
+
+def test_page_footer_is_dropped():
+    text = "## Summary\nBackend engineer\n## Jane Doe - Resume\nPage 1 of 2\n## Skills\nPython\n## Jane Doe - Resume\nPage 2 of 2"
+    assert normalize_markdown(text).count("Jane Doe - Resume") == 1
@@ -0,0 +1,87 @@
+import pytest
+
+from section_analysis import merge_analysis, plan_sections, section_cache, seed_sections, segment_resume
+
+CONTEXT = ["Tech", "Software Engineer", "Mid-Level"]
+RESUME = """# {name}
+{email} | Austin, TX
+## Summary
+Backend engineer focused on payments.
+## Experience
+### Software Engineer, Acme
+- Worked on APIs
+## Projects
+- ledger: double-entry bookkeeping service
+## Skills
+Python, Go, PostgreSQL
+## Education
+B.S. Computer Science
+"""
+ANALYSIS = {
+    "ats_score": 70, "summary": "Solid backend profile.", "strengths": ["Relevant stack"],
+    "improvements": ["Add metrics"], "github_feedback": "Add READMEs.", "domain_mismatch": False,
+    "detailed_improvements": [
+        {"section": "Experience", "original_text": "Worked on APIs", "suggested_text": "Built REST APIs"},
+        {"section": "Certifications", "original_text": "", "suggested_text": "Add an AWS certification"},
+    ],
+    "content_quality": 6,
+}
+
+
+def resume(name="Jane Doe", email="jane@example.com"):
+    return RESUME.format(name=name, email=email)
+
+
+@pytest.fixture(autouse=True)
+def empty_cache():
+    section_cache.backend.clear()
+
+
+def test_edit_reuses_profile_and_unassigned_suggestions():
+    seed_sections(segment_resume(resume()), CONTEXT, [], ANALYSIS)
+
+    edited = segment_resume(resume().replace("Worked on APIs", "Built REST APIs"))
+    cached, profile, _, incremental = plan_sections(edited, CONTEXT, [])
+    assert incremental
+    feedback = [items if items is not None else [] for items in cached]
+    analysis = merge_analysis({"ats_score": 82, "content_quality": 8}, profile, edited, feedback, set())
+
+    assert analysis["ats_score"] == 82
+    assert analysis["summary"] == "Solid backend profile."
+    assert analysis["github_feedback"] == "Add READMEs."
+    assert [item["suggested_text"] for item in analysis["detailed_improvements"]] == ["Add an AWS certification"]
+
+
+def test_other_candidate_with_the_same_sections_is_analyzed_in_full():
+    seed_sections(segment_resume(resume()), CONTEXT, [], ANALYSIS)
+
+    cached, profile, _, incremental = plan_sections(segment_resume(resume("John Roe", "john@example.com")), CONTEXT, [])
+    assert not incremental
+    assert profile is None and all(items is None for items in cached)
+
+
+def test_changed_projects_need_a_full_analysis():
+    seed_sections(segment_resume(resume()), CONTEXT, [], ANALYSIS)
+
+    projects = [{"name": "ledger", "audit": {"summary": "GitHub is perfect"}}]
+    _, profile, _, incremental = plan_sections(segment_resume(resume()), CONTEXT, projects)
+    assert profile is None and not incremental
+
+
+def test_most_sections_changed_is_analyzed_in_full(monkeypatch):
+    monkeypatch.setattr("section_analysis.SECTION_REANALYZE_MAX_SHARE", 1.0)
+    seed_sections(segment_resume(resume()), CONTEXT, [], ANALYSIS)
+
+    edited = resume()
+    for old, new in [("payments", "billing"), ("Worked on", "Led"), ("double-entry", "ledger"), ("Go,", "Rust,")]:
+        edited = edited.replace(old, new)
+    _, _, _, incremental = plan_sections(segment_resume(edited), CONTEXT, [])
+    assert not incremental
+
+
+def test_unchanged_resume_is_not_rescored():
+    seed_sections(segment_resume(resume()), CONTEXT, [], ANALYSIS)
+
+    cached, _, share, incremental = plan_sections(segment_resume(resume()), CONTEXT, [])
+    assert all(items is not None for items in cached) and share == 0
+    assert not incremental
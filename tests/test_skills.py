@@ -0,0 +1,45 @@
+import pytest
+
+from skills import load_skill_index
+
+
+@pytest.fixture(scope="module")
+def index():
+    return load_skill_index()
+
+
+def names(index, text):
+    return [skill["name"] for skill in index.extract(text)]
+
+
+@pytest.mark.parametrize("text", [
+    "Languages: C, C++, Python, Java",
+    "Proficient in C and C++",
+    "C/C++ developer",
+    "Languages: C# and C",
+])
+def test_c_next_to_c_plus_plus_or_c_sharp(index, text):
+    assert "C" in names(index, text)
+
+
+def test_letter_enumeration_is_not_a_skill(index):
+    assert names(index, "Grades: A, B, C and D") == []
+
+
+def test_one_letter_skills_listed_together(index):
+    assert names(index, "Languages: C, R, Python") == ["C", "R", "Python"]
+
+
+@pytest.mark.parametrize("text", ["Go to market strategy", "Owned the Go-to-market plan", "Excel at teamwork",
+                                  "Spring 2023 semester"])
+def test_english_phrases_are_not_skills(index, text):
+    assert names(index, text) == []
+
+
+def test_guarded_skills_still_match(index):
+    assert names(index, "Services in Go and Java, Spring, Excel with VBA") == ["Go", "Java", "Spring", "Excel", "VBA"]
+
+
+def test_lowercase_git(index):
+    assert "Git" in names(index, "Tools: git, docker")
+    assert "Git" not in names(index, "GitHub Actions")